@@ -1,28 +1,75 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
+import asyncio
+import threading
 import bcrypt
 import os
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.db_writer import db_writer
 from app.models import User
+from app.auth.user_cache import UserSnapshot, get_cached_user, cache_user
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
 
+# bcrypt cost factor for new hashes; existing hashes are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt runs on a small dedicated pool so it never blocks the event loop.
+# Beyond PASSWORD_HASH_MAX_PENDING queued jobs new requests are refused.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = PASSWORD_HASH_WORKERS * 8
+
 security = HTTPBearer(auto_error=False)
 
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_pending = 0
+_hash_pending_lock = threading.Lock()
+
+
+class PasswordHashBusy(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+async def _run_in_hash_pool(func, *args):
+    global _hash_pending
+    with _hash_pending_lock:
+        if _hash_pending >= PASSWORD_HASH_MAX_PENDING:
+            raise PasswordHashBusy("Too many password operations in progress")
+        _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        with _hash_pending_lock:
+            _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_hash_pool(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -33,6 +80,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_user_access_token(user: User) -> str:
+    """
+    Token for a logged-in user. uid lets lookups go by primary key; is_admin is
+    informational only, authorization always uses the current user record.
+    """
+    return create_access_token(data={"sub": user.username, "uid": user.id, "is_admin": bool(user.is_admin)})
+
 def decode_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -40,7 +94,7 @@ def decode_token(token: str) -> Optional[dict]:
     except JWTError:
         return None
 
-def get_current_user_from_cookie(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
+def get_current_user_from_cookie(request: Request, db: Session = Depends(get_db)) -> Optional[UserSnapshot]:
     token = request.cookies.get("access_token")
     if not token:
         return None
@@ -53,10 +107,26 @@ def get_current_user_from_cookie(request: Request, db: Session = Depends(get_db)
     if username is None:
         return None
 
-    user = db.query(User).filter(User.username == username).first()
-    return user
+    uid = payload.get("uid")
+
+    cached = get_cached_user(username)
+    if cached is not None and (uid is None or cached.id == uid):
+        return cached
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+    if uid is not None:
+        user = db.get(User, uid)
+        if user is not None and user.username != username:
+            user = None
+    else:
+        # Tokens issued before the uid claim existed
+        user = db.query(User).filter(User.username == username).first()
+
+    if user is None:
+        return None
+
+    return cache_user(username, user)
+
+def get_current_user(request: Request, db: Session = Depends(get_db)) -> UserSnapshot:
     user = get_current_user_from_cookie(request, db)
     if user is None:
         raise HTTPException(
@@ -65,7 +135,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
         )
     return user
 
-def get_current_admin_user(request: Request, db: Session = Depends(get_db)) -> User:
+def get_current_admin_user(request: Request, db: Session = Depends(get_db)) -> UserSnapshot:
     user = get_current_user(request, db)
     if not user.is_admin:
         raise HTTPException(
@@ -81,3 +151,27 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     if not verify_password(password, user.password_hash):
         return None
     return user
+
+async def authenticate_user_async(db: Session, username: str, password: str) -> Optional[User]:
+    """
+    Like authenticate_user, with bcrypt off the event loop. A password hashed
+    with an outdated cost is transparently rehashed with BCRYPT_ROUNDS.
+    """
+    user = db.query(User).filter(User.username == username).first()
+    if not user:
+        return None
+    old_hash = user.password_hash
+    db.close()  # don't hold a pooled connection while bcrypt runs
+
+    if not await verify_password_async(password, old_hash):
+        return None
+
+    if password_needs_rehash(old_hash):
+        new_hash = await get_password_hash_async(password)
+        await asyncio.wrap_future(db_writer.submit(
+            "UPDATE users SET password_hash = :new_hash WHERE id = :user_id AND password_hash = :old_hash",
+            {"new_hash": new_hash, "user_id": user.id, "old_hash": old_hash}
+        ))
+        user.password_hash = new_hash
+
+    return user
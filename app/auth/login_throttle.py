@@ -0,0 +1,79 @@
+import os
+import time
+import threading
+from collections import defaultdict, deque
+from typing import Optional
+
+# Sliding-window limits checked before any password hashing happens
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "20"))
+LOGIN_IP_WINDOW_SECONDS = 60
+LOGIN_MAX_FAILURES_PER_USERNAME = int(os.getenv("LOGIN_MAX_FAILURES_PER_USERNAME", "5"))
+LOGIN_USERNAME_WINDOW_SECONDS = 300
+
+# Keys are dropped once their window is empty; this bounds memory if a flood
+# uses many distinct IPs or usernames
+MAX_TRACKED_KEYS = 10000
+
+
+class LoginThrottle:
+    """
+    In-memory login rate limiter.
+
+    Every attempt counts against the client IP; only failed attempts count
+    against the username, and a successful login clears them.
+    """
+
+    def __init__(self):
+        self._attempts_by_ip = defaultdict(deque)
+        self._failures_by_username = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _prune(window, horizon):
+        while window and window[0] <= horizon:
+            window.popleft()
+
+    def _retry_after(self, table, key, limit, window_seconds, now):
+        window = table.get(key)
+        if window is None:
+            return None
+        self._prune(window, now - window_seconds)
+        if not window:
+            del table[key]
+            return None
+        if len(window) >= limit:
+            return max(1, int(window[0] + window_seconds - now) + 1)
+        return None
+
+    def check(self, ip: str, username: str) -> Optional[int]:
+        """
+        Register a login attempt. Returns the number of seconds to wait if the
+        attempt should be rejected, or None if it may proceed.
+        """
+        now = time.monotonic()
+        username = username.lower()
+        with self._lock:
+            retry_after = (
+                self._retry_after(self._attempts_by_ip, ip, LOGIN_MAX_ATTEMPTS_PER_IP, LOGIN_IP_WINDOW_SECONDS, now)
+                or self._retry_after(self._failures_by_username, username, LOGIN_MAX_FAILURES_PER_USERNAME,
+                                     LOGIN_USERNAME_WINDOW_SECONDS, now)
+            )
+            if retry_after:
+                return retry_after
+            if len(self._attempts_by_ip) >= MAX_TRACKED_KEYS:
+                self._attempts_by_ip.clear()
+            self._attempts_by_ip[ip].append(now)
+            return None
+
+    def record_failure(self, username: str):
+        with self._lock:
+            if len(self._failures_by_username) >= MAX_TRACKED_KEYS:
+                self._failures_by_username.clear()
+            self._failures_by_username[username.lower()].append(time.monotonic())
+
+    def record_success(self, username: str):
+        with self._lock:
+            self._failures_by_username.pop(username.lower(), None)
+
+
+login_throttle = LoginThrottle()
@@ -0,0 +1,97 @@
+import os
+import time
+import threading
+from typing import Optional
+from app.database import DATABASE_DIR, register_cache_invalidator
+
+# How long a resolved user is reused before it is read from the database again.
+# Admin edits clear the cache, so this only bounds staleness from other writers.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = 1024
+
+# Touched on every invalidation so other worker processes drop their caches too
+GENERATION_PATH = os.path.join(DATABASE_DIR, "user_cache.generation")
+
+
+class UserSnapshot:
+    """
+    Read-only copy of a User row, detached from any session.
+
+    Exposes the same attributes routes and templates read from the
+    authenticated user (everything except password_hash).
+    """
+
+    __slots__ = ("id", "username", "slug", "email", "is_admin", "opt_in_daily_reports", "opt_in_tip_reports")
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.slug = user.slug
+        self.email = user.email
+        self.is_admin = bool(user.is_admin)
+        self.opt_in_daily_reports = bool(user.opt_in_daily_reports)
+        self.opt_in_tip_reports = bool(user.opt_in_tip_reports)
+
+    def __repr__(self):
+        return f"<UserSnapshot id={self.id} username={self.username!r} is_admin={self.is_admin}>"
+
+
+_entries = {}
+_lock = threading.Lock()
+_seen_generation = None
+
+
+def _current_generation():
+    try:
+        return os.stat(GENERATION_PATH).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _sync_generation():
+    """Clear local entries if another process invalidated since we last looked. Caller holds _lock."""
+    global _seen_generation
+    generation = _current_generation()
+    if generation != _seen_generation:
+        _entries.clear()
+        _seen_generation = generation
+
+
+def get_cached_user(sub: str) -> Optional[UserSnapshot]:
+    """Return the cached snapshot for a token subject, or None if missing or expired."""
+    with _lock:
+        _sync_generation()
+        entry = _entries.get(sub)
+        if entry is None:
+            return None
+        snapshot, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del _entries[sub]
+            return None
+        return snapshot
+
+
+def cache_user(sub: str, user) -> UserSnapshot:
+    snapshot = UserSnapshot(user)
+    with _lock:
+        if len(_entries) >= USER_CACHE_MAX_ENTRIES:
+            _entries.clear()
+        _entries[sub] = (snapshot, time.monotonic() + USER_CACHE_TTL_SECONDS)
+    return snapshot
+
+
+@register_cache_invalidator
+def invalidate_user_cache(sub: Optional[str] = None):
+    """Drop one token subject's snapshot, or every snapshot when sub is None."""
+    global _seen_generation
+    with _lock:
+        if sub is None:
+            _entries.clear()
+        else:
+            _entries.pop(sub, None)
+        try:
+            with open(GENERATION_PATH, "w") as f:
+                f.write(str(time.time_ns()))
+        except OSError as e:
+            print(f"⚠ Warning: could not signal user cache invalidation to other workers: {e}")
+        _seen_generation = None
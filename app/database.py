@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -14,28 +14,103 @@ for directory in [DATABASE_DIR, SCHEDULER_DIR]:
     os.makedirs(directory, exist_ok=True)
 
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+SCHEDULER_DATABASE_URL = f"sqlite:///{SCHEDULER_DIR}/jobs.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={
-        "check_same_thread": False,
-        "timeout": 30  # Increase timeout for busy database
+# How long a connection waits for another connection's write lock
+BUSY_TIMEOUT_SECONDS = 30
+
+
+def load_engine_profile():
+    """
+    Build the SQLite engine profile from environment variables.
+
+    Pool settings control the SQLAlchemy QueuePool; the remaining values are
+    applied as PRAGMAs on every new connection.
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        "page_size": int(os.getenv("DB_PAGE_SIZE", "4096")),
+        "cache_size_kb": int(os.getenv("DB_CACHE_SIZE_KB", "16384")),
+        "mmap_size_mb": int(os.getenv("DB_MMAP_SIZE_MB", "128")),
+        "temp_store": os.getenv("DB_TEMP_STORE", "MEMORY").upper(),
+        "journal_size_limit_mb": int(os.getenv("DB_JOURNAL_SIZE_LIMIT_MB", "64")),
+        "wal_checkpoint_minutes": int(os.getenv("DB_WAL_CHECKPOINT_MINUTES", "15")),
     }
-)
 
-# Enable WAL mode for better concurrency and reduced locking
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
 
-@event.listens_for(Engine, "connect")
-def set_sqlite_pragma(dbapi_conn, connection_record):
+ENGINE_PROFILE = load_engine_profile()
+
+
+def apply_sqlite_pragmas(dbapi_conn, profile):
+    """Apply the per-connection PRAGMAs for a profile to a raw sqlite3 connection."""
     cursor = dbapi_conn.cursor()
+    cursor.execute(f"PRAGMA page_size={profile['page_size']}")  # Only takes effect on a new database
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")  # Likewise; lets maintenance reclaim free pages
     cursor.execute("PRAGMA foreign_keys=ON")  # CRITICAL: Enable foreign key constraints
     cursor.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for better concurrency
-    cursor.execute("PRAGMA busy_timeout=30000")  # 30 second timeout
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_SECONDS * 1000}")
     cursor.execute("PRAGMA synchronous=NORMAL")  # Balance between safety and performance
+    cursor.execute(f"PRAGMA cache_size=-{profile['cache_size_kb']}")  # Negative value = KiB
+    cursor.execute(f"PRAGMA mmap_size={profile['mmap_size_mb'] * 1024 * 1024}")
+    cursor.execute(f"PRAGMA temp_store={profile['temp_store']}")
+    cursor.execute(f"PRAGMA journal_size_limit={profile['journal_size_limit_mb'] * 1024 * 1024}")
     cursor.close()
 
+
+def set_sqlite_pragma(dbapi_conn, connection_record):
+    """Connect hook for the application engine (also used by the database writer)."""
+    apply_sqlite_pragmas(dbapi_conn, ENGINE_PROFILE)
+
+
+def create_app_engine(profile=ENGINE_PROFILE, url=SQLALCHEMY_DATABASE_URL):
+    """
+    Create an engine for the application database using the given profile.
+
+    The PRAGMA listener is attached to this engine only, so other engines in
+    the process (e.g. the APScheduler job store) keep their own settings.
+    """
+    new_engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": BUSY_TIMEOUT_SECONDS  # Increase timeout for busy database
+        },
+        pool_size=profile["pool_size"],
+        max_overflow=profile["max_overflow"],
+        pool_pre_ping=profile["pool_pre_ping"]
+    )
+
+    @event.listens_for(new_engine, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        apply_sqlite_pragmas(dbapi_conn, profile)
+
+    return new_engine
+
+
+def create_jobstore_engine(url=SCHEDULER_DATABASE_URL):
+    """
+    Create the engine for the APScheduler job store.
+
+    Every worker's scheduler reads and writes jobs.db, so its connections get
+    the same busy timeout as the application engine and WAL, rather than the
+    sqlite3 default of failing after 5 seconds.
+    """
+    new_engine = create_engine(url, connect_args={"timeout": BUSY_TIMEOUT_SECONDS})
+
+    @event.listens_for(new_engine, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_SECONDS * 1000}")
+        cursor.close()
+
+    return new_engine
+
+
+engine = create_app_engine()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -52,3 +127,48 @@ def init_db():
 
 def database_exists():
     return os.path.exists(DATABASE_PATH)
+
+def optimize_database():
+    """Refresh query planner statistics at startup (PRAGMA optimize)."""
+    try:
+        with engine.connect() as conn:
+            # 0x10002: analyze every table that needs it, not just those this
+            # connection has queried (flag is ignored by older SQLite versions)
+            conn.exec_driver_sql("PRAGMA optimize=0x10002")
+        print("✓ Database optimized")
+    except Exception as e:
+        print(f"⚠ Warning: PRAGMA optimize failed: {e}")
+
+def checkpoint_wal():
+    """
+    Checkpoint the WAL back into the main database and truncate it.
+
+    Scheduled periodically so a busy day of form saves doesn't leave a large
+    -wal file behind; journal_size_limit caps what is left between runs.
+    """
+    try:
+        with engine.connect() as conn:
+            busy, log_pages, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            print(f"⚠ WAL checkpoint incomplete: {checkpointed}/{log_pages} pages (database busy)")
+        return {"busy": busy, "log_pages": log_pages, "checkpointed_pages": checkpointed}
+    except Exception as e:
+        print(f"⚠ Warning: WAL checkpoint failed: {e}")
+        return None
+
+# Callables that drop in-process state derived from database contents. Run
+# after the database file is swapped underneath the app (e.g. a hot restore).
+_cache_invalidators = []
+
+def register_cache_invalidator(func):
+    """Register a callable to run when database-derived caches must be dropped."""
+    if func not in _cache_invalidators:
+        _cache_invalidators.append(func)
+    return func
+
+def invalidate_caches():
+    for func in list(_cache_invalidators):
+        try:
+            func()
+        except Exception as e:
+            print(f"⚠ Warning: cache invalidator {getattr(func, '__name__', func)} failed: {e}")
@@ -0,0 +1,281 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from app.database import DATABASE_PATH, set_sqlite_pragma
+
+logger = logging.getLogger(__name__)
+
+# How many queued batches a single group commit may absorb, and how long the
+# writer lingers after the first batch to let concurrent writers pile on.
+MAX_GROUP_SIZE = 64
+GROUP_LINGER_SECONDS = 0.002
+
+# Retries for the whole group when another process (or a web request's own
+# session) still holds the SQLite write lock past busy_timeout.
+MAX_LOCK_RETRIES = 5
+LOCK_RETRY_BASE_DELAY = 0.1
+
+_STOP = object()
+
+
+class _Pause:
+    """Queue marker: the writer finishes the groups ahead of it, then waits for resume()."""
+
+    def __init__(self):
+        self.paused = threading.Event()
+        self.resumed = threading.Event()
+
+
+class WriteResult:
+    """Outcome of one statement executed by the writer thread."""
+
+    __slots__ = ("rowcount", "lastrowid", "rows")
+
+    def __init__(self, rowcount, lastrowid, rows):
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+        self.rows = rows
+
+    def scalar(self):
+        """Return the first column of the first returned row, like Result.scalar()."""
+        if self.rows:
+            return self.rows[0][0]
+        return None
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class DatabaseWriter:
+    """
+    Single writer thread that owns one SQLite connection.
+
+    Callers submit batches of (sql, params) statements through a queue. The
+    writer drains whatever has queued up and applies it in one transaction
+    (group commit), wrapping each batch in its own SAVEPOINT so a failing
+    batch does not roll back its neighbours. Readers keep using the pooled
+    SQLAlchemy connections; under WAL they never block on the writer.
+    """
+
+    def __init__(self, database_path=DATABASE_PATH):
+        self.database_path = database_path
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pause_marker = None
+        self.groups_committed = 0
+        self.batches_committed = 0
+        self.lock_retries = 0
+        self.lock_wait_seconds = 0.0
+        self.failed_groups = 0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+            self._thread.start()
+
+    def shutdown(self, timeout=30):
+        with self._lock:
+            if not self.running:
+                return
+            if self._pause_marker is not None:
+                self._pause_marker.resumed.set()
+                self._pause_marker = None
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def pause(self, timeout=60):
+        """
+        Apply everything queued so far, then hold further writes until resume().
+
+        Submitting keeps working while paused; the batches simply wait in the
+        queue. Returns False if the writer did not reach the pause in time.
+        """
+        with self._lock:
+            if not self.running or self._pause_marker is not None:
+                return True
+            marker = _Pause()
+            self._pause_marker = marker
+            self._queue.put(marker)
+        return marker.paused.wait(timeout)
+
+    def resume(self):
+        with self._lock:
+            marker, self._pause_marker = self._pause_marker, None
+        if marker is not None:
+            marker.resumed.set()
+
+    def submit_batch(self, statements):
+        """
+        Queue a list of (sql, params) tuples to be applied atomically.
+
+        Returns a concurrent.futures.Future resolving to a list of WriteResult,
+        one per statement. Async handlers can await it with asyncio.wrap_future.
+        """
+        if not self.running:
+            self.start()
+        future = Future()
+        self._queue.put((list(statements), future))
+        return future
+
+    def submit(self, sql, params=None):
+        """Queue a single statement; the Future resolves to its WriteResult."""
+        batch_future = self.submit_batch([(sql, params)])
+        future = Future()
+
+        def _unwrap(done):
+            error = done.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(done.result()[0])
+
+        batch_future.add_done_callback(_unwrap)
+        return future
+
+    def execute_batch(self, statements, timeout=60):
+        """Apply a batch and block until it is committed."""
+        return self.submit_batch(statements).result(timeout)
+
+    def execute(self, sql, params=None, timeout=60):
+        """Apply one statement and block until it is committed."""
+        return self.execute_batch([(sql, params)], timeout)[0]
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        set_sqlite_pragma(conn, None)
+        return conn
+
+    def _collect_group(self, first):
+        """Gather queued batches; a control marker (stop/pause) always ends the group."""
+        group = [first]
+        if not isinstance(first, tuple):
+            return group
+        deadline = time.monotonic() + GROUP_LINGER_SECONDS
+        while len(group) < MAX_GROUP_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            group.append(item)
+            if not isinstance(item, tuple):
+                break
+        return group
+
+    def _apply_group(self, conn, group):
+        """Run every batch in one transaction. Returns per-batch results or exceptions."""
+        outcomes = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for index, (statements, _future) in enumerate(group):
+                savepoint = f"batch_{index}"
+                conn.execute(f"SAVEPOINT {savepoint}")
+                try:
+                    results = []
+                    for sql, params in statements:
+                        cursor = conn.execute(sql, params or {})
+                        rows = cursor.fetchall()
+                        results.append(WriteResult(cursor.rowcount, cursor.lastrowid, rows))
+                    conn.execute(f"RELEASE {savepoint}")
+                    outcomes.append(results)
+                except sqlite3.OperationalError as e:
+                    if "locked" in str(e) or "busy" in str(e):
+                        raise
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                    outcomes.append(e)
+                except Exception as e:
+                    conn.execute(f"ROLLBACK TO {savepoint}")
+                    conn.execute(f"RELEASE {savepoint}")
+                    outcomes.append(e)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return outcomes
+
+    def _commit_group(self, conn, group):
+        for attempt in range(MAX_LOCK_RETRIES):
+            started = time.perf_counter()
+            try:
+                outcomes = self._apply_group(conn, group)
+            except sqlite3.OperationalError as e:
+                # The failed attempt already waited out the busy timeout
+                self.lock_wait_seconds += time.perf_counter() - started
+                if attempt < MAX_LOCK_RETRIES - 1:
+                    self.lock_retries += 1
+                    delay = LOCK_RETRY_BASE_DELAY * (2 ** attempt)
+                    logger.warning("[WRITER] Database locked, retrying group of %s in %ss: %s", len(group), delay, e)
+                    time.sleep(delay)
+                    self.lock_wait_seconds += delay
+                    continue
+                self.failed_groups += 1
+                logger.error("[WRITER] Group commit failed after %s attempts: %s", MAX_LOCK_RETRIES, e)
+                for _statements, future in group:
+                    future.set_exception(e)
+                return
+            except Exception as e:
+                self.failed_groups += 1
+                logger.exception("[WRITER] Unexpected error during group commit: %s", e)
+                for _statements, future in group:
+                    future.set_exception(e)
+                return
+
+            self.groups_committed += 1
+            for (_statements, future), outcome in zip(group, outcomes):
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    self.batches_committed += 1
+                    future.set_result(outcome)
+            return
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            while True:
+                group = self._collect_group(self._queue.get())
+                control = group.pop() if not isinstance(group[-1], tuple) else None
+                if group:
+                    self._commit_group(conn, group)
+                if control is _STOP:
+                    break
+                if isinstance(control, _Pause):
+                    control.paused.set()
+                    control.resumed.wait()
+        finally:
+            conn.close()
+
+
+db_writer = DatabaseWriter()
+
+
+def start_db_writer():
+    """Start the database writer thread if not already running"""
+    if not db_writer.running:
+        db_writer.start()
+        logger.info("Database writer started")
+
+
+def shutdown_db_writer():
+    """Flush queued writes and stop the writer thread"""
+    if db_writer.running:
+        db_writer.shutdown()
+        logger.info("Database writer shut down gracefully")
@@ -1,44 +1,43 @@
+import hmac
+import os
 from fastapi import FastAPI, Request, Depends
-from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi.responses import RedirectResponse, HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from datetime import date
-from app.database import init_db, get_db
+from app.database import init_db, get_db, optimize_database, register_cache_invalidator, engine
 from app.models import User, Position, TipEntryRequirement, Setting
 from app.auth.jwt_handler import get_current_user_from_cookie
 from app.routes import auth, admin, employees, daily_balance, positions, tip_requirements, reports, financial_items, scheduled_tasks, checks_efts
 from app.utils.slugify import create_slug
-from app.utils.version import check_version
-from app.utils.logging_config import setup_error_logging
-from app.scheduler import start_scheduler, shutdown_scheduler
+from app.utils.version import check_version, start_version_refresh
+from app.utils.logging_config import setup_error_logging, reconfigure_logging, shutdown_logging
+from app.utils.perf_stats import instrument_engine
+from app.utils.metrics import render_metrics
+from app.scheduler import start_scheduler, shutdown_scheduler, promote_scheduler
+from app.scheduler_lease import scheduler_lease, worker_registry
+from app.db_writer import start_db_writer, shutdown_db_writer
+from app.middleware import RequestContextMiddleware, RequestTimingMiddleware, ProfilingMiddleware
+from app.templating import templates, precompile_templates
 import logging
 
 app = FastAPI(title="Internal Management System")
+# Last added runs first: the request id is bound before timing and profiling start
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestTimingMiddleware)
+app.add_middleware(RequestContextMiddleware)
+instrument_engine(engine)
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
-templates = Jinja2Templates(directory="app/templates")
+# Log levels come from the settings table; re-read them if the database is restored
+register_cache_invalidator(reconfigure_logging)
 
-def format_decimal(value, decimals=2):
-    """Format a number to a fixed number of decimal places."""
-    try:
-        return f"{float(value):.{decimals}f}"
-    except (ValueError, TypeError):
-        return value
-
-templates.env.filters["format_decimal"] = format_decimal
-
-app.include_router(auth.router)
-app.include_router(admin.router)
-app.include_router(employees.router)
-app.include_router(daily_balance.router)
-app.include_router(positions.router)
-app.include_router(tip_requirements.router)
-app.include_router(reports.router)
-app.include_router(financial_items.router)
-app.include_router(scheduled_tasks.router)
-app.include_router(checks_efts.router)
+# The routers are plain APIRouter()s (no prefix, tags or dependencies), so
+# their routes are added as built. include_router would rebuild every route
+# and analyse its dependencies and response model a second time at startup.
+for module in (auth, admin, employees, daily_balance, positions, tip_requirements, reports, financial_items, scheduled_tasks, checks_efts):
+    app.router.routes.extend(module.router.routes)
 
 def initialize_predefined_data():
     # No longer creating hardcoded positions and tip requirements
@@ -104,16 +103,40 @@ def initialize_error_logging():
 @app.on_event("startup")
 def startup_event():
     init_db()
+    optimize_database()
     initialize_predefined_data()
     initialize_default_settings()
     initialize_error_logging()
-    start_scheduler()
+    precompile_templates()
+    start_db_writer()
+    worker_registry.register()
+    if scheduler_lease.try_acquire():
+        start_scheduler()
+        from app.routes.scheduled_tasks import load_scheduled_tasks
+        load_scheduled_tasks()
+    else:
+        # Another worker runs the jobs; this one serves HTTP and takes over
+        # if the leader goes away
+        print("→ Scheduler lease held by another worker, starting in standby")
+        start_scheduler(standby=True)
+        scheduler_lease.watch(become_scheduler_leader)
+    start_version_refresh()
+
+def become_scheduler_leader():
+    """Called from the lease watcher once this worker holds the scheduler lease."""
+    print("→ Acquired scheduler lease")
+    promote_scheduler()
     from app.routes.scheduled_tasks import load_scheduled_tasks
     load_scheduled_tasks()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    scheduler_lease.stop_watching()
     shutdown_scheduler()
+    scheduler_lease.release()
+    worker_registry.unregister()
+    shutdown_db_writer()
+    shutdown_logging()
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request, db: Session = Depends(get_db)):
@@ -140,6 +163,16 @@ async def home(request: Request, db: Session = Depends(get_db)):
         }
     )
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """Prometheus text exposition of this worker's metrics."""
+    token = os.getenv("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return PlainTextResponse("Unauthorized\n", status_code=401)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5710)
@@ -0,0 +1,136 @@
+"""
+ASGI middleware shared by the app.
+
+Written as plain ASGI callables rather than BaseHTTPMiddleware so they add no
+extra task or response buffering per request.
+"""
+import time
+import uuid
+from urllib.parse import parse_qs
+from starlette.requests import Request
+from app.utils.logging_config import log_context, get_log_context
+from app.utils.perf_stats import begin_request, end_request, record_request, server_timing_header
+from app.utils.profiling import profile_session
+
+REQUEST_ID_HEADER = b"x-request-id"
+PROFILE_HEADER = b"x-profile"
+
+
+class RequestContextMiddleware:
+    """
+    Give every HTTP request a request_id for its log records.
+
+    Reuses an incoming X-Request-ID header (e.g. from a reverse proxy) when
+    present and echoes the id back on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")[:64]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex[:12]
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+            await send(message)
+
+        with log_context(request_id=request_id):
+            await self.app(scope, receive, send_with_request_id)
+
+
+class RequestTimingMiddleware:
+    """
+    Time each request and count its SQL statements.
+
+    Adds a Server-Timing header (total and SQL time, statement count) and
+    records the request in the per-route stats shown on /admin/performance.
+    Static files are skipped.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith("/static/"):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats, token = begin_request()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = server_timing_header(time.perf_counter() - started, stats)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            # The router stores the matched route in the scope; unmatched
+            # paths share one bucket so 404 probes can't grow the stats
+            route = scope.get("route")
+            record_request(
+                getattr(route, "path", "<unmatched>"),
+                scope["method"],
+                scope["path"],
+                status,
+                time.perf_counter() - started,
+                stats,
+                get_log_context().get("request_id")
+            )
+
+
+def _is_admin_request(scope):
+    from app.database import SessionLocal
+    from app.auth.jwt_handler import get_current_user_from_cookie
+
+    db = SessionLocal()
+    try:
+        user = get_current_user_from_cookie(Request(scope), db)
+    finally:
+        db.close()
+    return bool(user and user.is_admin)
+
+
+class ProfilingMiddleware:
+    """
+    Profile report generation for one request when an admin adds ?profile=1.
+
+    The saved report's name is returned in an X-Profile header and the report
+    is listed under /admin/profiles. The query parameter is ignored for
+    everyone else, and requests without it only pay for the substring check.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or b"profile=" not in scope["query_string"]
+                or parse_qs(scope["query_string"].decode("latin-1")).get("profile") != ["1"]
+                or not _is_admin_request(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        with profile_session(f"{scope['method']} {scope['path']}") as session:
+            async def send_with_profile(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", []), (PROFILE_HEADER, session.name.encode("latin-1"))]
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Boolean, Integer, Float, Date, DateTime, ForeignKey, Text, JSON, Table
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Boolean, Integer, Float, Date, DateTime, ForeignKey, Text, JSON, Table, Index
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
 
 position_tip_requirements = Table(
@@ -73,6 +73,22 @@ class EmployeePositionSchedule(Base):
     employee = relationship("Employee", back_populates="position_schedules")
     position = relationship("Position")
 
+class ScheduleWeekday(Base):
+    """Index of recurring schedules: one row per (weekday, employee, position). weekday is 0=Monday."""
+    __tablename__ = "schedule_weekdays"
+
+    weekday = Column(Integer, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True, index=True)
+    position_id = Column(Integer, ForeignKey("positions.id", ondelete="CASCADE"), primary_key=True)
+
+class ScheduleDate(Base):
+    """Index of calendar schedules: one row per (date, employee, position)."""
+    __tablename__ = "schedule_dates"
+
+    date = Column(Date, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("employees.id", ondelete="CASCADE"), primary_key=True, index=True)
+    position_id = Column(Integer, ForeignKey("positions.id", ondelete="CASCADE"), primary_key=True)
+
 class Employee(Base):
     __tablename__ = "employees"
 
@@ -222,6 +238,7 @@ class ScheduledTask(Base):
     employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
     starts_at = Column(DateTime, nullable=True)
     attach_csv = Column(Boolean, default=False)
+    profile_enabled = Column(Boolean, default=False)
 
     employee = relationship("Employee")
     executions = relationship("TaskExecution", back_populates="task", cascade="all, delete-orphan")
@@ -296,26 +313,50 @@ class DailyBalanceEFT(Base):
 
     daily_balance = relationship("DailyBalance", back_populates="efts")
 
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def weekday_mask(day_names):
+    """Bitmask of day names: bit 0 is Monday ... bit 6 is Sunday. Unknown names are ignored."""
+    mask = 0
+    for day_name in day_names or []:
+        if day_name in WEEKDAY_NAMES:
+            mask |= 1 << WEEKDAY_NAMES.index(day_name)
+    return mask
+
 class ScheduledCheck(Base):
     __tablename__ = "scheduled_checks"
+    __table_args__ = (Index("ix_scheduled_checks_active_weekday_mask", "is_active", "weekday_mask"),)
 
     id = Column(Integer, primary_key=True, index=True)
     check_number = Column(String, nullable=True)
     payable_to = Column(String, nullable=False)
     default_total = Column(Float, default=0.0)
     days_of_week = Column(JSON, default=list)
+    weekday_mask = Column(Integer, nullable=False, default=0)
     memo = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(String, nullable=True)
 
+    @validates("days_of_week")
+    def _sync_weekday_mask(self, key, days_of_week):
+        self.weekday_mask = weekday_mask(days_of_week)
+        return days_of_week
+
 class ScheduledEFT(Base):
     __tablename__ = "scheduled_efts"
+    __table_args__ = (Index("ix_scheduled_efts_active_weekday_mask", "is_active", "weekday_mask"),)
 
     id = Column(Integer, primary_key=True, index=True)
     card_number = Column(String, nullable=True)
     payable_to = Column(String, nullable=False)
     default_total = Column(Float, default=0.0)
     days_of_week = Column(JSON, default=list)
+    weekday_mask = Column(Integer, nullable=False, default=0)
     memo = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(String, nullable=True)
+
+    @validates("days_of_week")
+    def _sync_weekday_mask(self, key, days_of_week):
+        self.weekday_mask = weekday_mask(days_of_week)
+        return days_of_week
@@ -1,16 +1,37 @@
+import asyncio
+from datetime import datetime
+from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse, FileResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.db_writer import db_writer
 from app.models import User, Setting
-from app.auth.jwt_handler import get_current_admin_user, get_password_hash
+from app.auth.user_cache import invalidate_user_cache
+from app.auth.jwt_handler import get_current_admin_user, get_password_hash_async, PasswordHashBusy
 from app.utils.slugify import create_slug, ensure_unique_slug
-from app.utils.backup import create_backup, list_backups, delete_backup, get_backup_path, restore_backup, get_backup_retention_count, cleanup_old_backups
-from app.utils.logging_config import get_log_files, read_log_file, get_log_stats, clear_log_file
+from app.utils.backup import create_backup, list_backups, delete_backup, get_backup_path, hot_restore_backup, get_backup_retention_count, cleanup_old_backups
+from app.utils.logging_config import search_logs, get_log_stats, clear_log_file
+from app.utils import perf_stats
+from app.utils.profiling import list_profiles, read_profile
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+
+def setting_upsert(key: str, value: str, description: str):
+    """Build an upsert statement for a settings row, to be applied by the database writer."""
+    return ("""
+        INSERT INTO settings (key, value, description, created_at, updated_at)
+        VALUES (:key, :value, :description, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        ON CONFLICT(key) DO UPDATE SET
+            value = excluded.value,
+            updated_at = CURRENT_TIMESTAMP
+    """, {"key": key, "value": value, "description": description})
+
+async def save_settings(*statements):
+    """Queue setting upserts on the writer thread and wait for the group commit."""
+    await asyncio.wrap_future(db_writer.submit_batch(statements))
 
 @router.get("/admin", response_class=HTMLResponse)
 async def admin_page(
@@ -43,6 +64,20 @@ async def new_user_page(
         {"request": request, "user": None, "current_user": current_user}
     )
 
+def user_form_busy_response(request: Request, user, current_user: User):
+    """The user form again, with a retry message, when the password hash pool is full."""
+    return templates.TemplateResponse(
+        "admin/user_form.html",
+        {
+            "request": request,
+            "user": user,
+            "current_user": current_user,
+            "error": "The server is busy. Please try again in a moment."
+        },
+        status_code=503,
+        headers={"Retry-After": "5"}
+    )
+
 @router.post("/admin/users/new")
 async def create_user(
     request: Request,
@@ -59,11 +94,16 @@ async def create_user(
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
 
+    try:
+        password_hash = await get_password_hash_async(password)
+    except PasswordHashBusy:
+        return user_form_busy_response(request, None, current_user)
+
     slug = ensure_unique_slug(db, User, create_slug(username))
 
     new_user = User(
         username=username,
-        password_hash=get_password_hash(password),
+        password_hash=password_hash,
         slug=slug,
         email=email if email else None,
         is_admin=is_admin,
@@ -108,15 +148,23 @@ async def update_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    password_hash = None
+    if password:
+        try:
+            password_hash = await get_password_hash_async(password)
+        except PasswordHashBusy:
+            return user_form_busy_response(request, user, current_user)
+
     user.username = username
     user.email = email if email else None
-    if password:
-        user.password_hash = get_password_hash(password)
+    if password_hash:
+        user.password_hash = password_hash
     user.is_admin = is_admin
     user.opt_in_daily_reports = opt_in_daily_reports
     user.opt_in_tip_reports = opt_in_tip_reports
 
     db.commit()
+    invalidate_user_cache()
     return RedirectResponse(url="/admin", status_code=302)
 
 @router.post("/admin/users/{slug}/delete")
@@ -134,15 +182,17 @@ async def delete_user(
 
     db.delete(user)
     db.commit()
+    invalidate_user_cache()
     return RedirectResponse(url="/admin", status_code=302)
 
 @router.post("/admin/backups/create")
 async def create_database_backup(
+    mode: str = Form("full"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     try:
-        create_backup()
+        create_backup(mode=mode)
         return RedirectResponse(url="/admin", status_code=302)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -157,7 +207,7 @@ async def download_backup(
         return FileResponse(
             path=filepath,
             filename=filename,
-            media_type="application/octet-stream"
+            media_type="application/gzip" if filename.endswith(".gz") else "application/octet-stream"
         )
     except (ValueError, FileNotFoundError) as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -181,9 +231,9 @@ async def restore_database_backup(
     try:
         db.close()
 
-        restore_backup(filename)
+        result = await run_in_threadpool(hot_restore_backup, filename)
 
-        return RedirectResponse(url="/admin?restored=true", status_code=302)
+        return RedirectResponse(url=f"/admin?restored=true&downtime_ms={result['downtime_ms']:.0f}", status_code=302)
     except (ValueError, FileNotFoundError) as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -199,19 +249,9 @@ async def update_backup_retention(
         if retention_count < 1:
             raise HTTPException(status_code=400, detail="Retention count must be at least 1")
 
-        setting = db.query(Setting).filter(Setting.key == "backup_retention_count").first()
-
-        if setting:
-            setting.value = str(retention_count)
-        else:
-            setting = Setting(
-                key="backup_retention_count",
-                value=str(retention_count),
-                description="Number of database backups to keep"
-            )
-            db.add(setting)
-
-        db.commit()
+        await save_settings(
+            setting_upsert("backup_retention_count", str(retention_count), "Number of database backups to keep")
+        )
 
         cleanup_old_backups(retention_count)
 
@@ -221,19 +261,46 @@ async def update_backup_retention(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def parse_log_filter_time(value: str):
+    """Parse a datetime-local form value ('YYYY-MM-DDTHH:MM'); blank or invalid gives None."""
+    for fmt in ("%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
 @router.get("/admin/error-logs", response_class=HTMLResponse)
 async def view_error_logs(
     request: Request,
     max_lines: int = 500,
+    level: str = "",
+    logger: str = "",
+    since: str = "",
+    until: str = "",
+    q: str = "",
+    cursor: str = "",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
-    log_files = get_log_files()
+    max_lines = max(1, min(max_lines, 5000))
     log_stats = get_log_stats()
 
-    log_lines = []
-    if log_files:
-        log_lines = read_log_file(log_files[0], max_lines)
+    log_page = await run_in_threadpool(
+        search_logs,
+        max_records=max_lines,
+        level=level or None,
+        logger_name=logger.strip() or None,
+        since=parse_log_filter_time(since),
+        until=parse_log_filter_time(until),
+        contains=q.strip() or None,
+        cursor=cursor or None
+    )
+
+    log_filters = {"max_lines": max_lines, "level": level, "logger": logger, "since": since, "until": until, "q": q}
+    next_page_url = None
+    if log_page["next_cursor"]:
+        next_page_url = "/admin/error-logs?" + urlencode({**log_filters, "cursor": log_page["next_cursor"]})
 
     log_max_size = db.query(Setting).filter(Setting.key == "log_max_size_mb").first()
     log_backup_count = db.query(Setting).filter(Setting.key == "log_backup_count").first()
@@ -244,7 +311,10 @@ async def view_error_logs(
         "admin/error_logs.html",
         {
             "request": request,
-            "log_lines": log_lines,
+            "log_records": log_page["records"],
+            "log_filters": log_filters,
+            "log_paged": bool(cursor),
+            "next_page_url": next_page_url,
             "log_stats": log_stats,
             "log_max_size_mb": int(log_max_size.value) if log_max_size else 10,
             "log_backup_count": int(log_backup_count.value) if log_backup_count else 5,
@@ -254,6 +324,68 @@ async def view_error_logs(
         }
     )
 
+@router.get("/admin/performance", response_class=HTMLResponse)
+async def view_performance(
+    request: Request,
+    current_user: User = Depends(get_current_admin_user)
+):
+    return templates.TemplateResponse(
+        "admin/performance.html",
+        {
+            "request": request,
+            "routes": perf_stats.get_route_stats(),
+            "flagged": perf_stats.get_flagged_requests(),
+            "bucket_labels": perf_stats.bucket_labels(),
+            "started_at": datetime.fromtimestamp(perf_stats.stats_started_at()).strftime("%Y-%m-%d %H:%M:%S"),
+            "query_threshold": perf_stats.PERF_QUERY_THRESHOLD,
+            "slow_request_ms": perf_stats.PERF_SLOW_REQUEST_MS,
+            "samples_per_route": perf_stats.PERF_SAMPLES_PER_ROUTE,
+            "current_user": current_user
+        }
+    )
+
+@router.post("/admin/performance/reset")
+async def reset_performance(
+    current_user: User = Depends(get_current_admin_user)
+):
+    perf_stats.reset_stats()
+    return RedirectResponse(url="/admin/performance", status_code=302)
+
+@router.get("/admin/profiles", response_class=HTMLResponse)
+async def view_profiles(
+    request: Request,
+    current_user: User = Depends(get_current_admin_user)
+):
+    profiles = await run_in_threadpool(list_profiles)
+    return templates.TemplateResponse(
+        "admin/profiles.html",
+        {
+            "request": request,
+            "profiles": profiles,
+            "current_user": current_user
+        }
+    )
+
+@router.get("/admin/profiles/{name}", response_class=HTMLResponse)
+async def view_profile(
+    name: str,
+    request: Request,
+    current_user: User = Depends(get_current_admin_user)
+):
+    profile = read_profile(name)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return templates.TemplateResponse(
+        "admin/profile_detail.html",
+        {
+            "request": request,
+            "name": name,
+            "profile": profile,
+            "current_user": current_user
+        }
+    )
+
 @router.post("/admin/settings/log-rotation")
 async def update_log_rotation(
     log_max_size_mb: int = Form(...),
@@ -268,27 +400,10 @@ async def update_log_rotation(
         if log_backup_count < 1 or log_backup_count > 20:
             raise HTTPException(status_code=400, detail="Backup count must be between 1 and 20")
 
-        size_setting = db.query(Setting).filter(Setting.key == "log_max_size_mb").first()
-        if size_setting:
-            size_setting.value = str(log_max_size_mb)
-        else:
-            db.add(Setting(
-                key="log_max_size_mb",
-                value=str(log_max_size_mb),
-                description="Maximum size of log file in MB before rotation"
-            ))
-
-        count_setting = db.query(Setting).filter(Setting.key == "log_backup_count").first()
-        if count_setting:
-            count_setting.value = str(log_backup_count)
-        else:
-            db.add(Setting(
-                key="log_backup_count",
-                value=str(log_backup_count),
-                description="Number of rotated log files to keep"
-            ))
-
-        db.commit()
+        await save_settings(
+            setting_upsert("log_max_size_mb", str(log_max_size_mb), "Maximum size of log file in MB before rotation"),
+            setting_upsert("log_backup_count", str(log_backup_count), "Number of rotated log files to keep")
+        )
 
         return RedirectResponse(url="/admin/error-logs?settings_updated=true", status_code=302)
     except HTTPException:
@@ -306,27 +421,10 @@ async def update_log_levels(
     from app.utils.logging_config import reconfigure_logging
 
     try:
-        info_setting = db.query(Setting).filter(Setting.key == "log_capture_info").first()
-        if info_setting:
-            info_setting.value = "1" if log_capture_info else "0"
-        else:
-            db.add(Setting(
-                key="log_capture_info",
-                value="1" if log_capture_info else "0",
-                description="Capture INFO level logs"
-            ))
-
-        debug_setting = db.query(Setting).filter(Setting.key == "log_capture_debug").first()
-        if debug_setting:
-            debug_setting.value = "1" if log_capture_debug else "0"
-        else:
-            db.add(Setting(
-                key="log_capture_debug",
-                value="1" if log_capture_debug else "0",
-                description="Capture DEBUG level logs"
-            ))
-
-        db.commit()
+        await save_settings(
+            setting_upsert("log_capture_info", "1" if log_capture_info else "0", "Capture INFO level logs"),
+            setting_upsert("log_capture_debug", "1" if log_capture_debug else "0", "Capture DEBUG level logs")
+        )
 
         reconfigure_logging()
 
@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db, database_exists
 from app.models import User
 from app.auth.jwt_handler import (
-    authenticate_user,
-    create_access_token,
-    get_password_hash,
-    get_current_user_from_cookie
+    authenticate_user_async,
+    create_user_access_token,
+    get_password_hash_async,
+    get_current_user_from_cookie,
+    PasswordHashBusy
 )
+from app.auth.login_throttle import login_throttle
 from app.utils.slugify import create_slug, ensure_unique_slug
 from app.utils.version import check_version
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request, db: Session = Depends(get_db)):
@@ -23,22 +24,45 @@ async def login_page(request: Request, db: Session = Depends(get_db)):
         return RedirectResponse(url="/", status_code=302)
 
     if not database_exists() or db.query(User).count() == 0:
-        version, update_available = check_version()
-        return templates.TemplateResponse("setup.html", {
+        return setup_page_response(request)
+
+    version, update_available = check_version()
+    return templates.TemplateResponse(
+        "login.html",
+        {
+            "request": request,
+            "error": None,
+            "version": version,
+            "update_available": update_available
+        }
+    )
+
+def setup_page_response(request: Request, error: str = None, status_code: int = 200, headers: dict = None):
+    version, update_available = check_version()
+    return templates.TemplateResponse(
+        "setup.html",
+        {
             "request": request,
+            "error": error,
             "version": version,
             "update_available": update_available
-        })
+        },
+        status_code=status_code,
+        headers=headers
+    )
 
+def login_error_response(request: Request, error: str, status_code: int = 200, headers: dict = None):
     version, update_available = check_version()
     return templates.TemplateResponse(
         "login.html",
         {
             "request": request,
-            "error": None,
+            "error": error,
             "version": version,
             "update_available": update_available
-        }
+        },
+        status_code=status_code,
+        headers=headers
     )
 
 @router.post("/login")
@@ -48,20 +72,35 @@ async def login(
     password: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    user = authenticate_user(db, username, password)
-    if not user:
-        version, update_available = check_version()
-        return templates.TemplateResponse(
-            "login.html",
-            {
-                "request": request,
-                "error": "Invalid username or password",
-                "version": version,
-                "update_available": update_available
-            }
+    # uvicorn takes the client from X-Forwarded-For when the proxy's address
+    # is listed in FORWARDED_ALLOW_IPS; otherwise this is the proxy's IP
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_throttle.check(client_ip, username)
+    if retry_after:
+        return login_error_response(
+            request,
+            f"Too many login attempts. Try again in {retry_after} seconds.",
+            status_code=429,
+            headers={"Retry-After": str(retry_after)}
         )
 
-    access_token = create_access_token(data={"sub": user.username})
+    try:
+        user = await authenticate_user_async(db, username, password)
+    except PasswordHashBusy:
+        return login_error_response(
+            request,
+            "The server is busy. Please try again in a moment.",
+            status_code=503,
+            headers={"Retry-After": "5"}
+        )
+
+    if not user:
+        login_throttle.record_failure(username)
+        return login_error_response(request, "Invalid username or password")
+
+    login_throttle.record_success(username)
+
+    access_token = create_user_access_token(user)
     response = RedirectResponse(url="/", status_code=302)
     response.set_cookie(key="access_token", value=access_token, httponly=True)
     return response
@@ -77,11 +116,21 @@ async def setup_admin(
     if db.query(User).count() > 0:
         raise HTTPException(status_code=400, detail="Setup already completed")
 
+    try:
+        password_hash = await get_password_hash_async(password)
+    except PasswordHashBusy:
+        return setup_page_response(
+            request,
+            "The server is busy. Please try again in a moment.",
+            status_code=503,
+            headers={"Retry-After": "5"}
+        )
+
     slug = ensure_unique_slug(db, User, create_slug(username))
 
     new_user = User(
         username=username,
-        password_hash=get_password_hash(password),
+        password_hash=password_hash,
         slug=slug,
         email=email if email else None,
         is_admin=True
@@ -89,7 +138,7 @@ async def setup_admin(
     db.add(new_user)
     db.commit()
 
-    access_token = create_access_token(data={"sub": new_user.username})
+    access_token = create_user_access_token(new_user)
     response = RedirectResponse(url="/", status_code=302)
     response.set_cookie(key="access_token", value=access_token, httponly=True)
     return response
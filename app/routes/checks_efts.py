@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
@@ -8,9 +7,10 @@ from pydantic import BaseModel
 from app.database import get_db
 from app.models import User, CheckPayee, EFTCardNumber, EFTPayee, DailyBalanceCheck, DailyBalanceEFT, ScheduledCheck, ScheduledEFT
 from app.auth.jwt_handler import get_current_user, get_current_user_from_cookie
+from app.services.schedule_index import WEEKDAY_NUMBERS, get_scheduled_checks_for_weekday, get_scheduled_efts_for_weekday
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 class CheckPayeeCreate(BaseModel):
     name: str
@@ -535,20 +535,15 @@ async def get_scheduled_checks_for_day(
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    checks = db.query(ScheduledCheck).filter(ScheduledCheck.is_active == True).all()
-    matching_checks = []
+    if day_of_week not in WEEKDAY_NUMBERS:
+        return []
 
-    for check in checks:
-        days = check.days_of_week if check.days_of_week else []
-        if day_of_week in days:
-            matching_checks.append({
-                "check_number": check.check_number,
-                "payable_to": check.payable_to,
-                "total": check.default_total,
-                "memo": check.memo
-            })
-
-    return matching_checks
+    return [{
+        "check_number": check.check_number,
+        "payable_to": check.payable_to,
+        "total": check.default_total,
+        "memo": check.memo
+    } for check in get_scheduled_checks_for_weekday(db, WEEKDAY_NUMBERS[day_of_week])]
 
 @router.get("/api/scheduled-efts-for-day")
 async def get_scheduled_efts_for_day(
@@ -559,17 +554,12 @@ async def get_scheduled_efts_for_day(
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    efts = db.query(ScheduledEFT).filter(ScheduledEFT.is_active == True).all()
-    matching_efts = []
+    if day_of_week not in WEEKDAY_NUMBERS:
+        return []
 
-    for eft in efts:
-        days = eft.days_of_week if eft.days_of_week else []
-        if day_of_week in days:
-            matching_efts.append({
-                "card_number": eft.card_number,
-                "payable_to": eft.payable_to,
-                "total": eft.default_total,
-                "memo": eft.memo
-            })
-
-    return matching_efts
+    return [{
+        "card_number": eft.card_number,
+        "payable_to": eft.payable_to,
+        "total": eft.default_total,
+        "memo": eft.memo
+    } for eft in get_scheduled_efts_for_weekday(db, WEEKDAY_NUMBERS[day_of_week])]
@@ -1,53 +1,194 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse, FileResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import text
-from datetime import date as date_cls, datetime
-from typing import List, Optional
+from datetime import date as date_cls, datetime, timedelta
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
 import os
 from app.database import get_db
-from app.models import User, Employee, DailyBalance, DailyEmployeeEntry, FinancialLineItemTemplate, DailyFinancialLineItem, Position, EmployeePositionSchedule, DailyBalanceCheck, DailyBalanceEFT, ScheduledCheck, ScheduledEFT
+from app.models import User, Employee, DailyBalance, DailyEmployeeEntry, FinancialLineItemTemplate, DailyFinancialLineItem, Position, EmployeePositionSchedule, DailyBalanceCheck, DailyBalanceEFT
 from app.auth.jwt_handler import get_current_user
 from app.utils.csv_generator import generate_daily_balance_csv
+from app.services.daily_balance_prefill import prefill_daily_balances
+from app.services.schedule_index import get_scheduled_combo_keys, get_scheduled_rosters, scheduled_entries_for_date, MAX_ROSTER_DAYS
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
-def format_decimal(value, decimals=2):
-    """Format a number to a fixed number of decimal places."""
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Amounts arrive as typed into the form inputs, so strings are accepted as well
+Amount = Optional[Union[float, str]]
+
+class EmployeeEntryUpdate(BaseModel):
+    tip_values: Dict[str, Amount] = {}
+
+class LineItemUpdate(BaseModel):
+    value: Amount = None
+
+class NotesUpdate(BaseModel):
+    notes: str = ""
+
+class CheckEntry(BaseModel):
+    check_number: Optional[str] = None
+    date: Optional[str] = None
+    payable_to: Optional[str] = None
+    total: Amount = None
+    memo: Optional[str] = None
+
+class EFTEntry(BaseModel):
+    date: Optional[str] = None
+    card_number: Optional[str] = None
+    payable_to: Optional[str] = None
+    total: Amount = None
+    memo: Optional[str] = None
+
+class ChecksEftsUpdate(BaseModel):
+    checks: List[CheckEntry] = []
+    efts: List[EFTEntry] = []
+
+def parse_amount(value_str, label: str):
+    """Round a submitted amount to cents; a blank or non-numeric value is a 400 naming label."""
+    if value_str is None or value_str == '' or value_str == 'null':
+        raise HTTPException(
+            status_code=400,
+            detail=f"{label} cannot be blank. Enter 0 if the value is zero."
+        )
+
     try:
-        return f"{float(value):.{decimals}f}"
+        return round(float(value_str), 2)
     except (ValueError, TypeError):
-        return value
-
-templates.env.filters["format_decimal"] = format_decimal
+        raise HTTPException(
+            status_code=400,
+            detail=f"{label} must be a valid number."
+        )
 
-DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+def parse_tip_values(employee: Employee, position: Position, get_value):
+    """
+    Tip values for one employee/position combo.
 
-def is_employee_scheduled_for_date(schedule: EmployeePositionSchedule, target_date: date_cls, day_of_week: str) -> bool:
+    get_value(field_name) returns the submitted value of a tip requirement.
+    Every input requirement must be a number; total requirements are the sum
+    of the other non-record inputs, deductions subtracted.
     """
-    Check if an employee is scheduled for a specific date.
+    tip_values = {}
 
-    Args:
-        schedule: EmployeePositionSchedule object
-        target_date: The target date to check
-        day_of_week: Day name (e.g., 'Monday')
+    for req in position.tip_requirements:
+        if not req.no_input and not req.is_total:
+            tip_values[req.field_name] = parse_amount(
+                get_value(req.field_name),
+                f"Employee '{employee.display_name}' - '{req.name}'"
+            )
 
-    Returns:
-        True if employee is scheduled, False otherwise
-    """
-    schedule_type = schedule.schedule_type or 'recurring'
+        elif req.is_total:
+            total = 0
+            for other_req in position.tip_requirements:
+                if not other_req.no_input and not other_req.is_total and not other_req.record_data:
+                    value_str = get_value(other_req.field_name)
+
+                    if value_str is None or value_str == '' or value_str == 'null':
+                        value = 0.0
+                    else:
+                        try:
+                            value = float(value_str)
+                        except (ValueError, TypeError):
+                            value = 0.0
+                    if other_req.is_deduction:
+                        total -= value
+                    else:
+                        total += value
+            tip_values[req.field_name] = round(total, 2)
+
+    return tip_values
 
-    if schedule_type == 'recurring':
-        days_of_week = schedule.days_of_week or []
-        return day_of_week in days_of_week
-    elif schedule_type == 'calendar':
-        specific_dates = schedule.specific_dates or []
-        target_date_str = target_date.strftime('%Y-%m-%d')
-        return target_date_str in specific_dates
+def employee_tip_line_items(daily_balance_id: int, employee: Employee, position: Position, tip_values: dict, display_order: int):
+    """Revenue/expense line items for a combo's non-zero tips, numbered after display_order."""
+    line_items = []
 
-    return False
+    for req in position.tip_requirements:
+        if req.no_input or req.is_total:
+            continue
+        value = tip_values.get(req.field_name, 0)
+
+        if req.apply_to_revenue and value != 0:
+            display_order += 1
+            line_items.append(DailyFinancialLineItem(
+                daily_balance_id=daily_balance_id,
+                template_id=None,
+                name=f"{employee.display_name} ({position.name}) - {req.name}",
+                category="revenue",
+                value=value if not req.revenue_is_deduction else -value,
+                display_order=display_order,
+                is_employee_tip=True,
+                employee_id=employee.id,
+                employee_name_snapshot=employee.display_name
+            ))
+
+        if req.apply_to_expense and value != 0:
+            display_order += 1
+            line_items.append(DailyFinancialLineItem(
+                daily_balance_id=daily_balance_id,
+                template_id=None,
+                name=f"{employee.display_name} ({position.name}) - {req.name}",
+                category="expense",
+                value=value if not req.expense_is_deduction else -value,
+                display_order=display_order,
+                is_employee_tip=True,
+                employee_id=employee.id,
+                employee_name_snapshot=employee.display_name
+            ))
+
+    return line_items
+
+def daily_balance_check(daily_balance_id: int, check_number, check_date, payable_to, total, memo):
+    """A DailyBalanceCheck from submitted values, or None if date, payee or a numeric total is missing."""
+    check_number = str(check_number or "").strip()
+    check_date = str(check_date or "").strip()
+    payable_to = str(payable_to or "").strip()
+    total_str = str(total if total is not None else "").strip()
+    memo = str(memo or "").strip()
+
+    if not (check_date and payable_to and total_str):
+        return None
+    try:
+        check_total = round(float(total_str), 2)
+    except (ValueError, TypeError):
+        return None
+
+    return DailyBalanceCheck(
+        daily_balance_id=daily_balance_id,
+        check_number=check_number if check_number else None,
+        date=check_date,
+        payable_to=payable_to,
+        total=check_total,
+        memo=memo if memo else None
+    )
+
+def daily_balance_eft(daily_balance_id: int, eft_date, card_number, payable_to, total, memo):
+    """A DailyBalanceEFT from submitted values, or None if date, payee or a numeric total is missing."""
+    eft_date = str(eft_date or "").strip()
+    card_number = str(card_number or "").strip()
+    payable_to = str(payable_to or "").strip()
+    total_str = str(total if total is not None else "").strip()
+    memo = str(memo or "").strip()
+
+    if not (eft_date and payable_to and total_str):
+        return None
+    try:
+        eft_total = round(float(total_str), 2)
+    except (ValueError, TypeError):
+        return None
+
+    return DailyBalanceEFT(
+        daily_balance_id=daily_balance_id,
+        date=eft_date,
+        card_number=card_number if card_number else None,
+        payable_to=payable_to,
+        total=eft_total,
+        memo=memo if memo else None
+    )
 
 def save_daily_balance_data(
     db: Session,
@@ -105,22 +246,10 @@ def save_daily_balance_data(
     ).all()
 
     for template in financial_templates:
-        value_key = f"financial_item_{template.id}"
-        value_str = form_data.get(value_key)
-
-        if value_str is None or value_str == '' or value_str == 'null':
-            raise HTTPException(
-                status_code=400,
-                detail=f"Financial item '{template.name}' cannot be blank. Enter 0 if the value is zero."
-            )
-
-        try:
-            value = round(float(value_str), 2)
-        except (ValueError, TypeError):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Financial item '{template.name}' must be a valid number."
-            )
+        value = parse_amount(
+            form_data.get(f"financial_item_{template.id}"),
+            f"Financial item '{template.name}'"
+        )
 
         line_item = DailyFinancialLineItem(
             daily_balance_id=daily_balance.id,
@@ -153,77 +282,14 @@ def save_daily_balance_data(
         if not employee or not position:
             continue
 
-        tip_values = {}
-
-        for req in position.tip_requirements:
-            if not req.no_input and not req.is_total:
-                field_key = f"tip_{req.field_name}_{combo}"
-                value_str = form_data.get(field_key)
-
-                if value_str is None or value_str == '' or value_str == 'null':
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Employee '{employee.display_name}' - '{req.name}' cannot be blank. Enter 0 if the value is zero."
-                    )
-
-                try:
-                    value = round(float(value_str), 2)
-                except (ValueError, TypeError):
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Employee '{employee.display_name}' - '{req.name}' must be a valid number."
-                    )
-                tip_values[req.field_name] = value
-
-                if req.apply_to_revenue and value != 0:
-                    max_order += 1
-                    tip_line_item = DailyFinancialLineItem(
-                        daily_balance_id=daily_balance.id,
-                        template_id=None,
-                        name=f"{employee.display_name} ({position.name}) - {req.name}",
-                        category="revenue",
-                        value=value if not req.revenue_is_deduction else -value,
-                        display_order=max_order,
-                        is_employee_tip=True,
-                        employee_id=emp_id,
-                        employee_name_snapshot=employee.display_name
-                    )
-                    db.add(tip_line_item)
-
-                if req.apply_to_expense and value != 0:
-                    max_order += 1
-                    tip_line_item = DailyFinancialLineItem(
-                        daily_balance_id=daily_balance.id,
-                        template_id=None,
-                        name=f"{employee.display_name} ({position.name}) - {req.name}",
-                        category="expense",
-                        value=value if not req.expense_is_deduction else -value,
-                        display_order=max_order,
-                        is_employee_tip=True,
-                        employee_id=emp_id,
-                        employee_name_snapshot=employee.display_name
-                    )
-                    db.add(tip_line_item)
-
-            elif req.is_total:
-                total = 0
-                for other_req in position.tip_requirements:
-                    if not other_req.no_input and not other_req.is_total and not other_req.record_data:
-                        field_key = f"tip_{other_req.field_name}_{combo}"
-                        value_str = form_data.get(field_key)
-
-                        if value_str is None or value_str == '' or value_str == 'null':
-                            value = 0.0
-                        else:
-                            try:
-                                value = float(value_str)
-                            except (ValueError, TypeError):
-                                value = 0.0
-                        if other_req.is_deduction:
-                            total -= value
-                        else:
-                            total += value
-                tip_values[req.field_name] = round(total, 2)
+        tip_values = parse_tip_values(
+            employee, position,
+            lambda field_name: form_data.get(f"tip_{field_name}_{combo}")
+        )
+
+        for tip_line_item in employee_tip_line_items(daily_balance.id, employee, position, tip_values, max_order):
+            max_order += 1
+            db.add(tip_line_item)
 
         entry = DailyEmployeeEntry(
             daily_balance_id=daily_balance.id,
@@ -246,26 +312,15 @@ def save_daily_balance_data(
             check_indices.append(index)
 
     for index in check_indices:
-        check_number = form_data.get(f"check_number_{index}", "").strip()
-        check_date = form_data.get(f"check_date_{index}", "").strip()
-        check_payable_to = form_data.get(f"check_payable_to_{index}", "").strip()
-        check_total_str = form_data.get(f"check_total_{index}", "").strip()
-        check_memo = form_data.get(f"check_memo_{index}", "").strip()
-
-        if check_date and check_payable_to and check_total_str:
-            try:
-                check_total = round(float(check_total_str), 2)
-            except (ValueError, TypeError):
-                continue
-
-            check = DailyBalanceCheck(
-                daily_balance_id=daily_balance.id,
-                check_number=check_number if check_number else None,
-                date=check_date,
-                payable_to=check_payable_to,
-                total=check_total,
-                memo=check_memo if check_memo else None
-            )
+        check = daily_balance_check(
+            daily_balance.id,
+            form_data.get(f"check_number_{index}", ""),
+            form_data.get(f"check_date_{index}", ""),
+            form_data.get(f"check_payable_to_{index}", ""),
+            form_data.get(f"check_total_{index}", ""),
+            form_data.get(f"check_memo_{index}", "")
+        )
+        if check:
             db.add(check)
 
     for eft in daily_balance.efts:
@@ -279,26 +334,15 @@ def save_daily_balance_data(
             eft_indices.append(index)
 
     for index in eft_indices:
-        eft_date = form_data.get(f"eft_date_{index}", "").strip()
-        eft_card_number = form_data.get(f"eft_card_number_{index}", "").strip()
-        eft_payable_to = form_data.get(f"eft_payable_to_{index}", "").strip()
-        eft_total_str = form_data.get(f"eft_total_{index}", "").strip()
-        eft_memo = form_data.get(f"eft_memo_{index}", "").strip()
-
-        if eft_date and eft_payable_to and eft_total_str:
-            try:
-                eft_total = round(float(eft_total_str), 2)
-            except (ValueError, TypeError):
-                continue
-
-            eft = DailyBalanceEFT(
-                daily_balance_id=daily_balance.id,
-                date=eft_date,
-                card_number=eft_card_number if eft_card_number else None,
-                payable_to=eft_payable_to,
-                total=eft_total,
-                memo=eft_memo if eft_memo else None
-            )
+        eft = daily_balance_eft(
+            daily_balance.id,
+            form_data.get(f"eft_date_{index}", ""),
+            form_data.get(f"eft_card_number_{index}", ""),
+            form_data.get(f"eft_payable_to_{index}", ""),
+            form_data.get(f"eft_total_{index}", ""),
+            form_data.get(f"eft_memo_{index}", "")
+        )
+        if eft:
             db.add(eft)
 
     db.commit()
@@ -348,6 +392,38 @@ def serialize_employee_position_combo(emp, position, db, status_indicator=None):
         "status_indicator": status_indicator
     }
 
+def combo_sort_key(combo):
+    return (combo["position_name_sort_key"], combo["display_name_sort_key"])
+
+def get_schedule_combos(db: Session, target_date: date_cls):
+    """
+    Build the employee/position combos for the daily balance form.
+
+    Returns (all_combos, scheduled_combos): every active employee's assigned
+    positions, and the subset scheduled on target_date according to the
+    schedule index.
+    """
+    all_schedules = db.query(EmployeePositionSchedule).join(Employee).filter(
+        Employee.is_active == True
+    ).options(
+        joinedload(EmployeePositionSchedule.employee),
+        joinedload(EmployeePositionSchedule.position).selectinload(Position.tip_requirements)
+    ).all()
+    scheduled_keys = get_scheduled_combo_keys(db, target_date)
+
+    all_combos = []
+    scheduled_combos = []
+    seen_scheduled = set()
+    for schedule in all_schedules:
+        combo = serialize_employee_position_combo(schedule.employee, schedule.position, db)
+        all_combos.append(combo)
+        key = (schedule.employee_id, schedule.position_id)
+        if key in scheduled_keys and key not in seen_scheduled:
+            seen_scheduled.add(key)
+            scheduled_combos.append(combo)
+
+    return sorted(all_combos, key=combo_sort_key), sorted(scheduled_combos, key=combo_sort_key)
+
 def serialize_employee_position_from_snapshot(entry, db):
     """
     Serialize an employee position combo using snapshot data when the employee or position has been deleted.
@@ -428,38 +504,16 @@ def serialize_employee_position_from_snapshot(entry, db):
         "status_indicator": status_indicator
     }
 
-@router.get("/daily-balance", response_class=HTMLResponse)
-async def daily_balance_page(
-    request: Request,
-    selected_date: Optional[str] = None,
-    date: Optional[str] = None,
-    edit: Optional[bool] = False,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    date_param = selected_date or date
-    if date_param:
-        target_date = datetime.strptime(date_param, "%Y-%m-%d").date()
-    else:
-        target_date = date_cls.today()
-
-    day_of_week = DAYS_OF_WEEK[target_date.weekday()]
+def daily_balance_form_context(db: Session, target_date: date_cls):
+    """
+    The data the daily balance form shows for target_date.
 
+    Days without a daily balance start from the schedule: scheduled
+    employees, checks and EFTs. Used by the HTML form and the JSON form API.
+    """
     daily_balance = db.query(DailyBalance).filter(DailyBalance.date == target_date).first()
 
-    all_schedules = db.query(EmployeePositionSchedule).join(Employee).filter(Employee.is_active == True).all()
-    all_employee_position_combos = []
-    for schedule in all_schedules:
-        all_employee_position_combos.append(serialize_employee_position_combo(schedule.employee, schedule.position, db))
-
-    all_employee_position_combos = sorted(all_employee_position_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
-
-    scheduled_combos = []
-    for schedule in all_schedules:
-        if is_employee_scheduled_for_date(schedule, target_date, day_of_week):
-            scheduled_combos.append(serialize_employee_position_combo(schedule.employee, schedule.position, db))
-
-    scheduled_combos = sorted(scheduled_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
+    all_employee_position_combos, scheduled_combos = get_schedule_combos(db, target_date)
 
     employee_entries = {}
     if daily_balance:
@@ -483,7 +537,7 @@ async def daily_balance_page(
     else:
         working_combos = scheduled_combos
 
-    working_combos = sorted(working_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
+    working_combos = sorted(working_combos, key=combo_sort_key)
 
     working_combo_ids = [combo["combo_id"] for combo in working_combos]
 
@@ -497,7 +551,6 @@ async def daily_balance_page(
         for item in daily_balance.financial_line_items:
             financial_line_items[f"{item.category}_{item.template_id or item.id}"] = item
 
-    from datetime import timedelta
     previous_date = target_date - timedelta(days=1)
     previous_daily_balance = db.query(DailyBalance).filter(DailyBalance.date == previous_date).first()
 
@@ -518,54 +571,94 @@ async def daily_balance_page(
         existing_checks = daily_balance.checks
         existing_efts = daily_balance.efts
     else:
-        scheduled_checks = db.query(ScheduledCheck).filter(ScheduledCheck.is_active == True).all()
-        for scheduled_check in scheduled_checks:
-            days = scheduled_check.days_of_week if scheduled_check.days_of_week else []
-            if day_of_week in days:
-                check_data = type('obj', (object,), {
-                    'date': target_date,
-                    'check_number': scheduled_check.check_number,
-                    'payable_to': scheduled_check.payable_to,
-                    'total': scheduled_check.default_total,
-                    'memo': scheduled_check.memo
-                })
-                existing_checks.append(check_data)
-
-        scheduled_efts = db.query(ScheduledEFT).filter(ScheduledEFT.is_active == True).all()
-        for scheduled_eft in scheduled_efts:
-            days = scheduled_eft.days_of_week if scheduled_eft.days_of_week else []
-            if day_of_week in days:
-                eft_data = type('obj', (object,), {
-                    'date': target_date,
-                    'card_number': scheduled_eft.card_number,
-                    'payable_to': scheduled_eft.payable_to,
-                    'total': scheduled_eft.default_total,
-                    'memo': scheduled_eft.memo
-                })
-                existing_efts.append(eft_data)
+        existing_checks, existing_efts = scheduled_entries_for_date(db, target_date)
+
+    return {
+        "target_date": target_date,
+        "day_of_week": DAYS_OF_WEEK[target_date.weekday()],
+        "daily_balance": daily_balance,
+        "all_employees": all_employee_position_combos,
+        "working_employees": working_combos,
+        "working_employee_ids": working_combo_ids,
+        "employee_entries": employee_entries,
+        "scheduled_employees": scheduled_combos,
+        "financial_templates": templates_list,
+        "financial_line_items": financial_line_items,
+        "previous_ending_till": previous_ending_till,
+        "existing_checks": existing_checks,
+        "existing_efts": existing_efts
+    }
+
+@router.get("/daily-balance", response_class=HTMLResponse)
+async def daily_balance_page(
+    request: Request,
+    selected_date: Optional[str] = None,
+    date: Optional[str] = None,
+    edit: Optional[bool] = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    date_param = selected_date or date
+    if date_param:
+        target_date = datetime.strptime(date_param, "%Y-%m-%d").date()
+    else:
+        target_date = date_cls.today()
 
     return templates.TemplateResponse(
         "daily_balance/form.html",
         {
             "request": request,
             "current_user": current_user,
-            "target_date": target_date,
-            "day_of_week": day_of_week,
-            "daily_balance": daily_balance,
-            "all_employees": all_employee_position_combos,
-            "working_employees": working_combos,
-            "working_employee_ids": working_combo_ids,
-            "employee_entries": employee_entries,
-            "scheduled_employees": scheduled_combos,
             "edit_mode": edit,
-            "financial_templates": templates_list,
-            "financial_line_items": financial_line_items,
-            "previous_ending_till": previous_ending_till,
-            "existing_checks": existing_checks,
-            "existing_efts": existing_efts
+            **daily_balance_form_context(db, target_date)
         }
     )
 
+@router.get("/api/schedule/roster")
+async def schedule_roster(
+    start: str,
+    end: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Scheduled employee/position combos, checks and EFTs for every date in [start, end]."""
+    try:
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="End date must not be before start date")
+    if (end_date - start_date).days + 1 > MAX_ROSTER_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_ROSTER_DAYS} days")
+
+    return get_scheduled_rosters(db, start_date, end_date)
+
+@router.post("/daily-balance/prefill")
+async def prefill_daily_balance_range(
+    start_date: str = Form(...),
+    end_date: str = Form(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create draft daily balances for every date in the range that has none yet."""
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+
+    try:
+        summary = await run_in_threadpool(prefill_daily_balances, db, start, end, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return RedirectResponse(
+        url=f"/daily-balance?selected_date={start}&prefilled={len(summary['created'])}&skipped={summary['skipped']}",
+        status_code=302
+    )
+
 @router.post("/daily-balance/save")
 async def save_daily_balance_route(
     request: Request,
@@ -582,98 +675,14 @@ async def save_daily_balance_route(
         save_daily_balance_data(db, date_obj, day_of_week, form_data, finalized=False, current_user=current_user, source="user")
         return RedirectResponse(url=f"/daily-balance?selected_date={target_date}", status_code=302)
     except HTTPException as e:
-        all_schedules = db.query(EmployeePositionSchedule).join(Employee).filter(Employee.is_active == True).all()
-        all_employee_position_combos = []
-        for schedule in all_schedules:
-            all_employee_position_combos.append(serialize_employee_position_combo(schedule.employee, schedule.position, db))
-
-        all_employee_position_combos = sorted(all_employee_position_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
-
-        scheduled_combos = []
-        for schedule in all_schedules:
-            if is_employee_scheduled_for_date(schedule, date_obj, day_of_week):
-                scheduled_combos.append(serialize_employee_position_combo(schedule.employee, schedule.position, db))
-
-        scheduled_combos = sorted(scheduled_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
-
-        daily_balance = db.query(DailyBalance).filter(DailyBalance.date == date_obj).first()
-        employee_entries = {}
-        if daily_balance:
-            for entry in daily_balance.employee_entries:
-                combo_key = f"{entry.employee_id}-{entry.position_id}"
-                employee_entries[combo_key] = entry
-
-        working_combos = []
-        if daily_balance:
-            for entry in daily_balance.employee_entries:
-                # If employee and position still exist, use live data
-                if entry.employee and entry.position:
-                    # Check if employee is inactive
-                    if not entry.employee.is_active:
-                        working_combos.append(serialize_employee_position_combo(entry.employee, entry.position, db, status_indicator="(Inactive)"))
-                    else:
-                        working_combos.append(serialize_employee_position_combo(entry.employee, entry.position, db))
-                else:
-                    # Employee or position was deleted - use snapshot data
-                    working_combos.append(serialize_employee_position_from_snapshot(entry, db))
-        else:
-            working_combos = scheduled_combos
-
-        working_combos = sorted(working_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
-
-        working_combo_ids = [combo["combo_id"] for combo in working_combos]
-
-        templates_list = db.query(FinancialLineItemTemplate).order_by(
-            FinancialLineItemTemplate.category,
-            FinancialLineItemTemplate.display_order
-        ).all()
-
-        financial_line_items = {}
-        if daily_balance:
-            for item in daily_balance.financial_line_items:
-                financial_line_items[f"{item.category}_{item.template_id or item.id}"] = item
-
-        from datetime import timedelta
-        previous_date = date_obj - timedelta(days=1)
-        previous_daily_balance = db.query(DailyBalance).filter(DailyBalance.date == previous_date).first()
-
-        previous_ending_till = 0.0
-        if previous_daily_balance:
-            for item in previous_daily_balance.financial_line_items:
-                if item.template_id:
-                    template = db.query(FinancialLineItemTemplate).filter(
-                        FinancialLineItemTemplate.id == item.template_id
-                    ).first()
-                    if template and template.is_ending_till:
-                        previous_ending_till = item.value
-                        break
-
-        existing_checks = []
-        existing_efts = []
-        if daily_balance:
-            existing_checks = daily_balance.checks
-            existing_efts = daily_balance.efts
-
         return templates.TemplateResponse(
             "daily_balance/form.html",
             {
                 "request": request,
                 "current_user": current_user,
-                "target_date": date_obj,
-                "day_of_week": day_of_week,
-                "daily_balance": daily_balance,
-                "all_employees": all_employee_position_combos,
-                "working_employees": working_combos,
-                "working_employee_ids": working_combo_ids,
-                "employee_entries": employee_entries,
-                "scheduled_employees": scheduled_combos,
                 "edit_mode": False,
-                "financial_templates": templates_list,
-                "financial_line_items": financial_line_items,
-                "previous_ending_till": previous_ending_till,
-                "existing_checks": existing_checks,
-                "existing_efts": existing_efts,
-                "error": e.detail
+                "error": e.detail,
+                **daily_balance_form_context(db, date_obj)
             }
         )
 
@@ -694,101 +703,371 @@ async def finalize_daily_balance_route(
         generate_daily_balance_csv(daily_balance, daily_balance.employee_entries, current_user=current_user, source="user")
         return RedirectResponse(url=f"/daily-balance?selected_date={target_date}", status_code=302)
     except HTTPException as e:
-        all_schedules = db.query(EmployeePositionSchedule).join(Employee).filter(Employee.is_active == True).all()
-        all_employee_position_combos = []
-        for schedule in all_schedules:
-            all_employee_position_combos.append(serialize_employee_position_combo(schedule.employee, schedule.position, db))
-
-        all_employee_position_combos = sorted(all_employee_position_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
-
-        scheduled_combos = []
-        for schedule in all_schedules:
-            if is_employee_scheduled_for_date(schedule, date_obj, day_of_week):
-                scheduled_combos.append(serialize_employee_position_combo(schedule.employee, schedule.position, db))
-
-        scheduled_combos = sorted(scheduled_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
-
-        daily_balance = db.query(DailyBalance).filter(DailyBalance.date == date_obj).first()
-        employee_entries = {}
-        if daily_balance:
-            for entry in daily_balance.employee_entries:
-                combo_key = f"{entry.employee_id}-{entry.position_id}"
-                employee_entries[combo_key] = entry
-
-        working_combos = []
-        if daily_balance:
-            for entry in daily_balance.employee_entries:
-                # If employee and position still exist, use live data
-                if entry.employee and entry.position:
-                    # Check if employee is inactive
-                    if not entry.employee.is_active:
-                        working_combos.append(serialize_employee_position_combo(entry.employee, entry.position, db, status_indicator="(Inactive)"))
-                    else:
-                        working_combos.append(serialize_employee_position_combo(entry.employee, entry.position, db))
-                else:
-                    # Employee or position was deleted - use snapshot data
-                    working_combos.append(serialize_employee_position_from_snapshot(entry, db))
-        else:
-            working_combos = scheduled_combos
-
-        working_combos = sorted(working_combos, key=lambda combo: (combo["position_name_sort_key"], combo["display_name_sort_key"]))
-
-        working_combo_ids = [combo["combo_id"] for combo in working_combos]
-
-        templates_list = db.query(FinancialLineItemTemplate).order_by(
-            FinancialLineItemTemplate.category,
-            FinancialLineItemTemplate.display_order
-        ).all()
-
-        financial_line_items = {}
-        if daily_balance:
-            for item in daily_balance.financial_line_items:
-                financial_line_items[f"{item.category}_{item.template_id or item.id}"] = item
-
-        from datetime import timedelta
-        previous_date = date_obj - timedelta(days=1)
-        previous_daily_balance = db.query(DailyBalance).filter(DailyBalance.date == previous_date).first()
-
-        previous_ending_till = 0.0
-        if previous_daily_balance:
-            for item in previous_daily_balance.financial_line_items:
-                if item.template_id:
-                    template = db.query(FinancialLineItemTemplate).filter(
-                        FinancialLineItemTemplate.id == item.template_id
-                    ).first()
-                    if template and template.is_ending_till:
-                        previous_ending_till = item.value
-                        break
-
-        existing_checks = []
-        existing_efts = []
-        if daily_balance:
-            existing_checks = daily_balance.checks
-            existing_efts = daily_balance.efts
-
         return templates.TemplateResponse(
             "daily_balance/form.html",
             {
                 "request": request,
                 "current_user": current_user,
-                "target_date": date_obj,
-                "day_of_week": day_of_week,
-                "daily_balance": daily_balance,
-                "all_employees": all_employee_position_combos,
-                "working_employees": working_combos,
-                "working_employee_ids": working_combo_ids,
-                "employee_entries": employee_entries,
-                "scheduled_employees": scheduled_combos,
                 "edit_mode": False,
-                "financial_templates": templates_list,
-                "financial_line_items": financial_line_items,
-                "previous_ending_till": previous_ending_till,
-                "existing_checks": existing_checks,
-                "existing_efts": existing_efts,
-                "error": e.detail
+                "error": e.detail,
+                **daily_balance_form_context(db, date_obj)
             }
         )
 
+def parse_api_date(value: str):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+
+def parse_combo_id(combo_id: str):
+    try:
+        emp_id, pos_id = combo_id.split('-')
+        return int(emp_id), int(pos_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Employee entries are identified as <employee_id>-<position_id>")
+
+def get_draft_daily_balance(db: Session, date_obj: date_cls, current_user: User):
+    """
+    The draft daily balance the incremental form API edits.
+
+    A day has to be saved as a whole (POST .../save) before rows can be saved
+    one at a time, so a draft never holds half of what the form showed. A
+    finalized day is only edited through the whole-form save, which records
+    who edited it and keeps its CSV in step.
+    """
+    daily_balance = db.query(DailyBalance).filter(DailyBalance.date == date_obj).first()
+    if not daily_balance:
+        raise HTTPException(status_code=404, detail=f"No daily balance for {date_obj}. Save the draft first.")
+    if daily_balance.finalized:
+        raise HTTPException(status_code=409, detail=f"The daily balance for {date_obj} is finalized. Save the whole form to edit it.")
+
+    if not daily_balance.generated_by_user_id and current_user:
+        daily_balance.generated_by_user_id = current_user.id
+        daily_balance.generated_at = datetime.now()
+
+    return daily_balance
+
+def rebuild_employee_tip_line_items(db: Session, daily_balance: DailyBalance):
+    """
+    Replace the day's employee tip line items with ones built from its
+    employee entries, in form order (position, then employee name), as a
+    whole-form save would. Returns the new line items.
+    """
+    db.query(DailyFinancialLineItem).filter(
+        DailyFinancialLineItem.daily_balance_id == daily_balance.id,
+        DailyFinancialLineItem.is_employee_tip == True
+    ).delete(synchronize_session=False)
+
+    entries = db.query(DailyEmployeeEntry).filter(
+        DailyEmployeeEntry.daily_balance_id == daily_balance.id
+    ).all()
+    entries = sorted(
+        [entry for entry in entries if entry.employee and entry.position],
+        key=lambda entry: (entry.position.name, entry.employee.display_name)
+    )
+
+    line_items = []
+    max_order = db.query(FinancialLineItemTemplate).count()
+    for entry in entries:
+        for tip_line_item in employee_tip_line_items(daily_balance.id, entry.employee, entry.position, entry.tip_values or {}, max_order):
+            max_order += 1
+            db.add(tip_line_item)
+            line_items.append(tip_line_item)
+
+    return line_items
+
+def serialize_line_item(item):
+    return {
+        "id": item.id,
+        "template_id": item.template_id,
+        "name": item.name,
+        "category": item.category,
+        "value": item.value,
+        "display_order": item.display_order,
+        "is_employee_tip": item.is_employee_tip,
+        "employee_id": item.employee_id
+    }
+
+def serialize_check(check):
+    return {
+        "check_number": check.check_number,
+        "date": str(check.date),
+        "payable_to": check.payable_to,
+        "total": check.total,
+        "memo": check.memo
+    }
+
+def serialize_eft(eft):
+    return {
+        "date": str(eft.date),
+        "card_number": eft.card_number,
+        "payable_to": eft.payable_to,
+        "total": eft.total,
+        "memo": eft.memo
+    }
+
+def serialize_form_combo(combo):
+    return {key: value for key, value in combo.items() if not key.endswith("_sort_key")}
+
+def daily_balance_form_model(context: dict):
+    """The JSON form model for a daily_balance_form_context() result."""
+    daily_balance = context["daily_balance"]
+    line_items = context["financial_line_items"]
+    employee_entries = context["employee_entries"]
+
+    summary = None
+    employee_tip_items = []
+    if daily_balance:
+        summary = {
+            "id": daily_balance.id,
+            "finalized": bool(daily_balance.finalized),
+            "notes": daily_balance.notes or "",
+            "finalized_at": daily_balance.finalized_at.isoformat() if daily_balance.finalized_at else None,
+            "edited_at": daily_balance.edited_at.isoformat() if daily_balance.edited_at else None
+        }
+        employee_tip_items = sorted(
+            [serialize_line_item(item) for item in daily_balance.financial_line_items if item.is_employee_tip],
+            key=lambda item: item["display_order"]
+        )
+
+    financial_templates = []
+    for template in context["financial_templates"]:
+        item = line_items.get(f"{template.category}_{template.id}")
+        financial_templates.append({
+            "id": template.id,
+            "name": template.name,
+            "category": template.category,
+            "display_order": template.display_order,
+            "is_deduction": template.is_deduction,
+            "is_starting_till": template.is_starting_till,
+            "is_ending_till": template.is_ending_till,
+            "value": item.value if item else None
+        })
+
+    working_employees = []
+    for combo in context["working_employees"]:
+        entry = employee_entries.get(combo["combo_id"])
+        working_employees.append({
+            **serialize_form_combo(combo),
+            "tip_values": (entry.tip_values or {}) if entry else {}
+        })
+
+    return {
+        "date": context["target_date"].isoformat(),
+        "day_of_week": context["day_of_week"],
+        "daily_balance": summary,
+        "previous_ending_till": context["previous_ending_till"],
+        "financial_templates": financial_templates,
+        "employee_tip_line_items": employee_tip_items,
+        "working_employees": working_employees,
+        "all_employees": [serialize_form_combo(combo) for combo in context["all_employees"]],
+        "scheduled_combo_ids": [combo["combo_id"] for combo in context["scheduled_employees"]],
+        "checks": [serialize_check(check) for check in context["existing_checks"]],
+        "efts": [serialize_eft(eft) for eft in context["existing_efts"]]
+    }
+
+@router.get("/api/daily-balance/{target_date}")
+async def get_daily_balance_form(
+    target_date: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Everything the daily balance form shows for a date, as JSON."""
+    date_obj = parse_api_date(target_date)
+    return daily_balance_form_model(daily_balance_form_context(db, date_obj))
+
+@router.post("/api/daily-balance/{target_date}/save")
+async def save_daily_balance_api(
+    target_date: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Save the whole form as a draft, like POST /daily-balance/save, but answer
+    with JSON: validation errors are a 400 with the message, not a re-rendered page.
+    """
+    date_obj = parse_api_date(target_date)
+    form_data = await request.form()
+
+    daily_balance = save_daily_balance_data(db, date_obj, DAYS_OF_WEEK[date_obj.weekday()], form_data, finalized=False, current_user=current_user, source="user")
+
+    return {
+        "success": True,
+        "id": daily_balance.id,
+        "employee_tip_line_items": [
+            serialize_line_item(item)
+            for item in sorted(daily_balance.financial_line_items, key=lambda item: item.display_order)
+            if item.is_employee_tip
+        ]
+    }
+
+@router.put("/api/daily-balance/{target_date}/employees/{combo_id}")
+async def save_daily_balance_employee(
+    target_date: str,
+    combo_id: str,
+    update: EmployeeEntryUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Add or update one employee row of a draft and rebuild the day's employee tip line items."""
+    date_obj = parse_api_date(target_date)
+    emp_id, pos_id = parse_combo_id(combo_id)
+    daily_balance = get_draft_daily_balance(db, date_obj, current_user)
+
+    employee = db.query(Employee).filter(Employee.id == emp_id).first()
+    position = db.query(Position).filter(Position.id == pos_id).first()
+    if not employee or not position:
+        raise HTTPException(status_code=404, detail="Employee or position not found")
+
+    tip_values = parse_tip_values(employee, position, lambda field_name: update.tip_values.get(field_name))
+
+    entry = db.query(DailyEmployeeEntry).filter(
+        DailyEmployeeEntry.daily_balance_id == daily_balance.id,
+        DailyEmployeeEntry.employee_id == emp_id,
+        DailyEmployeeEntry.position_id == pos_id
+    ).first()
+    if entry:
+        entry.tip_values = tip_values
+        entry.employee_name_snapshot = employee.display_name
+        entry.position_name_snapshot = position.name
+    else:
+        db.add(DailyEmployeeEntry(
+            daily_balance_id=daily_balance.id,
+            employee_id=emp_id,
+            position_id=pos_id,
+            tip_values=tip_values,
+            employee_name_snapshot=employee.display_name,
+            position_name_snapshot=position.name
+        ))
+    db.flush()
+
+    line_items = rebuild_employee_tip_line_items(db, daily_balance)
+    db.commit()
+
+    return {
+        "success": True,
+        "combo_id": combo_id,
+        "tip_values": tip_values,
+        "employee_tip_line_items": [serialize_line_item(item) for item in line_items]
+    }
+
+@router.delete("/api/daily-balance/{target_date}/employees/{combo_id}")
+async def delete_daily_balance_employee(
+    target_date: str,
+    combo_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove one employee row from a draft and rebuild the day's employee tip line items."""
+    date_obj = parse_api_date(target_date)
+    emp_id, pos_id = parse_combo_id(combo_id)
+    daily_balance = get_draft_daily_balance(db, date_obj, current_user)
+
+    db.query(DailyEmployeeEntry).filter(
+        DailyEmployeeEntry.daily_balance_id == daily_balance.id,
+        DailyEmployeeEntry.employee_id == emp_id,
+        DailyEmployeeEntry.position_id == pos_id
+    ).delete(synchronize_session=False)
+
+    line_items = rebuild_employee_tip_line_items(db, daily_balance)
+    db.commit()
+
+    return {
+        "success": True,
+        "combo_id": combo_id,
+        "employee_tip_line_items": [serialize_line_item(item) for item in line_items]
+    }
+
+@router.put("/api/daily-balance/{target_date}/line-items/{template_id}")
+async def save_daily_balance_line_item(
+    target_date: str,
+    template_id: int,
+    update: LineItemUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Set one financial line item of a draft."""
+    date_obj = parse_api_date(target_date)
+    daily_balance = get_draft_daily_balance(db, date_obj, current_user)
+
+    template = db.query(FinancialLineItemTemplate).filter(FinancialLineItemTemplate.id == template_id).first()
+    if not template:
+        raise HTTPException(status_code=404, detail="Financial item not found")
+
+    value = parse_amount(update.value, f"Financial item '{template.name}'")
+
+    line_item = db.query(DailyFinancialLineItem).filter(
+        DailyFinancialLineItem.daily_balance_id == daily_balance.id,
+        DailyFinancialLineItem.template_id == template.id
+    ).first()
+    if not line_item:
+        line_item = DailyFinancialLineItem(
+            daily_balance_id=daily_balance.id,
+            template_id=template.id,
+            is_employee_tip=False
+        )
+        db.add(line_item)
+    line_item.name = template.name
+    line_item.category = template.category
+    line_item.value = value
+    line_item.display_order = template.display_order
+    db.commit()
+
+    return {"success": True, "template_id": template.id, "value": value}
+
+@router.put("/api/daily-balance/{target_date}/notes")
+async def save_daily_balance_notes(
+    target_date: str,
+    update: NotesUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    date_obj = parse_api_date(target_date)
+    daily_balance = get_draft_daily_balance(db, date_obj, current_user)
+
+    daily_balance.notes = update.notes
+    db.commit()
+
+    return {"success": True}
+
+@router.put("/api/daily-balance/{target_date}/checks-efts")
+async def save_daily_balance_checks_efts(
+    target_date: str,
+    update: ChecksEftsUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Replace a draft's checks and EFTs; incomplete entries are dropped, as in a whole-form save."""
+    date_obj = parse_api_date(target_date)
+    daily_balance = get_draft_daily_balance(db, date_obj, current_user)
+
+    db.query(DailyBalanceCheck).filter(DailyBalanceCheck.daily_balance_id == daily_balance.id).delete(synchronize_session=False)
+    db.query(DailyBalanceEFT).filter(DailyBalanceEFT.daily_balance_id == daily_balance.id).delete(synchronize_session=False)
+
+    checks = []
+    for entry in update.checks:
+        check = daily_balance_check(daily_balance.id, entry.check_number, entry.date, entry.payable_to, entry.total, entry.memo)
+        if check:
+            db.add(check)
+            checks.append(check)
+
+    efts = []
+    for entry in update.efts:
+        eft = daily_balance_eft(daily_balance.id, entry.date, entry.card_number, entry.payable_to, entry.total, entry.memo)
+        if eft:
+            db.add(eft)
+            efts.append(eft)
+
+    db.commit()
+
+    return {
+        "success": True,
+        "checks": [serialize_check(check) for check in checks],
+        "efts": [serialize_eft(eft) for eft in efts]
+    }
+
 @router.get("/daily-balance/export")
 async def export_daily_balance(
     date: str,
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import json
@@ -8,9 +7,10 @@ from app.database import get_db
 from app.models import User, Employee, Position, EmployeePositionSchedule
 from app.auth.jwt_handler import get_current_admin_user
 from app.utils.slugify import create_slug, ensure_unique_slug
+from app.services.schedule_index import index_employee_schedules
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 @router.get("/employees", response_class=HTMLResponse)
 async def employees_page(
@@ -65,6 +65,7 @@ async def create_employee(
     db.add(new_employee)
     db.flush()
 
+    new_schedules = []
     for schedule in schedules_data:
         new_schedule = EmployeePositionSchedule(
             employee_id=new_employee.id,
@@ -74,6 +75,9 @@ async def create_employee(
             specific_dates=schedule.get('specific_dates', [])
         )
         db.add(new_schedule)
+        new_schedules.append(new_schedule)
+
+    index_employee_schedules(db, new_employee.id, new_schedules)
 
     db.commit()
     return RedirectResponse(url="/employees", status_code=302)
@@ -159,6 +163,7 @@ async def update_employee(
         EmployeePositionSchedule.employee_id == employee.id
     ).delete()
 
+    new_schedules = []
     for schedule in schedules_data:
         new_schedule = EmployeePositionSchedule(
             employee_id=employee.id,
@@ -168,6 +173,9 @@ async def update_employee(
             specific_dates=schedule.get('specific_dates', [])
         )
         db.add(new_schedule)
+        new_schedules.append(new_schedule)
+
+    index_employee_schedules(db, employee.id, new_schedules)
 
     db.commit()
     return RedirectResponse(url=f"/employees/{slug}", status_code=302)
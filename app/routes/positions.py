@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List
@@ -8,9 +7,9 @@ from app.database import get_db
 from app.models import User, Position, TipEntryRequirement, EmployeePositionSchedule
 from app.auth.jwt_handler import get_current_admin_user
 from app.utils.slugify import create_slug, ensure_unique_slug
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 @router.get("/positions", response_class=HTMLResponse)
 async def positions_page(
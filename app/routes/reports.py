@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import RedirectResponse, FileResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
@@ -13,22 +13,14 @@ from app.auth.jwt_handler import get_current_user
 from app.utils.csv_generator import generate_tip_report_csv, generate_consolidated_daily_balance_csv, generate_employee_tip_report_csv
 from app.utils.csv_reader import get_saved_tip_reports, parse_tip_report_csv, get_saved_daily_balance_reports, parse_daily_balance_csv
 from app.utils.email import send_report_emails
+from app.services.report_batch import generate_employee_tip_reports, zip_employee_tip_reports
+from app.templating import templates
 
 def validate_email(email: str) -> bool:
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
-
-def format_decimal(value, decimals=2):
-    """Format a number to a fixed number of decimal places."""
-    try:
-        return f"{float(value):.{decimals}f}"
-    except (ValueError, TypeError):
-        return value
-
-templates.env.filters["format_decimal"] = format_decimal
 
 @router.get("/reports")
 async def reports_index(
@@ -474,6 +466,33 @@ async def export_employee_tip_report(
         media_type="text/csv"
     )
 
+@router.get("/reports/tip-report/employees/export")
+async def export_all_employee_tip_reports(
+    start_date: str,
+    end_date: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user:
+        return RedirectResponse(url="/login", status_code=303)
+
+    try:
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        return RedirectResponse(url="/reports/tip-report", status_code=303)
+
+    filepaths = await run_in_threadpool(
+        generate_employee_tip_reports, db, start_date_obj, end_date_obj, current_user, "user"
+    )
+    archive_path = zip_employee_tip_reports(filepaths, start_date_obj, end_date_obj)
+
+    return FileResponse(
+        path=archive_path,
+        filename=os.path.basename(archive_path),
+        media_type="application/zip"
+    )
+
 @router.get("/reports/tip-report/export")
 async def export_tip_report(
     start_date: str,
@@ -1,19 +1,22 @@
 from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime
 from typing import Optional
+import asyncio
 import json
+import logging
 from app.database import get_db, SessionLocal
+from app.db_writer import db_writer
 from app.models import User, Employee
 from app.auth.jwt_handler import get_current_user
 from app.scheduler import scheduler, get_next_run_times
-from app.services.scheduler_tasks import run_tip_report_task, run_daily_balance_report_task, run_employee_tip_report_task, run_backup_task
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+logger = logging.getLogger(__name__)
 
 def sync_next_run_times(db: Session):
     """
@@ -134,6 +137,8 @@ async def scheduled_tasks_page(
             employee_id = item['task'][17]
             employee = db.query(Employee).filter(Employee.id == employee_id).first()
             item['employee_name'] = employee.name if employee else None
+        elif item['task'][2] == 'employee_tip_report':
+            item['employee_name'] = "All employees"
         else:
             item['employee_name'] = None
 
@@ -188,9 +193,7 @@ async def get_next_runs(
         )
 
     except Exception as e:
-        print(f"Error in get_next_runs: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_next_runs: %s", e)
         return JSONResponse(
             status_code=400,
             content={"success": False, "message": str(e) if str(e) else "Failed to calculate next run times"}
@@ -216,9 +219,10 @@ async def create_scheduled_task(
     interval_value = int(form_data.get("interval_value", 0)) if schedule_type == "interval" else None
     interval_unit = form_data.get("interval_unit") if schedule_type == "interval" else None
     starts_at = form_data.get("starts_at", "").strip() if schedule_type == "interval" else None
-    date_range_type = form_data.get("date_range_type") if task_type not in ["backup"] else None
+    date_range_type = form_data.get("date_range_type") if task_type not in ["backup", "maintenance"] else None
     bypass_opt_in = 1 if form_data.get("bypass_opt_in") == "1" else 0
     attach_csv = 1 if form_data.get("attach_csv") == "1" else 0
+    profile_enabled = 1 if form_data.get("profile_enabled") == "1" else 0
     employee_id = int(form_data.get("employee_id")) if form_data.get("employee_id") and form_data.get("employee_id").strip() else None
 
     user_emails = form_data.getlist("user_emails[]")
@@ -238,11 +242,13 @@ async def create_scheduled_task(
             INSERT INTO scheduled_tasks (
                 name, task_type, schedule_type, cron_expression,
                 interval_value, interval_unit, starts_at, date_range_type,
-                email_list, bypass_opt_in, is_active, next_run_at, employee_id, attach_csv
+                email_list, bypass_opt_in, is_active, next_run_at, employee_id, attach_csv,
+                profile_enabled
             ) VALUES (
                 :name, :task_type, :schedule_type, :cron_expression,
                 :interval_value, :interval_unit, :starts_at, :date_range_type,
-                :email_list, :bypass_opt_in, 1, :next_run_at, :employee_id, :attach_csv
+                :email_list, :bypass_opt_in, 1, :next_run_at, :employee_id, :attach_csv,
+                :profile_enabled
             )
         """), {
             "name": name,
@@ -257,25 +263,26 @@ async def create_scheduled_task(
             "bypass_opt_in": bypass_opt_in,
             "next_run_at": next_run_at,
             "employee_id": employee_id,
-            "attach_csv": attach_csv
+            "attach_csv": attach_csv,
+            "profile_enabled": profile_enabled
         })
         db.commit()
 
         task_id = db.execute(text("SELECT last_insert_rowid()")).scalar()
 
-        print(f"✓ Created scheduled task '{name}' (ID: {task_id}) in database")
+        logger.info("Created scheduled task '%s' (ID: %s) in database", name, task_id)
 
         add_job_to_scheduler(
             task_id, name, task_type, schedule_type,
             cron_expression, interval_value, interval_unit, starts_at,
-            date_range_type, email_list_json, bypass_opt_in, employee_id, attach_csv
+            date_range_type, email_list_json, bypass_opt_in, employee_id, attach_csv, profile_enabled
         )
 
         job = scheduler.get_job(f"task_{task_id}")
         if job:
-            print(f"✓ Added job to APScheduler - Next run: {job.next_run_time}")
+            logger.info("Added job to APScheduler - Next run: %s", job.next_run_time)
         else:
-            print(f"✗ WARNING: Job was not added to APScheduler!")
+            logger.error("Job was not added to APScheduler!")
 
         # Sync scheduler to ensure consistency
         sync_scheduler_with_database(db)
@@ -329,7 +336,7 @@ async def toggle_scheduled_task(
             task_dict = db.execute(text("""
                 SELECT id, name, task_type, schedule_type, cron_expression,
                        interval_value, interval_unit, starts_at, date_range_type,
-                       email_list, bypass_opt_in, employee_id, attach_csv
+                       email_list, bypass_opt_in, employee_id, attach_csv, profile_enabled
                 FROM scheduled_tasks
                 WHERE id = :task_id
             """), {"task_id": task_id}).fetchone()
@@ -337,7 +344,8 @@ async def toggle_scheduled_task(
             add_job_to_scheduler(
                 task_dict[0], task_dict[1], task_dict[2], task_dict[3],
                 task_dict[4], task_dict[5], task_dict[6], task_dict[7],
-                task_dict[8], task_dict[9], task_dict[10], task_dict[11], task_dict[12]
+                task_dict[8], task_dict[9], task_dict[10], task_dict[11], task_dict[12],
+                task_dict[13]
             )
         else:
             if scheduler.get_job(job_id):
@@ -374,7 +382,7 @@ async def get_scheduled_task(
         task = db.execute(text("""
             SELECT id, name, task_type, schedule_type, cron_expression,
                    interval_value, interval_unit, starts_at, date_range_type,
-                   email_list, bypass_opt_in, is_active, employee_id, attach_csv
+                   email_list, bypass_opt_in, is_active, employee_id, attach_csv, profile_enabled
             FROM scheduled_tasks WHERE id = :task_id
         """), {"task_id": task_id}).fetchone()
 
@@ -404,7 +412,8 @@ async def get_scheduled_task(
                     "bypass_opt_in": task[10],
                     "is_active": task[11],
                     "employee_id": task[12],
-                    "attach_csv": task[13]
+                    "attach_csv": task[13],
+                    "profile_enabled": task[14]
                 }
             }
         )
@@ -437,9 +446,10 @@ async def update_scheduled_task(
         interval_value = int(form_data.get("interval_value", 0)) if schedule_type == "interval" else None
         interval_unit = form_data.get("interval_unit") if schedule_type == "interval" else None
         starts_at = form_data.get("starts_at", "").strip() if schedule_type == "interval" else None
-        date_range_type = form_data.get("date_range_type") if task_type not in ["backup"] else None
+        date_range_type = form_data.get("date_range_type") if task_type not in ["backup", "maintenance"] else None
         bypass_opt_in = 1 if form_data.get("bypass_opt_in") == "1" else 0
         attach_csv = 1 if form_data.get("attach_csv") == "1" else 0
+        profile_enabled = 1 if form_data.get("profile_enabled") == "1" else 0
         employee_id = int(form_data.get("employee_id")) if form_data.get("employee_id") and form_data.get("employee_id").strip() else None
 
         # Validation
@@ -461,12 +471,6 @@ async def update_scheduled_task(
                 content={"success": False, "message": "Valid interval value is required for interval schedule"}
             )
 
-        if task_type == "employee_tip_report" and not employee_id:
-            return JSONResponse(
-                status_code=400,
-                content={"success": False, "message": "Employee selection is required for employee tip reports"}
-            )
-
         user_emails = form_data.getlist("user_emails[]")
         additional_email = form_data.get("additional_email", "").strip()
 
@@ -505,6 +509,7 @@ async def update_scheduled_task(
                 next_run_at = :next_run_at,
                 employee_id = :employee_id,
                 attach_csv = :attach_csv,
+                profile_enabled = :profile_enabled,
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = :task_id
         """), {
@@ -521,16 +526,17 @@ async def update_scheduled_task(
             "next_run_at": next_run_at,
             "employee_id": employee_id,
             "attach_csv": attach_csv,
+            "profile_enabled": profile_enabled,
             "task_id": task_id
         })
         db.commit()
 
-        print(f"✓ Updated task {task_id}: {name}")
+        logger.info("Updated task %s: %s", task_id, name)
 
         job_id = f"task_{task_id}"
         if scheduler.get_job(job_id):
             scheduler.remove_job(job_id)
-            print(f"  → Removed old scheduler job: {job_id}")
+            logger.debug("Removed old scheduler job: %s", job_id)
 
         task = db.execute(text("""
             SELECT is_active FROM scheduled_tasks WHERE id = :task_id
@@ -540,9 +546,9 @@ async def update_scheduled_task(
             add_job_to_scheduler(
                 task_id, name, task_type, schedule_type,
                 cron_expression, interval_value, interval_unit, starts_at,
-                date_range_type, email_list_json, bypass_opt_in, employee_id, attach_csv
+                date_range_type, email_list_json, bypass_opt_in, employee_id, attach_csv, profile_enabled
             )
-            print(f"  → Re-added scheduler job: {job_id}")
+            logger.debug("Re-added scheduler job: %s", job_id)
 
         # Sync scheduler to ensure consistency
         sync_scheduler_with_database(db)
@@ -560,9 +566,7 @@ async def update_scheduled_task(
         )
     except Exception as e:
         db.rollback()
-        print(f"✗ Error updating task {task_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error updating task %s: %s", task_id, e)
         return JSONResponse(
             status_code=500,
             content={"success": False, "message": f"Failed to update task: {str(e)}"}
@@ -614,19 +618,26 @@ async def delete_scheduled_task(
 def add_job_to_scheduler(
     task_id, name, task_type, schedule_type,
     cron_expression, interval_value, interval_unit, starts_at,
-    date_range_type, email_list_json, bypass_opt_in, employee_id=None, attach_csv=False
+    date_range_type, email_list_json, bypass_opt_in, employee_id=None, attach_csv=False,
+    profile_enabled=False
 ):
     """Add a job to the APScheduler"""
     from apscheduler.triggers.cron import CronTrigger
     from apscheduler.triggers.interval import IntervalTrigger
     import pytz
+    # The task module pulls in the report, email and backup code; load it
+    # once a job is scheduled rather than with the router
+    from app.services.scheduler_tasks import (
+        run_tip_report_task, run_daily_balance_report_task, run_employee_tip_report_task,
+        run_backup_task, run_maintenance_task, run_report_batch_task,
+    )
 
     job_id = f"task_{task_id}"
 
-    print(f"  → Adding job {job_id} to scheduler (type: {task_type}, schedule: {schedule_type})")
+    logger.debug("Adding job %s to scheduler (type: %s, schedule: %s)", job_id, task_type, schedule_type)
 
     if scheduler.get_job(job_id):
-        print(f"  → Job {job_id} already exists, removing old version")
+        logger.debug("Job %s already exists, removing old version", job_id)
         scheduler.remove_job(job_id)
 
     if task_type == "tip_report":
@@ -638,9 +649,15 @@ def add_job_to_scheduler(
     elif task_type == "employee_tip_report":
         job_func = run_employee_tip_report_task
         job_args = [task_id, name, date_range_type, email_list_json, bypass_opt_in, employee_id, attach_csv]
+    elif task_type == "report_batch":
+        job_func = run_report_batch_task
+        job_args = [task_id, name, date_range_type, email_list_json, bypass_opt_in, attach_csv]
     elif task_type == "backup":
         job_func = run_backup_task
         job_args = [task_id, name]
+    elif task_type == "maintenance":
+        job_func = run_maintenance_task
+        job_args = [task_id, name]
     else:
         raise ValueError(f"Unknown task type: {task_type}")
 
@@ -680,48 +697,43 @@ def add_job_to_scheduler(
         id=job_id,
         name=name,
         args=job_args,
+        kwargs={"profile": True} if profile_enabled else None,
         replace_existing=True
     )
 
     job = scheduler.get_job(job_id)
     if job and job.next_run_time:
-        print(f"  ✓ Job {job_id} scheduled successfully - Next run: {job.next_run_time}")
+        logger.debug("Job %s scheduled successfully - Next run: %s", job_id, job.next_run_time)
     else:
-        print(f"  ✗ WARNING: Job {job_id} was added but has no next_run_time!")
+        logger.error("Job %s was added but has no next_run_time!", job_id)
+
+MARK_STALE_EXECUTIONS_SQL = """
+    UPDATE task_executions
+    SET status = 'failed',
+        completed_at = CURRENT_TIMESTAMP,
+        error_message = 'Task execution marked as stale (exceeded timeout)'
+    WHERE status = 'running'
+      AND started_at < datetime('now', '-5 minutes')
+"""
 
 def cleanup_orphaned_executions():
     """Remove task executions that no longer have a parent scheduled task and mark stale running executions as failed"""
-    db = SessionLocal()
     try:
-        # First, mark stale running executions as failed
-        stale_result = db.execute(text("""
-            UPDATE task_executions
-            SET status = 'failed',
-                completed_at = CURRENT_TIMESTAMP,
-                error_message = 'Task execution marked as stale (exceeded timeout)'
-            WHERE status = 'running'
-              AND started_at < datetime('now', '-5 minutes')
-        """))
+        # Mark stale running executions as failed, then delete orphaned executions
+        stale_result, result = db_writer.execute_batch([
+            (MARK_STALE_EXECUTIONS_SQL, None),
+            ("DELETE FROM task_executions WHERE task_id NOT IN (SELECT id FROM scheduled_tasks)", None),
+        ])
         stale_count = stale_result.rowcount
         if stale_count > 0:
-            print(f"✓ Marked {stale_count} stale running execution(s) as failed")
-
-        # Then, delete orphaned executions
-        result = db.execute(text("""
-            DELETE FROM task_executions
-            WHERE task_id NOT IN (SELECT id FROM scheduled_tasks)
-        """))
-        db.commit()
+            logger.info("Marked %s stale running execution(s) as failed", stale_count)
         deleted_count = result.rowcount
         if deleted_count > 0:
-            print(f"✓ Cleaned up {deleted_count} orphaned task execution(s)")
+            logger.info("Cleaned up %s orphaned task execution(s)", deleted_count)
         return deleted_count + stale_count
     except Exception as e:
-        print(f"✗ Failed to cleanup orphaned executions: {e}")
-        db.rollback()
+        logger.error("Failed to cleanup orphaned executions: %s", e)
         return 0
-    finally:
-        db.close()
 
 def cleanup_orphaned_scheduler_jobs(db):
     """Remove APScheduler jobs that don't have a corresponding database task"""
@@ -745,20 +757,18 @@ def cleanup_orphaned_scheduler_jobs(db):
                     if task_id not in active_task_ids:
                         scheduler.remove_job(job.id)
                         removed_count += 1
-                        print(f"  ✓ Removed orphaned job: {job.id} ('{job.name}')")
+                        logger.debug("Removed orphaned job: %s ('%s')", job.id, job.name)
                 except ValueError:
                     # If job ID doesn't follow our naming convention, skip it
-                    print(f"  ⚠ Skipping job with unexpected ID format: {job.id}")
+                    logger.warning("Skipping job with unexpected ID format: %s", job.id)
                     continue
 
         if removed_count > 0:
-            print(f"✓ Cleaned up {removed_count} orphaned APScheduler job(s)")
+            logger.info("Cleaned up %s orphaned APScheduler job(s)", removed_count)
 
         return removed_count
     except Exception as e:
-        print(f"  ✗ Failed to cleanup orphaned APScheduler jobs: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to cleanup orphaned APScheduler jobs: %s", e)
         return 0
 
 def sync_scheduler_with_database(db):
@@ -767,7 +777,7 @@ def sync_scheduler_with_database(db):
     This ensures APScheduler jobs match the database state and prevents orphaned jobs from running.
     """
     try:
-        print("  → Syncing scheduler with database...")
+        logger.debug("Syncing scheduler with database...")
 
         # Clean up stale running executions (older than 5 minutes)
         stale_result = db.execute(text("""
@@ -780,7 +790,7 @@ def sync_scheduler_with_database(db):
         """))
         stale_count = stale_result.rowcount
         if stale_count > 0:
-            print(f"    ✓ Marked {stale_count} stale running execution(s) as failed")
+            logger.debug("Marked %s stale running execution(s) as failed", stale_count)
 
         # Clean up orphaned executions
         orphaned_exec_count = 0
@@ -791,17 +801,15 @@ def sync_scheduler_with_database(db):
         db.commit()
         orphaned_exec_count = result.rowcount
         if orphaned_exec_count > 0:
-            print(f"    ✓ Removed {orphaned_exec_count} orphaned execution(s)")
+            logger.debug("Removed %s orphaned execution(s)", orphaned_exec_count)
 
         # Clean up orphaned scheduler jobs
         orphaned_job_count = cleanup_orphaned_scheduler_jobs(db)
 
-        print(f"  ✓ Sync complete: {stale_count} stale, {orphaned_exec_count} orphaned executions, {orphaned_job_count} jobs cleaned")
+        logger.debug("Sync complete: %s stale, %s orphaned executions, %s jobs cleaned", stale_count, orphaned_exec_count, orphaned_job_count)
         return True
     except Exception as e:
-        print(f"  ✗ Failed to sync scheduler: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to sync scheduler: %s", e)
         return False
 
 def load_scheduled_tasks():
@@ -814,7 +822,7 @@ def load_scheduled_tasks():
         tasks = db.execute(text("""
             SELECT id, name, task_type, schedule_type, cron_expression,
                    interval_value, interval_unit, starts_at, date_range_type,
-                   email_list, bypass_opt_in, employee_id, attach_csv
+                   email_list, bypass_opt_in, employee_id, attach_csv, profile_enabled
             FROM scheduled_tasks WHERE is_active = 1
         """)).fetchall()
 
@@ -824,24 +832,21 @@ def load_scheduled_tasks():
                 add_job_to_scheduler(
                     task[0], task[1], task[2], task[3],
                     task[4], task[5], task[6], task[7],
-                    task[8], task[9], task[10], task[11], task[12]
+                    task[8], task[9], task[10], task[11], task[12],
+                    task[13]
                 )
                 loaded_count += 1
-                print(f"  ✓ Loaded task: {task[1]} (ID: {task[0]})")
+                logger.debug("Loaded task: %s (ID: %s)", task[1], task[0])
             except Exception as e:
-                print(f"  ✗ Failed to load task {task[1]}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Failed to load task %s: %s", task[1], e)
 
-        print(f"✓ Loaded {loaded_count}/{len(tasks)} scheduled tasks into APScheduler")
+        logger.info("Loaded %s/%s scheduled tasks into APScheduler", loaded_count, len(tasks))
 
         # Cleanup orphaned APScheduler jobs (jobs that exist in APScheduler but not in database)
         cleanup_orphaned_scheduler_jobs(db)
 
     except Exception as e:
-        print(f"✗ Failed to load scheduled tasks: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to load scheduled tasks: %s", e)
     finally:
         db.close()
 
@@ -857,7 +862,7 @@ async def cleanup_orphaned_executions_endpoint(
         )
 
     try:
-        deleted_count = cleanup_orphaned_executions()
+        deleted_count = await run_in_threadpool(cleanup_orphaned_executions)
         return JSONResponse(
             status_code=200,
             content={
@@ -884,15 +889,7 @@ async def cleanup_stale_running_executions_endpoint(
         )
 
     try:
-        result = db.execute(text("""
-            UPDATE task_executions
-            SET status = 'failed',
-                completed_at = CURRENT_TIMESTAMP,
-                error_message = 'Task execution marked as stale (exceeded timeout)'
-            WHERE status = 'running'
-              AND started_at < datetime('now', '-5 minutes')
-        """))
-        db.commit()
+        result = await asyncio.wrap_future(db_writer.submit(MARK_STALE_EXECUTIONS_SQL))
         updated_count = result.rowcount
 
         return JSONResponse(
@@ -904,7 +901,6 @@ async def cleanup_stale_running_executions_endpoint(
             }
         )
     except Exception as e:
-        db.rollback()
         return JSONResponse(
             status_code=500,
             content={"success": False, "message": str(e)}
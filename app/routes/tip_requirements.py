@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import RedirectResponse, HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import User, TipEntryRequirement
@@ -9,7 +8,6 @@ from app.utils.slugify import create_slug, create_field_name, ensure_unique_slug
 from typing import Optional
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 @router.post("/tip-requirements/new")
 async def create_tip_requirement(
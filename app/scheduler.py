@@ -1,19 +1,28 @@
 import os
+import logging
+import time
+import threading
 import pytz
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
-from sqlalchemy import text
-from app.database import SCHEDULER_DIR, SessionLocal
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
+from app.database import ENGINE_PROFILE, checkpoint_wal, create_jobstore_engine
+from app.db_writer import db_writer
+
+logger = logging.getLogger(__name__)
 
 # Get timezone from environment, default to America/Los_Angeles
 TIMEZONE = os.getenv('TZ', 'America/Los_Angeles')
 tz = pytz.timezone(TIMEZONE)
 
 # Configure job stores
+# 'system' holds internal housekeeping jobs that are re-added on every start
 jobstores = {
-    'default': SQLAlchemyJobStore(url=f'sqlite:///{SCHEDULER_DIR}/jobs.db')
+    'default': SQLAlchemyJobStore(engine=create_jobstore_engine()),
+    'system': MemoryJobStore()
 }
 
 executors = {
@@ -33,6 +42,18 @@ scheduler = BackgroundScheduler(
     timezone=tz
 )
 
+# Number of job runs currently executing, so callers can wait for them to drain
+_running_jobs = 0
+_running_jobs_changed = threading.Condition()
+
+def _track_running_jobs(event):
+    global _running_jobs
+    with _running_jobs_changed:
+        _running_jobs += 1 if event.code == EVENT_JOB_SUBMITTED else -1
+        _running_jobs_changed.notify_all()
+
+scheduler.add_listener(_track_running_jobs, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
 def get_next_run_times(schedule_type, cron_expression=None, interval_value=None, interval_unit=None, starts_at=None, count=5):
     """
     Calculate the next N run times for a schedule.
@@ -143,7 +164,7 @@ def get_next_run_times(schedule_type, cron_expression=None, interval_value=None,
                     current = current + interval_delta
 
     except Exception as e:
-        print(f"Error calculating next run times: {e}")
+        logger.error("Error calculating next run times: %s", e)
         return []
 
     return next_runs
@@ -156,10 +177,9 @@ def cleanup_old_executions(task_id, keep_count=7):
         task_id: The scheduled task ID
         keep_count: Number of most recent executions to keep (default 7)
     """
-    db = SessionLocal()
     try:
-        # Get IDs of executions to delete (all except the most recent N)
-        db.execute(text("""
+        # Delete all executions except the most recent N
+        db_writer.execute("""
             DELETE FROM task_executions
             WHERE task_id = :task_id
             AND id NOT IN (
@@ -168,22 +188,93 @@ def cleanup_old_executions(task_id, keep_count=7):
                 ORDER BY started_at DESC
                 LIMIT :keep_count
             )
-        """), {"task_id": task_id, "keep_count": keep_count})
-        db.commit()
+        """, {"task_id": task_id, "keep_count": keep_count})
     except Exception as e:
-        print(f"Error cleaning up old executions: {e}")
-        db.rollback()
-    finally:
-        db.close()
+        logger.error("Error cleaning up old executions: %s", e)
+
+# Standby schedulers (workers without the scheduler lease) are started paused:
+# they can add/remove jobs in the shared job store but never run them
+_standby = False
+
+# How often the leader re-reads the job store, so jobs added or changed by
+# standby workers are picked up
+JOBSTORE_POLL_SECONDS = int(os.getenv("SCHEDULER_JOBSTORE_POLL_SECONDS", "30"))
+
+def poll_job_store():
+    """No-op job; running it wakes the scheduler loop to re-read the job store."""
+
+def start_scheduler(standby=False):
+    """
+    Start the scheduler if not already running.
+
+    With standby=True the scheduler is started paused (see promote_scheduler).
+    """
+    global _standby
+    if not scheduler.running:
+        _standby = standby
+        scheduler.start(paused=standby)
+        if standby:
+            logger.info("Scheduler started in standby with timezone: %s", TIMEZONE)
+        else:
+            logger.info("Scheduler started with timezone: %s", TIMEZONE)
+
+        checkpoint_minutes = ENGINE_PROFILE["wal_checkpoint_minutes"]
+        if checkpoint_minutes > 0:
+            scheduler.add_job(
+                checkpoint_wal,
+                trigger='interval',
+                minutes=checkpoint_minutes,
+                id='system_wal_checkpoint',
+                name='WAL checkpoint',
+                jobstore='system',
+                replace_existing=True
+            )
+
+        scheduler.add_job(
+            poll_job_store,
+            trigger='interval',
+            seconds=JOBSTORE_POLL_SECONDS,
+            id='system_jobstore_poll',
+            name='Job store poll',
+            jobstore='system',
+            replace_existing=True
+        )
 
-def start_scheduler():
-    """Start the scheduler if not already running"""
+def promote_scheduler():
+    """Start running jobs on a standby scheduler (this worker became the leader)"""
+    global _standby
+    if scheduler.running and _standby:
+        _standby = False
+        scheduler.resume()
+        logger.info("Scheduler promoted from standby")
+
+def is_scheduler_standby():
+    return _standby
+
+def pause_scheduler(timeout=60):
+    """
+    Stop starting new job runs and wait for the ones in progress to finish.
+    Returns False if jobs were still running when the timeout expired.
+    """
     if not scheduler.running:
-        scheduler.start()
-        print(f"✓ Scheduler started with timezone: {TIMEZONE}")
+        return True
+    scheduler.pause()
+    deadline = time.monotonic() + timeout
+    with _running_jobs_changed:
+        while _running_jobs > 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _running_jobs_changed.wait(remaining)
+    return True
+
+def resume_scheduler():
+    """Resume job processing after pause_scheduler()"""
+    if scheduler.running and not _standby:
+        scheduler.resume()
 
 def shutdown_scheduler():
     """Shutdown the scheduler gracefully"""
     if scheduler.running:
         scheduler.shutdown(wait=True)
-        print("✓ Scheduler shut down gracefully")
+        logger.info("Scheduler shut down gracefully")
@@ -0,0 +1,130 @@
+import os
+import threading
+from contextlib import contextmanager
+from app.database import SCHEDULER_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, assume a single worker
+    fcntl = None
+
+LEASE_PATH = os.path.join(SCHEDULER_DIR, "leader.lock")
+WORKERS_PATH = os.path.join(SCHEDULER_DIR, "workers.lock")
+LEASE_POLL_SECONDS = int(os.getenv("SCHEDULER_LEASE_POLL_SECONDS", "10"))
+
+
+class SchedulerLease:
+    """
+    Scheduler leadership shared between worker processes.
+
+    The leader holds an exclusive fcntl lock on a file under data/scheduler.
+    The kernel releases the lock when the holding process exits or crashes,
+    so a follower polling try_acquire() takes over within LEASE_POLL_SECONDS.
+    """
+
+    def __init__(self, path=LEASE_PATH):
+        self.path = path
+        self._fd = None
+        self._stop = threading.Event()
+        self._watcher = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def try_acquire(self):
+        """Take the lease if no other process holds it. Returns True if held."""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+    def watch(self, on_acquired):
+        """Poll for the lease in a background thread and call on_acquired() once it is ours."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def _poll():
+            while not self._stop.wait(LEASE_POLL_SECONDS):
+                if self.try_acquire():
+                    on_acquired()
+                    return
+
+        self._watcher = threading.Thread(target=_poll, name="scheduler-lease", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+
+class WorkerRegistry:
+    """
+    Lets a worker find out whether it is the only one running.
+
+    Every worker holds a shared fcntl lock on a file under data/scheduler while
+    it runs. Only a worker whose lock is the sole one can convert it to an
+    exclusive lock, and while it holds that, workers starting up wait in
+    register().
+    """
+
+    def __init__(self, path=WORKERS_PATH):
+        self.path = path
+        self._fd = None
+
+    def register(self):
+        if self._fd is not None or fcntl is None:
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        self._fd = fd
+
+    def unregister(self):
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    @contextmanager
+    def sole_worker(self):
+        """Yield True while no other worker runs (new ones wait), or False if others are running."""
+        if fcntl is None:
+            yield True
+            return
+        self.register()
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            alone = True
+        except OSError:
+            alone = False
+        try:
+            yield alone
+        finally:
+            # A failed conversion drops the shared lock too, so always take it back
+            fcntl.flock(self._fd, fcntl.LOCK_SH)
+
+
+scheduler_lease = SchedulerLease()
+worker_registry = WorkerRegistry()
@@ -0,0 +1,231 @@
+"""
+Bulk creation of draft daily balances for a date range.
+
+Each missing date gets what the daily balance form would pre-fill for it:
+- one line item per financial template, with starting/ending till carried
+  forward from the previous day's ending till and everything else at 0
+- an employee entry for each scheduled employee/position combo, tips at 0
+- the scheduled checks and EFTs for that weekday
+
+Dates that already have a daily balance are left untouched, but their ending
+till still feeds the chain for the days after them. Each date is written as its
+own db_writer batch; the writer group-commits them, and a date that another
+prefill or a manual save created in the meantime fails alone on UNIQUE(date)
+and is reported as skipped.
+"""
+import json
+import logging
+import sqlite3
+from datetime import date as date_cls, datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy.orm import Session, selectinload
+from app.db_writer import db_writer
+from app.models import DailyBalance, DailyFinancialLineItem, Employee, FinancialLineItemTemplate, Position
+from app.services.schedule_index import DAYS_OF_WEEK, MAX_ROSTER_DAYS, get_scheduled_rosters
+
+logger = logging.getLogger(__name__)
+
+MAX_PREFILL_DAYS = MAX_ROSTER_DAYS
+
+# Child rows find their parent by date so the whole range fits in one batch
+_BALANCE_ID = "(SELECT id FROM daily_balance WHERE date = :balance_date)"
+
+INSERT_BALANCE_SQL = """
+    INSERT INTO daily_balance (date, day_of_week, notes, finalized, created_by_user_id,
+                               created_by_source, generated_by_user_id, generated_at)
+    VALUES (:date, :day_of_week, '', 0, :user_id, :source, :user_id, :now)
+"""
+INSERT_LINE_ITEM_SQL = f"""
+    INSERT INTO daily_financial_line_items (daily_balance_id, template_id, name, category,
+                                            value, display_order, is_employee_tip)
+    VALUES ({_BALANCE_ID}, :template_id, :name, :category, :value, :display_order, 0)
+"""
+INSERT_EMPLOYEE_ENTRY_SQL = f"""
+    INSERT INTO daily_employee_entries (daily_balance_id, employee_id, position_id, tip_values,
+                                        employee_name_snapshot, position_name_snapshot)
+    VALUES ({_BALANCE_ID}, :employee_id, :position_id, :tip_values, :employee_name, :position_name)
+"""
+INSERT_CHECK_SQL = f"""
+    INSERT INTO daily_balance_checks (daily_balance_id, check_number, date, payable_to, total, memo)
+    VALUES ({_BALANCE_ID}, :check_number, :date, :payable_to, :total, :memo)
+"""
+INSERT_EFT_SQL = f"""
+    INSERT INTO daily_balance_efts (daily_balance_id, date, card_number, payable_to, total, memo)
+    VALUES ({_BALANCE_ID}, :date, :card_number, :payable_to, :total, :memo)
+"""
+
+
+def _ending_tills(db: Session, start_date: date_cls, end_date: date_cls, ending_till_ids):
+    """{date: ending till value} for existing daily balances from the day before start_date to end_date."""
+    if not ending_till_ids:
+        return {}
+    rows = db.query(DailyBalance.date, DailyFinancialLineItem.value).join(
+        DailyFinancialLineItem, DailyFinancialLineItem.daily_balance_id == DailyBalance.id
+    ).filter(
+        DailyBalance.date >= start_date - timedelta(days=1),
+        DailyBalance.date <= end_date,
+        DailyFinancialLineItem.template_id.in_(ending_till_ids)
+    ).order_by(DailyFinancialLineItem.display_order).all()
+
+    tills = {}
+    for day, value in rows:
+        tills.setdefault(day, value)
+    return tills
+
+
+def _empty_tip_values(position: Position):
+    """Tip values a saved form would hold for a combo with every input left at 0."""
+    return {
+        req.field_name: 0.0
+        for req in position.tip_requirements
+        if not req.no_input or req.is_total
+    }
+
+
+def prefill_daily_balances(
+    db: Session,
+    start_date: date_cls,
+    end_date: date_cls,
+    current_user=None,
+    source: str = "user",
+    progress: Optional[Callable[[int, int], None]] = None
+):
+    """
+    Create draft daily balances for every date in [start_date, end_date] that has none.
+
+    progress(done, total) is called as each date is settled: dates that already
+    had a balance count straight away, the rest once their batch is committed.
+    Returns a summary with the created and skipped dates.
+    """
+    if end_date < start_date:
+        raise ValueError("End date must not be before start date")
+    total_days = (end_date - start_date).days + 1
+    if total_days > MAX_PREFILL_DAYS:
+        raise ValueError(f"Date range is limited to {MAX_PREFILL_DAYS} days")
+
+    financial_templates = db.query(FinancialLineItemTemplate).order_by(
+        FinancialLineItemTemplate.display_order
+    ).all()
+    till_template_ids = [t.id for t in financial_templates if t.is_ending_till]
+
+    existing_dates = {
+        row[0] for row in db.query(DailyBalance.date).filter(
+            DailyBalance.date >= start_date,
+            DailyBalance.date <= end_date
+        )
+    }
+    ending_tills = _ending_tills(db, start_date, end_date, till_template_ids)
+
+    roster = get_scheduled_rosters(db, start_date, end_date)
+    combos_by_day = [[] for _ in roster["dates"]]
+    for day, employee_id, position_id in zip(*(roster["combos"][k] for k in ("day", "employee_id", "position_id"))):
+        combos_by_day[day].append((employee_id, position_id))
+
+    employees = {
+        e.id: e for e in db.query(Employee).filter(Employee.id.in_(roster["employees"]["id"]))
+    }
+    positions = {
+        p.id: p for p in db.query(Position).options(selectinload(Position.tip_requirements)).filter(
+            Position.id.in_(roster["positions"]["id"])
+        )
+    }
+    tip_values_by_position = {pid: json.dumps(_empty_tip_values(p)) for pid, p in positions.items()}
+
+    payments_by_day = {}
+    for kind, number_field in (("checks", "check_number"), ("efts", "card_number")):
+        templates = roster[kind]["templates"]
+        for day, index in zip(roster[kind]["day"], roster[kind]["template"]):
+            payments_by_day.setdefault((kind, day), []).append({
+                number_field: templates[number_field][index],
+                "payable_to": templates["payable_to"][index],
+                "total": templates["total"][index] or 0.0,
+                "memo": templates["memo"][index]
+            })
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+    user_id = current_user.id if current_user else None
+    carried_till = ending_tills.get(start_date - timedelta(days=1), 0.0)
+
+    batches = []
+    for day_index, day_str in enumerate(roster["dates"]):
+        day = date_cls.fromisoformat(day_str)
+
+        if day in existing_dates:
+            carried_till = ending_tills.get(day, carried_till)
+            continue
+
+        statements = []
+        statements.append((
+            INSERT_BALANCE_SQL,
+            {"date": day_str, "day_of_week": DAYS_OF_WEEK[day.weekday()], "user_id": user_id,
+             "source": source, "now": now}
+        ))
+
+        for template in financial_templates:
+            value = carried_till if (template.is_starting_till or template.is_ending_till) else 0.0
+            statements.append((
+                INSERT_LINE_ITEM_SQL,
+                {"balance_date": day_str, "template_id": template.id, "name": template.name,
+                 "category": template.category, "value": round(value, 2), "display_order": template.display_order}
+            ))
+
+        for employee_id, position_id in combos_by_day[day_index]:
+            employee = employees.get(employee_id)
+            position = positions.get(position_id)
+            if not employee or not position:
+                continue
+            statements.append((
+                INSERT_EMPLOYEE_ENTRY_SQL,
+                {"balance_date": day_str, "employee_id": employee_id, "position_id": position_id,
+                 "tip_values": tip_values_by_position[position_id],
+                 "employee_name": employee.display_name, "position_name": position.name}
+            ))
+
+        for check in payments_by_day.get(("checks", day_index), []):
+            statements.append((
+                INSERT_CHECK_SQL,
+                dict(check, date=day_str, balance_date=day_str)
+            ))
+
+        for eft in payments_by_day.get(("efts", day_index), []):
+            statements.append((
+                INSERT_EFT_SQL,
+                dict(eft, date=day_str, balance_date=day_str)
+            ))
+
+        batches.append((day_str, statements))
+
+    # Submit every date before waiting so the writer can group-commit them
+    futures = [(day_str, len(statements), db_writer.submit_batch(statements)) for day_str, statements in batches]
+
+    done = total_days - len(batches)
+    if progress and done:
+        progress(done, total_days)
+    created = []
+    conflicts = []
+    rows_written = 0
+    for day_str, row_count, future in futures:
+        try:
+            future.result(60)
+        except sqlite3.IntegrityError as e:
+            if "daily_balance.date" not in str(e):
+                raise
+            conflicts.append(day_str)
+        else:
+            created.append(day_str)
+            rows_written += row_count
+        done += 1
+        if progress:
+            progress(done, total_days)
+
+    logger.info("Prefilled %s daily balance(s) from %s to %s (%s already existed, %s rows written)",
+                len(created), start_date, end_date, total_days - len(created), rows_written)
+
+    return {
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "created": created,
+        "conflicts": conflicts,
+        "skipped": total_days - len(created),
+        "rows_written": rows_written,
+    }
@@ -0,0 +1,197 @@
+"""
+Report batch: every scheduled report for a period in one run.
+
+Generates the tip report, the consolidated daily balance report and an
+employee tip report for each staff member. All database reads happen in the
+caller's session inside one read transaction (read_snapshot), so every report
+sees the same data even while staff keep saving, and the employee entries are
+fetched with a single query. Formatting and writing the per-employee CSVs is
+then spread over a process pool.
+
+generate_employee_tip_reports() is the per-employee part on its own, used by
+the "all employees" employee tip report task and the ZIP export.
+"""
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date
+from typing import Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+from app.database import DATABASE_DIR
+from app.models import Employee, EmployeePositionSchedule, User
+from app.utils.csv_generator import (
+    employee_report_info,
+    employee_tip_report_path,
+    generate_consolidated_daily_balance_csv,
+    generate_tip_report_csv,
+    report_generated_by,
+    snapshot_employee_tip_entries,
+)
+from app.utils.tip_report_writer import write_employee_tip_reports
+from app.utils.metrics import REPORT_DURATION
+
+# Worker processes for per-employee reports (0 = one per CPU). Batches smaller
+# than REPORT_BATCH_MIN_PARALLEL reports are written inline, where process
+# start-up would cost more than it saves.
+REPORT_BATCH_WORKERS = int(os.getenv("REPORT_BATCH_WORKERS", "0"))
+REPORT_BATCH_MIN_PARALLEL = 8
+
+
+@contextmanager
+def read_snapshot(db: Session):
+    """
+    Run the block's reads in one SQLite read transaction.
+
+    pysqlite leaves SELECTs in autocommit, so on its own each statement sees
+    the latest commit. BEGIN holds one snapshot until the block ends; in WAL
+    mode this does not hold up the writer. If the session's connection is
+    already in a transaction, that transaction is the snapshot.
+    """
+    connection = db.connection()
+    if connection.connection.driver_connection.in_transaction:
+        yield
+        return
+
+    connection.exec_driver_sql("BEGIN")
+    try:
+        yield
+    finally:
+        connection.exec_driver_sql("COMMIT")
+
+
+def _worker_count(workers: Optional[int]):
+    if workers is None:
+        workers = REPORT_BATCH_WORKERS
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def write_reports(jobs, workers: int):
+    """Write employee report jobs, fanning out over `workers` processes when worthwhile."""
+    if workers <= 1 or len(jobs) < REPORT_BATCH_MIN_PARALLEL:
+        return write_employee_tip_reports(jobs)
+
+    workers = min(workers, len(jobs))
+    chunks = [jobs[index::workers] for index in range(workers)]
+    # spawn: the scheduler and db writer threads must not be forked mid-flight
+    context = multiprocessing.get_context("spawn")
+    written = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for paths in pool.map(write_employee_tip_reports, chunks):
+            written.extend(paths)
+    return written
+
+
+def build_employee_report_jobs(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    current_user: Optional[User] = None,
+    source: str = "user",
+    employee_ids=None
+):
+    """
+    Read everything the employee reports need and return writer jobs.
+
+    Covers active employees and anyone with finalized entries in the range,
+    or just employee_ids when given.
+    """
+    entries_by_employee, positions = snapshot_employee_tip_entries(db, start_date, end_date, employee_ids)
+    query = db.query(Employee).options(
+        selectinload(Employee.position_schedules).selectinload(EmployeePositionSchedule.position)
+    )
+    if employee_ids is not None:
+        query = query.filter(Employee.id.in_(list(employee_ids)))
+    else:
+        query = query.filter(or_(Employee.is_active == True, Employee.id.in_(list(entries_by_employee))))
+    employees = query.order_by(Employee.last_name, Employee.first_name).all()
+
+    generated_by = report_generated_by(current_user, source)
+    jobs = []
+    for employee in employees:
+        reports_dir, filename = employee_tip_report_path(employee.slug, start_date, end_date)
+        jobs.append((
+            os.path.join(reports_dir, filename),
+            employee_report_info(employee),
+            positions,
+            entries_by_employee.get(employee.id, []),
+            start_date,
+            end_date,
+            generated_by
+        ))
+    return jobs
+
+
+@REPORT_DURATION.timed(report_type="employee_tip_reports")
+def generate_employee_tip_reports(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    current_user: Optional[User] = None,
+    source: str = "user",
+    employee_ids=None,
+    workers: Optional[int] = None
+):
+    """Write an employee tip report per employee from one snapshot; returns the filepaths."""
+    with read_snapshot(db):
+        jobs = build_employee_report_jobs(db, start_date, end_date, current_user, source, employee_ids)
+    return write_reports(jobs, _worker_count(workers))
+
+
+def zip_employee_tip_reports(filepaths, start_date: date, end_date: date):
+    """Pack employee tip reports into one archive next to them; returns its path."""
+    reports_dir = os.path.join(DATABASE_DIR, "reports", "tip_report", str(start_date.year), f"{start_date.month:02d}")
+    os.makedirs(reports_dir, exist_ok=True)
+    archive_path = os.path.join(reports_dir, f"employee-tip-reports-{start_date}-to-{end_date}.zip")
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filepath in filepaths:
+            archive.write(filepath, arcname=os.path.basename(filepath))
+    return archive_path
+
+
+@REPORT_DURATION.timed(report_type="report_batch")
+def generate_report_batch(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    current_user: Optional[User] = None,
+    source: str = "scheduled_task",
+    workers: Optional[int] = None,
+    include_summary_reports: bool = True
+):
+    """
+    Generate all reports for [start_date, end_date].
+
+    Per-employee reports cover active employees and anyone with finalized
+    entries in the range. include_summary_reports=False skips the tip and
+    consolidated daily balance reports. Returns a summary with the path of
+    every file written and how long the run took.
+    """
+    started = time.perf_counter()
+    workers = _worker_count(workers)
+
+    year = str(start_date.year)
+    month = f"{start_date.month:02d}"
+    summary = {"tip_report": None, "daily_balance_report": None}
+    with read_snapshot(db):
+        if include_summary_reports:
+            tip_report = generate_tip_report_csv(db, start_date, end_date, current_user=current_user, source=source)
+            daily_report = generate_consolidated_daily_balance_csv(db, start_date, end_date, current_user=current_user, source=source)
+            summary["tip_report"] = os.path.join(DATABASE_DIR, "reports", "tip_report", year, month, tip_report)
+            summary["daily_balance_report"] = os.path.join(DATABASE_DIR, "reports", "daily_report", year, month, daily_report)
+
+        jobs = build_employee_report_jobs(db, start_date, end_date, current_user, source)
+
+    prepare_seconds = time.perf_counter() - started
+    employee_reports = write_reports(jobs, workers)
+
+    return {
+        **summary,
+        "employee_reports": employee_reports,
+        "workers": min(workers, len(jobs)) if len(jobs) >= REPORT_BATCH_MIN_PARALLEL else 1,
+        "prepare_seconds": round(prepare_seconds, 3),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,255 @@
+"""
+Schedule index: which employee/position combos are scheduled on a given date.
+
+EmployeePositionSchedule keeps the schedule as entered (day names or a JSON
+list of dates). The index tables hold the same information normalized:
+
+- schedule_weekdays: (weekday, employee_id, position_id) for recurring schedules
+- schedule_dates: (date, employee_id, position_id) for calendar schedules
+
+Both are keyed so "who works on date X" is a single indexed lookup. Rows are
+rewritten whenever an employee's schedules are saved.
+"""
+import json
+from dataclasses import dataclass
+from datetime import date as date_cls
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models import ScheduledCheck, ScheduledEFT, WEEKDAY_NAMES
+
+DAYS_OF_WEEK = WEEKDAY_NAMES
+WEEKDAY_NUMBERS = {day: number for number, day in enumerate(DAYS_OF_WEEK)}
+
+# Every 7-bit weekday_mask value that includes a given weekday. Filtering with
+# weekday_mask IN (...) lets SQLite answer from the (is_active, weekday_mask)
+# index instead of testing each row's bits.
+MASKS_BY_WEEKDAY = [
+    tuple(mask for mask in range(1 << 7) if mask & (1 << weekday))
+    for weekday in range(7)
+]
+
+
+@dataclass(slots=True)
+class ScheduledCheckEntry:
+    """A scheduled check as it pre-fills the daily balance form for one date."""
+    date: date_cls
+    check_number: Optional[str]
+    payable_to: str
+    total: float
+    memo: Optional[str]
+
+
+@dataclass(slots=True)
+class ScheduledEFTEntry:
+    """A scheduled EFT as it pre-fills the daily balance form for one date."""
+    date: date_cls
+    card_number: Optional[str]
+    payable_to: str
+    total: float
+    memo: Optional[str]
+
+
+def get_scheduled_checks_for_weekday(db: Session, weekday: int):
+    """Active ScheduledCheck rows that recur on weekday (0=Monday)."""
+    return db.query(ScheduledCheck).filter(
+        ScheduledCheck.is_active == True,
+        ScheduledCheck.weekday_mask.in_(MASKS_BY_WEEKDAY[weekday])
+    ).order_by(ScheduledCheck.id).all()
+
+
+def get_scheduled_efts_for_weekday(db: Session, weekday: int):
+    """Active ScheduledEFT rows that recur on weekday (0=Monday)."""
+    return db.query(ScheduledEFT).filter(
+        ScheduledEFT.is_active == True,
+        ScheduledEFT.weekday_mask.in_(MASKS_BY_WEEKDAY[weekday])
+    ).order_by(ScheduledEFT.id).all()
+
+
+def scheduled_entries_for_date(db: Session, target_date: date_cls):
+    """ScheduledCheckEntry and ScheduledEFTEntry lists for target_date."""
+    weekday = target_date.weekday()
+    checks = [
+        ScheduledCheckEntry(target_date, c.check_number, c.payable_to, c.default_total, c.memo)
+        for c in get_scheduled_checks_for_weekday(db, weekday)
+    ]
+    efts = [
+        ScheduledEFTEntry(target_date, e.card_number, e.payable_to, e.default_total, e.memo)
+        for e in get_scheduled_efts_for_weekday(db, weekday)
+    ]
+    return checks, efts
+
+
+def schedule_index_rows(schedules):
+    """
+    Expand schedule dicts/objects into index rows.
+
+    Returns (weekday_rows, date_rows) as sets of (weekday|date, employee_id, position_id).
+    A missing schedule_type means 'recurring', as in the model. Other schedule
+    types, unknown day names and unparsable dates are ignored.
+    """
+    weekday_rows = set()
+    date_rows = set()
+    for schedule in schedules:
+        employee_id = schedule.employee_id
+        position_id = schedule.position_id
+        schedule_type = schedule.schedule_type or 'recurring'
+        if schedule_type == 'calendar':
+            for value in schedule.specific_dates or []:
+                try:
+                    day = date_cls.fromisoformat(value)
+                except (TypeError, ValueError):
+                    continue
+                date_rows.add((day, employee_id, position_id))
+        elif schedule_type == 'recurring':
+            for day_name in schedule.days_of_week or []:
+                if day_name in WEEKDAY_NUMBERS:
+                    weekday_rows.add((WEEKDAY_NUMBERS[day_name], employee_id, position_id))
+    return weekday_rows, date_rows
+
+
+def index_employee_schedules(db: Session, employee_id: int, schedules):
+    """
+    Replace an employee's index rows with ones built from `schedules`.
+
+    Runs in the caller's session so the index commits together with the
+    schedule rows it was built from.
+    """
+    weekday_rows, date_rows = schedule_index_rows(schedules)
+
+    db.execute(text("DELETE FROM schedule_weekdays WHERE employee_id = :employee_id"), {"employee_id": employee_id})
+    db.execute(text("DELETE FROM schedule_dates WHERE employee_id = :employee_id"), {"employee_id": employee_id})
+
+    if weekday_rows:
+        db.execute(
+            text("INSERT INTO schedule_weekdays (weekday, employee_id, position_id) VALUES (:weekday, :employee_id, :position_id)"),
+            [{"weekday": w, "employee_id": e, "position_id": p} for w, e, p in weekday_rows]
+        )
+    if date_rows:
+        db.execute(
+            text("INSERT INTO schedule_dates (date, employee_id, position_id) VALUES (:date, :employee_id, :position_id)"),
+            [{"date": d.isoformat(), "employee_id": e, "position_id": p} for d, e, p in date_rows]
+        )
+
+
+def get_scheduled_combo_keys(db: Session, target_date: date_cls):
+    """Return {(employee_id, position_id)} for active employees scheduled on target_date."""
+    rows = db.execute(text("""
+        SELECT sw.employee_id, sw.position_id
+        FROM schedule_weekdays sw
+        JOIN employees e ON e.id = sw.employee_id
+        WHERE sw.weekday = :weekday AND e.is_active = 1
+        UNION
+        SELECT sd.employee_id, sd.position_id
+        FROM schedule_dates sd
+        JOIN employees e ON e.id = sd.employee_id
+        WHERE sd.date = :date AND e.is_active = 1
+    """), {"weekday": target_date.weekday(), "date": target_date.isoformat()})
+    return {(row[0], row[1]) for row in rows}
+
+
+MAX_ROSTER_DAYS = 366
+
+
+def get_scheduled_rosters(db: Session, start_date: date_cls, end_date: date_cls):
+    """
+    Rosters for every date from start_date to end_date inclusive.
+
+    Reads each index table and the scheduled checks/EFTs once, then expands
+    them per day through weekday maps, so cost grows with the number of days
+    plus the number of roster entries rather than days x schedules.
+
+    The result is columnar: parallel lists where `day` is an index into
+    `dates`, plus lookup tables for the ids the entries reference.
+    """
+    span = (end_date - start_date).days + 1
+    dates = [date_cls.fromordinal(start_date.toordinal() + offset) for offset in range(span)]
+
+    combos_by_weekday = [[] for _ in DAYS_OF_WEEK]
+    for weekday, employee_id, position_id in db.execute(text("""
+        SELECT sw.weekday, sw.employee_id, sw.position_id
+        FROM schedule_weekdays sw
+        JOIN employees e ON e.id = sw.employee_id
+        WHERE e.is_active = 1
+        ORDER BY sw.weekday, sw.employee_id, sw.position_id
+    """)):
+        combos_by_weekday[weekday].append((employee_id, position_id))
+
+    combos_by_date = {}
+    for day, employee_id, position_id in db.execute(text("""
+        SELECT sd.date, sd.employee_id, sd.position_id
+        FROM schedule_dates sd
+        JOIN employees e ON e.id = sd.employee_id
+        WHERE sd.date BETWEEN :start AND :end AND e.is_active = 1
+        ORDER BY sd.date, sd.employee_id, sd.position_id
+    """), {"start": start_date.isoformat(), "end": end_date.isoformat()}):
+        combos_by_date.setdefault(day, []).append((employee_id, position_id))
+
+    combo_columns = {"day": [], "employee_id": [], "position_id": []}
+    for index, day in enumerate(dates):
+        day_combos = combos_by_weekday[day.weekday()]
+        extra = combos_by_date.get(day.isoformat())
+        if extra:
+            day_combos = sorted(set(day_combos).union(extra))
+        for employee_id, position_id in day_combos:
+            combo_columns["day"].append(index)
+            combo_columns["employee_id"].append(employee_id)
+            combo_columns["position_id"].append(position_id)
+
+    employee_ids = sorted(set(combo_columns["employee_id"]))
+    position_ids = sorted(set(combo_columns["position_id"]))
+    employees = {}
+    positions = {}
+    if employee_ids:
+        employees = {
+            row[0]: (f"{row[2]}, {row[1]}" if row[1] and row[2] else row[2] or row[1] or row[3])
+            for row in db.execute(
+                text("SELECT id, first_name, last_name, name FROM employees WHERE id IN (SELECT value FROM json_each(:ids))"),
+                {"ids": json.dumps(employee_ids)}
+            )
+        }
+    if position_ids:
+        positions = {
+            row[0]: row[1]
+            for row in db.execute(
+                text("SELECT id, name FROM positions WHERE id IN (SELECT value FROM json_each(:ids))"),
+                {"ids": json.dumps(position_ids)}
+            )
+        }
+
+    return {
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "dates": [day.isoformat() for day in dates],
+        "combos": combo_columns,
+        "employees": {"id": employee_ids, "display_name": [employees.get(i) for i in employee_ids]},
+        "positions": {"id": position_ids, "name": [positions.get(i) for i in position_ids]},
+        "checks": _scheduled_payments_by_day(db, ScheduledCheck, "check_number", dates),
+        "efts": _scheduled_payments_by_day(db, ScheduledEFT, "card_number", dates),
+    }
+
+
+def _scheduled_payments_by_day(db: Session, model, number_field, dates):
+    """Columnar (day, template) pairs for active ScheduledCheck/ScheduledEFT rows, plus the templates."""
+    templates = db.query(model).filter(model.is_active == True).order_by(model.id).all()
+
+    template_indexes_by_weekday = [[] for _ in DAYS_OF_WEEK]
+    for template_index, template in enumerate(templates):
+        for weekday in range(7):
+            if (template.weekday_mask or 0) & (1 << weekday):
+                template_indexes_by_weekday[weekday].append(template_index)
+
+    columns = {"day": [], "template": []}
+    for index, day in enumerate(dates):
+        for template_index in template_indexes_by_weekday[day.weekday()]:
+            columns["day"].append(index)
+            columns["template"].append(template_index)
+
+    columns["templates"] = {
+        "id": [t.id for t in templates],
+        number_field: [getattr(t, number_field) for t in templates],
+        "payable_to": [t.payable_to for t in templates],
+        "total": [t.default_total for t in templates],
+        "memo": [t.memo for t in templates],
+    }
+    return columns
@@ -1,18 +1,57 @@
 import os
 import json
+import logging
 import time
+from contextlib import nullcontext
+from functools import wraps
 from datetime import datetime, timedelta, date
 from dateutil.relativedelta import relativedelta
 from sqlalchemy import text
-from sqlalchemy.exc import OperationalError
 import pytz
 from app.database import SessionLocal, DATABASE_DIR
+from app.db_writer import db_writer
 from app.models import User
 from app.utils.csv_generator import generate_tip_report_csv, generate_consolidated_daily_balance_csv, generate_employee_tip_report_csv
-from app.utils.email import send_report_emails
+from app.utils.email import send_report_emails, send_digest_email
 from app.scheduler import cleanup_old_executions
 from app.utils.backup import create_backup
+from app.utils.maintenance import run_database_maintenance
+from app.services.report_batch import generate_report_batch, generate_employee_tip_reports, zip_employee_tip_reports
 from app.models import Employee
+from app.utils.logging_config import log_context, bind_log_context
+from app.utils.metrics import TASK_RUNS, TASK_DURATION
+from app.utils.profiling import profile_session
+
+logger = logging.getLogger(__name__)
+
+
+def instrumented_task(func):
+    """
+    Wrap a scheduled task runner with its logging, metrics and profiling:
+    log records emitted during the run are tagged with its task_id and the
+    run is recorded in the task metrics.
+
+    The task functions handle their own errors and return True only when the
+    run completed, so that return value is the run's outcome. profile=True
+    (the task's "Profile" flag) saves a profile of the report generation
+    done during the run.
+    """
+    # run_<task_type>_task, matching scheduled_tasks.task_type
+    task_type = func.__name__.removeprefix("run_").removesuffix("_task")
+
+    @wraps(func)
+    def wrapper(task_id, *args, profile=False, **kwargs):
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            with log_context(task_id=task_id):
+                with profile_session(f"task {task_id} {task_type}") if profile else nullcontext():
+                    succeeded = func(task_id, *args, **kwargs)
+                return succeeded
+        finally:
+            TASK_DURATION.observe(time.perf_counter() - started, task_type=task_type)
+            TASK_RUNS.inc(task_type=task_type, status="success" if succeeded else "failed")
+    return wrapper
 
 def force_update_execution_status(execution_id, status, result_data=None, error_message=None):
     """
@@ -22,7 +61,7 @@ def force_update_execution_status(execution_id, status, result_data=None, error_
     """
     db = SessionLocal()
     try:
-        print(f"  → [FORCE UPDATE] Creating fresh DB connection for execution {execution_id}")
+        logger.debug("[FORCE UPDATE] Creating fresh DB connection for execution %s", execution_id)
 
         if status == 'success':
             db.execute(text("""
@@ -42,61 +81,22 @@ def force_update_execution_status(execution_id, status, result_data=None, error_
             """), {"execution_id": execution_id, "error_message": error_message})
 
         db.commit()
-        print(f"  → [FORCE UPDATE] Status updated to '{status}' and committed")
+        logger.debug("[FORCE UPDATE] Status updated to '%s' and committed", status)
 
         # Verify it stuck
         verify = db.execute(text("""
             SELECT status FROM task_executions WHERE id = :execution_id
         """), {"execution_id": execution_id}).scalar()
-        print(f"  → [FORCE UPDATE] Verification: status is '{verify}'")
+        logger.debug("[FORCE UPDATE] Verification: status is '%s'", verify)
 
         return True
     except Exception as e:
-        print(f"  ✗ [FORCE UPDATE] Failed: {e}")
+        logger.error("[FORCE UPDATE] Failed: %s", e)
         db.rollback()
         return False
     finally:
         db.close()
 
-def commit_with_retry(db, max_retries=5, base_delay=0.1):
-    """
-    Attempt to commit database changes with retry logic for SQLite locking issues.
-
-    Args:
-        db: Database session
-        max_retries: Maximum number of retry attempts
-        base_delay: Base delay in seconds (will increase exponentially)
-
-    Returns:
-        bool: True if commit succeeded, False otherwise
-    """
-    print(f"  → [COMMIT] Attempting to commit transaction (max {max_retries} attempts)...")
-
-    for attempt in range(max_retries):
-        try:
-            db.commit()
-            print(f"  ✓ [COMMIT] Successfully committed on attempt {attempt + 1}")
-            return True
-        except OperationalError as e:
-            if attempt < max_retries - 1:
-                delay = base_delay * (2 ** attempt)
-                print(f"  ⚠ [COMMIT] Database locked, retrying in {delay}s (attempt {attempt + 1}/{max_retries}): {e}")
-                time.sleep(delay)
-                db.rollback()
-            else:
-                print(f"  ✗ [COMMIT] Database commit failed after {max_retries} attempts: {e}")
-                import traceback
-                traceback.print_exc()
-                db.rollback()
-                return False
-        except Exception as e:
-            print(f"  ✗ [COMMIT] Unexpected error during commit: {e}")
-            import traceback
-            traceback.print_exc()
-            db.rollback()
-            return False
-    return False
-
 def verify_execution_status(db, execution_id, expected_status):
     """
     Verify that a task execution has the expected status in the database.
@@ -115,25 +115,23 @@ def verify_execution_status(db, execution_id, expected_status):
         """), {"execution_id": execution_id}).fetchone()
 
         if not result:
-            print(f"⚠ Verification failed: No record found for execution_id={execution_id}")
+            logger.warning("Verification failed: No record found for execution_id=%s", execution_id)
             # Check if any records exist at all
             count = db.execute(text("SELECT COUNT(*) FROM task_executions")).scalar()
-            print(f"  → Total records in task_executions: {count}")
+            logger.debug("Total records in task_executions: %s", count)
             return False
 
         actual_status = result[0]
         completed_at = result[1]
 
         if actual_status == expected_status:
-            print(f"✓ Verification passed: status='{actual_status}', completed_at='{completed_at}'")
+            logger.debug("Verification passed: status='%s', completed_at='%s'", actual_status, completed_at)
             return True
         else:
-            print(f"⚠ Status mismatch: expected '{expected_status}', got '{actual_status}' (completed_at='{completed_at}')")
+            logger.warning("Status mismatch: expected '%s', got '%s' (completed_at='%s')", expected_status, actual_status, completed_at)
             return False
     except Exception as e:
-        print(f"✗ Error verifying execution status: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error verifying execution status: %s", e)
         return False
 
 def calculate_date_range(date_range_type):
@@ -184,6 +182,137 @@ def calculate_date_range(date_range_type):
 
     return start_date, end_date
 
+def run_task_execution(task_id, task_name, task_label, body):
+    """
+    Run one execution of a scheduled task and record it in task_executions.
+
+    The lifecycle every task shares: check the task exists, fail stale
+    'running' executions, create a 'running' execution, run
+    body(db, execution_id) and store what it returns (JSON-encoded) as the
+    result, then update the task's last/next run times. Any exception marks
+    the execution failed. task_label names the task in log messages
+    (e.g. "Backup"). Returns True when the run succeeded.
+    """
+    db = SessionLocal()
+    execution_id = None
+
+    try:
+        logger.info("Starting %s task '%s' (ID: %s)", task_label.lower(), task_name, task_id)
+
+        task_exists = db.execute(text("""
+            SELECT COUNT(*) FROM scheduled_tasks WHERE id = :task_id
+        """), {"task_id": task_id}).scalar()
+
+        if not task_exists:
+            raise Exception(f"Task ID {task_id} does not exist in scheduled_tasks table")
+
+        # Cleanup any stale "running" executions (older than 5 minutes) before creating new one
+        try:
+            stale_count = db_writer.execute("""
+                UPDATE task_executions
+                SET status = 'failed',
+                    completed_at = CURRENT_TIMESTAMP,
+                    error_message = 'Task execution marked as stale (exceeded timeout)'
+                WHERE task_id = :task_id
+                  AND status = 'running'
+                  AND started_at < datetime('now', '-5 minutes')
+            """, {"task_id": task_id}).rowcount
+            if stale_count > 0:
+                logger.debug("Cleaned up %s stale execution(s)", stale_count)
+        except Exception as e:
+            logger.warning("Failed to commit stale execution cleanup: %s", e)
+
+        result = db_writer.execute("""
+            INSERT INTO task_executions (task_id, started_at, status)
+            VALUES (:task_id, datetime('now'), 'running')
+            RETURNING id
+        """, {"task_id": task_id})
+
+        execution_id = result.scalar()
+
+        if not execution_id or execution_id == 0:
+            raise Exception(f"Failed to get valid execution_id (got: {execution_id}). This may indicate a foreign key constraint issue or missing task_id: {task_id}")
+
+        bind_log_context(execution_id=execution_id)
+        logger.debug("Created execution record (ID: %s)", execution_id)
+
+        result_data = json.dumps(body(db, execution_id))
+
+        db_writer.execute("""
+            UPDATE task_executions
+            SET completed_at = CURRENT_TIMESTAMP,
+                status = 'success',
+                result_data = :result_data
+            WHERE id = :execution_id
+        """, {"execution_id": execution_id, "result_data": result_data})
+
+        db.expire_all()
+
+        if not verify_execution_status(db, execution_id, 'success'):
+            raise Exception("Task execution status verification failed")
+
+        task_info = db.execute(text("""
+            SELECT schedule_type, cron_expression, interval_value, interval_unit, starts_at
+            FROM scheduled_tasks
+            WHERE id = :task_id
+        """), {"task_id": task_id}).fetchone()
+
+        if task_info:
+            from app.scheduler import get_next_run_times
+            next_runs = get_next_run_times(
+                schedule_type=task_info[0],
+                cron_expression=task_info[1],
+                interval_value=task_info[2],
+                interval_unit=task_info[3],
+                starts_at=task_info[4],
+                count=1
+            )
+            next_run_at = next_runs[0].isoformat() if next_runs else None
+        else:
+            next_run_at = None
+
+        try:
+            db_writer.execute("""
+                UPDATE scheduled_tasks
+                SET last_run_at = CURRENT_TIMESTAMP,
+                    next_run_at = :next_run_at
+                WHERE id = :task_id
+            """, {"task_id": task_id, "next_run_at": next_run_at})
+        except Exception as e:
+            logger.warning("Failed to update scheduled task metadata for '%s': %s", task_name, e)
+
+        cleanup_old_executions(task_id)
+
+        logger.info("%s task '%s' completed successfully", task_label, task_name)
+        return True
+
+    except Exception as e:
+        error_message = str(e)
+        logger.exception("%s task '%s' failed: %s", task_label, task_name, error_message)
+
+        if execution_id:
+            try:
+                db_writer.execute("""
+                    UPDATE task_executions
+                    SET completed_at = CURRENT_TIMESTAMP,
+                        status = 'failed',
+                        error_message = :error_message
+                    WHERE id = :execution_id
+                """, {"execution_id": execution_id, "error_message": error_message})
+                logger.debug("Marked execution %s as failed", execution_id)
+            except Exception as update_error:
+                logger.error("Could not mark execution %s as failed: %s", execution_id, update_error)
+        else:
+            logger.error("No execution_id available to mark as failed")
+        return False
+
+    finally:
+        try:
+            db.close()
+        except Exception as close_error:
+            logger.error("[FINALLY] Error closing database: %s", close_error)
+
+@instrumented_task
 def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, bypass_opt_in, attach_csv=False):
     """
     Generate and email a tip report.
@@ -196,9 +325,7 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
         bypass_opt_in: Whether to bypass email opt-in preference (0 or 1)
         attach_csv: Whether to attach CSV file to email (default: False)
     """
-    print(f"\n{'='*80}")
-    print(f"▶️  TASK TRIGGERED: '{task_name}' (ID: {task_id}) at {datetime.now()}")
-    print(f"{'='*80}\n")
+    logger.info("Tip report task '%s' triggered (ID: %s)", task_name, task_id)
 
     db = SessionLocal()
     execution_id = None
@@ -206,7 +333,7 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
     final_result_data = None
 
     try:
-        print(f"  → Starting tip report task '{task_name}' (ID: {task_id})")
+        logger.debug("Starting tip report task '%s' (ID: %s)", task_name, task_id)
 
         # Verify the task exists before creating execution
         task_exists = db.execute(text("""
@@ -217,37 +344,33 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
             raise Exception(f"Task ID {task_id} does not exist in scheduled_tasks table")
 
         # Cleanup any stale "running" executions (older than 5 minutes) before creating new one
-        stale_count = db.execute(text("""
-            UPDATE task_executions
-            SET status = 'failed',
-                completed_at = CURRENT_TIMESTAMP,
-                error_message = 'Task execution marked as stale (exceeded timeout)'
-            WHERE task_id = :task_id
-              AND status = 'running'
-              AND started_at < datetime('now', '-5 minutes')
-        """), {"task_id": task_id}).rowcount
-
-        if stale_count > 0:
-            if not commit_with_retry(db):
-                print(f"  ⚠ Warning: Failed to commit stale execution cleanup")
-            else:
-                print(f"  → Cleaned up {stale_count} stale execution(s)")
+        try:
+            stale_count = db_writer.execute("""
+                UPDATE task_executions
+                SET status = 'failed',
+                    completed_at = CURRENT_TIMESTAMP,
+                    error_message = 'Task execution marked as stale (exceeded timeout)'
+                WHERE task_id = :task_id
+                  AND status = 'running'
+                  AND started_at < datetime('now', '-5 minutes')
+            """, {"task_id": task_id}).rowcount
+            if stale_count > 0:
+                logger.debug("Cleaned up %s stale execution(s)", stale_count)
+        except Exception as e:
+            logger.warning("Failed to commit stale execution cleanup: %s", e)
 
         start_date, end_date = calculate_date_range(date_range_type)
-        print(f"  → Date range: {start_date} to {end_date}")
+        logger.debug("Date range: %s to %s", start_date, end_date)
 
         # Insert the execution record and get its ID in one query
-        result = db.execute(text("""
+        result = db_writer.execute("""
             INSERT INTO task_executions (task_id, started_at, status)
             VALUES (:task_id, datetime('now'), 'running')
             RETURNING id
-        """), {"task_id": task_id})
+        """, {"task_id": task_id})
 
         execution_id = result.scalar()
 
-        if not commit_with_retry(db):
-            raise Exception("Failed to create task execution record")
-
         if not execution_id or execution_id == 0:
             raise Exception(f"Failed to get valid execution_id (got: {execution_id}). This may indicate a foreign key constraint issue or missing task_id: {task_id}")
 
@@ -261,7 +384,8 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
             total_records = db.execute(text("SELECT COUNT(*) FROM task_executions")).scalar()
             raise Exception(f"Execution record {execution_id} was not persisted to database. Total records: {total_records}. This may indicate a database write issue.")
 
-        print(f"  → Created execution record (ID: {execution_id})")
+        bind_log_context(execution_id=execution_id)
+        logger.debug("Created execution record (ID: %s)", execution_id)
 
         filename = generate_tip_report_csv(db, start_date, end_date, current_user=None, source="scheduled_task")
         year = str(start_date.year)
@@ -299,8 +423,8 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
             if not result["success"]:
                 raise Exception(f"Email sending failed: {result.get('message', 'Unknown error')}")
 
-        print(f"  → Report generated: {filename}")
-        print(f"  → Emails sent: {len(email_list)}")
+        logger.debug("Report generated: %s", filename)
+        logger.debug("Emails sent: %s", len(email_list))
 
         final_result_data = json.dumps({
             "filename": filename,
@@ -308,29 +432,17 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
             "emails_sent": len(email_list)
         })
 
-        print(f"  → [CRITICAL] Marking execution {execution_id} as SUCCESS...")
+        logger.debug("[CRITICAL] Marking execution %s as SUCCESS...", execution_id)
 
-        time.sleep(0.05)
-
-        db.execute(text("""
+        db_writer.execute("""
             UPDATE task_executions
             SET completed_at = CURRENT_TIMESTAMP,
                 status = 'success',
                 result_data = :result_data
             WHERE id = :execution_id
-        """), {"execution_id": execution_id, "result_data": final_result_data})
-
-        print(f"  → [CRITICAL] UPDATE statement executed, attempting commit...")
+        """, {"execution_id": execution_id, "result_data": final_result_data})
 
-        commit_success = commit_with_retry(db)
-        print(f"  → [CRITICAL] Commit result: {commit_success}")
-
-        if not commit_success:
-            raise Exception("Failed to commit task execution status to success")
-
-        # Force SQLite to complete any pending writes
-        db.execute(text("SELECT 1")).fetchone()
-        time.sleep(0.1)
+        logger.debug("[CRITICAL] Status update committed by writer")
 
         # Verify status immediately after commit
         verification = db.execute(text("""
@@ -340,19 +452,17 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
         if not verification:
             raise Exception(f"Status verification FAILED: No record found for execution_id={execution_id}")
 
-        print(f"  → [CRITICAL] Verification check: status='{verification[0]}', completed_at='{verification[1]}'")
+        logger.debug("[CRITICAL] Verification check: status='%s', completed_at='%s'", verification[0], verification[1])
 
         if verification[0] != 'success':
             raise Exception(f"Status verification FAILED: expected 'success', got '{verification[0]}'")
 
-        print(f"  ✓ [SUCCESS] Execution {execution_id} confirmed as 'success' in database")
+        logger.debug("[SUCCESS] Execution %s confirmed as 'success' in database", execution_id)
 
         # Mark that task succeeded for finally block
         task_succeeded = True
 
-        time.sleep(0.05)
-
-        print(f"  → Updating scheduled task metadata...")
+        logger.debug("Updating scheduled task metadata...")
 
         task_info = db.execute(text("""
             SELECT schedule_type, cron_expression, interval_value, interval_unit, starts_at
@@ -374,77 +484,71 @@ def run_tip_report_task(task_id, task_name, date_range_type, email_list_json, by
         else:
             next_run_at = None
 
-        db.execute(text("""
-            UPDATE scheduled_tasks
-            SET last_run_at = CURRENT_TIMESTAMP,
-                next_run_at = :next_run_at
-            WHERE id = :task_id
-        """), {"task_id": task_id, "next_run_at": next_run_at})
-
-        if not commit_with_retry(db):
-            print(f"  ⚠ Warning: Failed to update scheduled task metadata for '{task_name}'")
-        else:
-            print(f"  ✓ Task metadata updated")
+        try:
+            db_writer.execute("""
+                UPDATE scheduled_tasks
+                SET last_run_at = CURRENT_TIMESTAMP,
+                    next_run_at = :next_run_at
+                WHERE id = :task_id
+            """, {"task_id": task_id, "next_run_at": next_run_at})
+            logger.debug("Task metadata updated")
+        except Exception as e:
+            logger.warning("Failed to update scheduled task metadata for '%s': %s", task_name, e)
 
         cleanup_old_executions(task_id)
 
-        print(f"✓✓✓ Tip report task '{task_name}' COMPLETED SUCCESSFULLY ✓✓✓")
+        logger.info("Tip report task '%s' completed successfully", task_name)
+        return True
 
     except Exception as e:
         error_message = str(e)
-        print(f"✗ Tip report task '{task_name}' failed: {error_message}")
+        logger.exception("Tip report task '%s' failed: %s", task_name, error_message)
 
-        import traceback
-        traceback.print_exc()
 
         if execution_id:
             try:
-                time.sleep(0.05)
-                db.execute(text("""
+                db_writer.execute("""
                     UPDATE task_executions
                     SET completed_at = CURRENT_TIMESTAMP,
                         status = 'failed',
                         error_message = :error_message
                     WHERE id = :execution_id
-                """), {"execution_id": execution_id, "error_message": error_message})
-
-                if commit_with_retry(db):
-                    print(f"  ✓ Marked execution {execution_id} as failed")
-                else:
-                    print(f"  ✗ WARNING: Could not mark execution {execution_id} as failed!")
+                """, {"execution_id": execution_id, "error_message": error_message})
+                logger.debug("Marked execution %s as failed", execution_id)
             except Exception as update_error:
-                print(f"  ✗ ERROR updating execution status: {update_error}")
+                logger.error("Could not mark execution %s as failed: %s", execution_id, update_error)
         else:
-            print(f"  ✗ No execution_id available to mark as failed")
+            logger.error("No execution_id available to mark as failed")
 
     finally:
         try:
-            print(f"  → [FINALLY] Closing database connection...")
+            logger.debug("[FINALLY] Closing database connection...")
             db.close()
-            print(f"  → [FINALLY] Database connection closed")
+            logger.debug("[FINALLY] Database connection closed")
 
             # SAFETY CHECK: If task succeeded but might not have updated status, force update with new connection
             if task_succeeded and execution_id:
-                print(f"  → [SAFETY] Task succeeded, verifying status with fresh connection...")
+                logger.debug("[SAFETY] Task succeeded, verifying status with fresh connection...")
                 verify_db = SessionLocal()
                 try:
                     status_check = verify_db.execute(text("""
                         SELECT status FROM task_executions WHERE id = :execution_id
                     """), {"execution_id": execution_id}).scalar()
 
-                    print(f"  → [SAFETY] Status is '{status_check}'")
+                    logger.debug("[SAFETY] Status is '%s'", status_check)
 
                     if status_check != 'success':
-                        print(f"  ⚠️  [SAFETY] Status is '{status_check}' but should be 'success'! Force updating...")
+                        logger.warning("[SAFETY] Status is '%s' but should be 'success'! Force updating...", status_check)
                         force_update_execution_status(execution_id, 'success', final_result_data)
                     else:
-                        print(f"  ✓ [SAFETY] Status correctly set to 'success'")
+                        logger.debug("[SAFETY] Status correctly set to 'success'")
                 finally:
                     verify_db.close()
 
         except Exception as close_error:
-            print(f"  ✗ [FINALLY] ERROR closing database: {close_error}")
+            logger.error("[FINALLY] Error closing database: %s", close_error)
 
+@instrumented_task
 def run_daily_balance_report_task(task_id, task_name, date_range_type, email_list_json, bypass_opt_in, attach_csv=False):
     """
     Generate and email a daily balance report.
@@ -461,7 +565,7 @@ def run_daily_balance_report_task(task_id, task_name, date_range_type, email_lis
     execution_id = None
 
     try:
-        print(f"▶️  Starting daily balance report task '{task_name}' (ID: {task_id})")
+        logger.info("Starting daily balance report task '%s' (ID: %s)", task_name, task_id)
 
         # Verify the task exists before creating execution
         task_exists = db.execute(text("""
@@ -472,37 +576,33 @@ def run_daily_balance_report_task(task_id, task_name, date_range_type, email_lis
             raise Exception(f"Task ID {task_id} does not exist in scheduled_tasks table")
 
         # Cleanup any stale "running" executions (older than 5 minutes) before creating new one
-        stale_count = db.execute(text("""
-            UPDATE task_executions
-            SET status = 'failed',
-                completed_at = CURRENT_TIMESTAMP,
-                error_message = 'Task execution marked as stale (exceeded timeout)'
-            WHERE task_id = :task_id
-              AND status = 'running'
-              AND started_at < datetime('now', '-5 minutes')
-        """), {"task_id": task_id}).rowcount
-
-        if stale_count > 0:
-            if not commit_with_retry(db):
-                print(f"  ⚠ Warning: Failed to commit stale execution cleanup")
-            else:
-                print(f"  → Cleaned up {stale_count} stale execution(s)")
+        try:
+            stale_count = db_writer.execute("""
+                UPDATE task_executions
+                SET status = 'failed',
+                    completed_at = CURRENT_TIMESTAMP,
+                    error_message = 'Task execution marked as stale (exceeded timeout)'
+                WHERE task_id = :task_id
+                  AND status = 'running'
+                  AND started_at < datetime('now', '-5 minutes')
+            """, {"task_id": task_id}).rowcount
+            if stale_count > 0:
+                logger.debug("Cleaned up %s stale execution(s)", stale_count)
+        except Exception as e:
+            logger.warning("Failed to commit stale execution cleanup: %s", e)
 
         start_date, end_date = calculate_date_range(date_range_type)
-        print(f"  → Date range: {start_date} to {end_date}")
+        logger.debug("Date range: %s to %s", start_date, end_date)
 
         # Insert the execution record and get its ID in one query
-        result = db.execute(text("""
+        result = db_writer.execute("""
             INSERT INTO task_executions (task_id, started_at, status)
             VALUES (:task_id, datetime('now'), 'running')
             RETURNING id
-        """), {"task_id": task_id})
+        """, {"task_id": task_id})
 
         execution_id = result.scalar()
 
-        if not commit_with_retry(db):
-            raise Exception("Failed to create task execution record")
-
         if not execution_id or execution_id == 0:
             raise Exception(f"Failed to get valid execution_id (got: {execution_id}). This may indicate a foreign key constraint issue or missing task_id: {task_id}")
 
@@ -516,7 +616,8 @@ def run_daily_balance_report_task(task_id, task_name, date_range_type, email_lis
             total_records = db.execute(text("SELECT COUNT(*) FROM task_executions")).scalar()
             raise Exception(f"Execution record {execution_id} was not persisted to database. Total records: {total_records}. This may indicate a database write issue.")
 
-        print(f"  → Created execution record (ID: {execution_id})")
+        bind_log_context(execution_id=execution_id)
+        logger.debug("Created execution record (ID: %s)", execution_id)
 
         filename = generate_consolidated_daily_balance_csv(db, start_date, end_date, current_user=None, source="scheduled_task")
 
@@ -561,18 +662,13 @@ def run_daily_balance_report_task(task_id, task_name, date_range_type, email_lis
             "emails_sent": len(email_list)
         })
 
-        time.sleep(0.05)
-
-        db.execute(text("""
+        db_writer.execute("""
             UPDATE task_executions
             SET completed_at = CURRENT_TIMESTAMP,
                 status = 'success',
                 result_data = :result_data
             WHERE id = :execution_id
-        """), {"execution_id": execution_id, "result_data": result_data})
-
-        if not commit_with_retry(db):
-            raise Exception("Failed to update task execution status to success")
+        """, {"execution_id": execution_id, "result_data": result_data})
 
         # Clear session cache to ensure fresh data is read during verification
         db.expire_all()
@@ -580,8 +676,6 @@ def run_daily_balance_report_task(task_id, task_name, date_range_type, email_lis
         if not verify_execution_status(db, execution_id, 'success'):
             raise Exception("Task execution status verification failed")
 
-        time.sleep(0.05)
-
         task_info = db.execute(text("""
             SELECT schedule_type, cron_expression, interval_value, interval_unit, starts_at
             FROM scheduled_tasks
@@ -602,58 +696,53 @@ def run_daily_balance_report_task(task_id, task_name, date_range_type, email_lis
         else:
             next_run_at = None
 
-        db.execute(text("""
-            UPDATE scheduled_tasks
-            SET last_run_at = CURRENT_TIMESTAMP,
-                next_run_at = :next_run_at
-            WHERE id = :task_id
-        """), {"task_id": task_id, "next_run_at": next_run_at})
-
-        if not commit_with_retry(db):
-            print(f"⚠ Warning: Failed to update scheduled task metadata for '{task_name}'")
+        try:
+            db_writer.execute("""
+                UPDATE scheduled_tasks
+                SET last_run_at = CURRENT_TIMESTAMP,
+                    next_run_at = :next_run_at
+                WHERE id = :task_id
+            """, {"task_id": task_id, "next_run_at": next_run_at})
+        except Exception as e:
+            logger.warning("Failed to update scheduled task metadata for '%s': %s", task_name, e)
 
         cleanup_old_executions(task_id)
 
-        print(f"✓ Daily balance report task '{task_name}' completed successfully")
+        logger.info("Daily balance report task '%s' completed successfully", task_name)
+        return True
 
     except Exception as e:
         error_message = str(e)
-        print(f"✗ Daily balance report task '{task_name}' failed: {error_message}")
+        logger.exception("Daily balance report task '%s' failed: %s", task_name, error_message)
 
-        import traceback
-        traceback.print_exc()
 
         if execution_id:
             try:
-                time.sleep(0.05)
-                db.execute(text("""
+                db_writer.execute("""
                     UPDATE task_executions
                     SET completed_at = CURRENT_TIMESTAMP,
                         status = 'failed',
                         error_message = :error_message
                     WHERE id = :execution_id
-                """), {"execution_id": execution_id, "error_message": error_message})
-
-                if commit_with_retry(db):
-                    print(f"  ✓ Marked execution {execution_id} as failed")
-                else:
-                    print(f"  ✗ WARNING: Could not mark execution {execution_id} as failed!")
+                """, {"execution_id": execution_id, "error_message": error_message})
+                logger.debug("Marked execution %s as failed", execution_id)
             except Exception as update_error:
-                print(f"  ✗ ERROR updating execution status: {update_error}")
+                logger.error("Could not mark execution %s as failed: %s", execution_id, update_error)
         else:
-            print(f"  ✗ No execution_id available to mark as failed")
+            logger.error("No execution_id available to mark as failed")
 
     finally:
         try:
-            print(f"  → [FINALLY] Closing database connection...")
+            logger.debug("[FINALLY] Closing database connection...")
             db.close()
-            print(f"  → [FINALLY] Database connection closed")
+            logger.debug("[FINALLY] Database connection closed")
         except Exception as close_error:
-            print(f"  ✗ [FINALLY] ERROR closing database: {close_error}")
+            logger.error("[FINALLY] Error closing database: %s", close_error)
 
+@instrumented_task
 def run_employee_tip_report_task(task_id, task_name, date_range_type, email_list_json, bypass_opt_in, employee_id, attach_csv=False):
     """
-    Generate and email an employee tip report.
+    Generate and email an employee tip report, or one per employee.
 
     Args:
         task_id: Scheduled task ID
@@ -661,14 +750,14 @@ def run_employee_tip_report_task(task_id, task_name, date_range_type, email_list
         date_range_type: Type of date range (e.g., 'previous_week')
         email_list_json: JSON string of email addresses
         bypass_opt_in: Whether to bypass email opt-in preference (0 or 1)
-        employee_id: ID of the employee
+        employee_id: ID of the employee, or None for every employee (one report each)
         attach_csv: Whether to attach CSV file to email (default: False)
     """
     db = SessionLocal()
     execution_id = None
 
     try:
-        print(f"▶️  Starting employee tip report task '{task_name}' (ID: {task_id})")
+        logger.info("Starting employee tip report task '%s' (ID: %s)", task_name, task_id)
 
         # Verify the task exists before creating execution
         task_exists = db.execute(text("""
@@ -679,37 +768,33 @@ def run_employee_tip_report_task(task_id, task_name, date_range_type, email_list
             raise Exception(f"Task ID {task_id} does not exist in scheduled_tasks table")
 
         # Cleanup any stale "running" executions (older than 5 minutes) before creating new one
-        stale_count = db.execute(text("""
-            UPDATE task_executions
-            SET status = 'failed',
-                completed_at = CURRENT_TIMESTAMP,
-                error_message = 'Task execution marked as stale (exceeded timeout)'
-            WHERE task_id = :task_id
-              AND status = 'running'
-              AND started_at < datetime('now', '-5 minutes')
-        """), {"task_id": task_id}).rowcount
-
-        if stale_count > 0:
-            if not commit_with_retry(db):
-                print(f"  ⚠ Warning: Failed to commit stale execution cleanup")
-            else:
-                print(f"  → Cleaned up {stale_count} stale execution(s)")
+        try:
+            stale_count = db_writer.execute("""
+                UPDATE task_executions
+                SET status = 'failed',
+                    completed_at = CURRENT_TIMESTAMP,
+                    error_message = 'Task execution marked as stale (exceeded timeout)'
+                WHERE task_id = :task_id
+                  AND status = 'running'
+                  AND started_at < datetime('now', '-5 minutes')
+            """, {"task_id": task_id}).rowcount
+            if stale_count > 0:
+                logger.debug("Cleaned up %s stale execution(s)", stale_count)
+        except Exception as e:
+            logger.warning("Failed to commit stale execution cleanup: %s", e)
 
         start_date, end_date = calculate_date_range(date_range_type)
-        print(f"  → Date range: {start_date} to {end_date}")
+        logger.debug("Date range: %s to %s", start_date, end_date)
 
         # Insert the execution record and get its ID in one query
-        result = db.execute(text("""
+        result = db_writer.execute("""
             INSERT INTO task_executions (task_id, started_at, status)
             VALUES (:task_id, datetime('now'), 'running')
             RETURNING id
-        """), {"task_id": task_id})
+        """, {"task_id": task_id})
 
         execution_id = result.scalar()
 
-        if not commit_with_retry(db):
-            raise Exception("Failed to create task execution record")
-
         if not execution_id or execution_id == 0:
             raise Exception(f"Failed to get valid execution_id (got: {execution_id}). This may indicate a foreign key constraint issue or missing task_id: {task_id}")
 
@@ -723,19 +808,27 @@ def run_employee_tip_report_task(task_id, task_name, date_range_type, email_list
             total_records = db.execute(text("SELECT COUNT(*) FROM task_executions")).scalar()
             raise Exception(f"Execution record {execution_id} was not persisted to database. Total records: {total_records}. This may indicate a database write issue.")
 
-        print(f"  → Created execution record (ID: {execution_id})")
+        bind_log_context(execution_id=execution_id)
+        logger.debug("Created execution record (ID: %s)", execution_id)
 
-        employee = db.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
-            raise Exception(f"Employee with ID {employee_id} not found")
+        if employee_id:
+            employee = db.query(Employee).filter(Employee.id == employee_id).first()
+            if not employee:
+                raise Exception(f"Employee with ID {employee_id} not found")
 
-        filename = generate_employee_tip_report_csv(db, employee, start_date, end_date, current_user=None, source="scheduled_task")
-        year = str(start_date.year)
-        month = f"{start_date.month:02d}"
-        filepath = os.path.join(DATABASE_DIR, "reports", "tip_report", year, month, filename)
+            filename = generate_employee_tip_report_csv(db, employee, start_date, end_date, current_user=None, source="scheduled_task")
+            year = str(start_date.year)
+            month = f"{start_date.month:02d}"
+            filepath = os.path.join(DATABASE_DIR, "reports", "tip_report", year, month, filename)
 
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"Report file not found: {filepath}")
+            if not os.path.exists(filepath):
+                raise FileNotFoundError(f"Report file not found: {filepath}")
+        else:
+            # All employees: one snapshot of the period, split into a report per employee
+            employee = None
+            filepaths = generate_employee_tip_reports(db, start_date, end_date, source="scheduled_task")
+            archive_path = zip_employee_tip_reports(filepaths, start_date, end_date) if attach_csv else None
+            logger.debug("Wrote %s employee report(s)", len(filepaths))
 
         email_list = json.loads(email_list_json) if email_list_json else []
 
@@ -751,39 +844,54 @@ def run_employee_tip_report_task(task_id, task_name, date_range_type, email_list
 
         if email_list:
             date_range = f"{start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}"
-            subject = f"[Scheduled] Employee Tip Report - {employee.name} - {date_range}"
 
-            result = send_report_emails(
-                to_emails=email_list,
-                report_type="tips",
-                report_filepath=filepath,
-                subject=subject,
-                date_range=date_range,
-                attach_csv=attach_csv
-            )
+            if employee:
+                subject = f"[Scheduled] Employee Tip Report - {employee.name} - {date_range}"
+                result = send_report_emails(
+                    to_emails=email_list,
+                    report_type="tips",
+                    report_filepath=filepath,
+                    subject=subject,
+                    date_range=date_range,
+                    attach_csv=attach_csv
+                )
+            else:
+                subject = f"[Scheduled] Employee Tip Reports - All Employees - {date_range}"
+                result = send_digest_email(
+                    to_emails=email_list,
+                    subject=subject,
+                    date_range=date_range,
+                    summary_filepaths=[],
+                    employee_filepaths=filepaths,
+                    attach_csv=attach_csv,
+                    archive_filepath=archive_path
+                )
 
             if not result["success"]:
                 raise Exception(f"Email sending failed: {result.get('message', 'Unknown error')}")
 
-        result_data = json.dumps({
-            "filename": filename,
-            "employee_name": employee.name,
-            "date_range": f"{start_date} to {end_date}",
-            "emails_sent": len(email_list)
-        })
-
-        time.sleep(0.05)
-
-        db.execute(text("""
+        if employee:
+            result_data = json.dumps({
+                "filename": filename,
+                "employee_name": employee.name,
+                "date_range": f"{start_date} to {end_date}",
+                "emails_sent": len(email_list)
+            })
+        else:
+            result_data = json.dumps({
+                "employee_reports": len(filepaths),
+                "archive": os.path.basename(archive_path) if archive_path else None,
+                "date_range": f"{start_date} to {end_date}",
+                "emails_sent": len(email_list)
+            })
+
+        db_writer.execute("""
             UPDATE task_executions
             SET completed_at = CURRENT_TIMESTAMP,
                 status = 'success',
                 result_data = :result_data
             WHERE id = :execution_id
-        """), {"execution_id": execution_id, "result_data": result_data})
-
-        if not commit_with_retry(db):
-            raise Exception("Failed to update task execution status to success")
+        """, {"execution_id": execution_id, "result_data": result_data})
 
         # Clear session cache to ensure fresh data is read during verification
         db.expire_all()
@@ -791,8 +899,6 @@ def run_employee_tip_report_task(task_id, task_name, date_range_type, email_list
         if not verify_execution_status(db, execution_id, 'success'):
             raise Exception("Task execution status verification failed")
 
-        time.sleep(0.05)
-
         task_info = db.execute(text("""
             SELECT schedule_type, cron_expression, interval_value, interval_unit, starts_at
             FROM scheduled_tasks
@@ -813,55 +919,117 @@ def run_employee_tip_report_task(task_id, task_name, date_range_type, email_list
         else:
             next_run_at = None
 
-        db.execute(text("""
-            UPDATE scheduled_tasks
-            SET last_run_at = CURRENT_TIMESTAMP,
-                next_run_at = :next_run_at
-            WHERE id = :task_id
-        """), {"task_id": task_id, "next_run_at": next_run_at})
-
-        if not commit_with_retry(db):
-            print(f"⚠ Warning: Failed to update scheduled task metadata for '{task_name}'")
+        try:
+            db_writer.execute("""
+                UPDATE scheduled_tasks
+                SET last_run_at = CURRENT_TIMESTAMP,
+                    next_run_at = :next_run_at
+                WHERE id = :task_id
+            """, {"task_id": task_id, "next_run_at": next_run_at})
+        except Exception as e:
+            logger.warning("Failed to update scheduled task metadata for '%s': %s", task_name, e)
 
         cleanup_old_executions(task_id)
 
-        print(f"✓ Employee tip report task '{task_name}' completed successfully")
+        logger.info("Employee tip report task '%s' completed successfully", task_name)
+        return True
 
     except Exception as e:
         error_message = str(e)
-        print(f"✗ Employee tip report task '{task_name}' failed: {error_message}")
+        logger.exception("Employee tip report task '%s' failed: %s", task_name, error_message)
 
-        import traceback
-        traceback.print_exc()
 
         if execution_id:
             try:
-                time.sleep(0.05)
-                db.execute(text("""
+                db_writer.execute("""
                     UPDATE task_executions
                     SET completed_at = CURRENT_TIMESTAMP,
                         status = 'failed',
                         error_message = :error_message
                     WHERE id = :execution_id
-                """), {"execution_id": execution_id, "error_message": error_message})
-
-                if commit_with_retry(db):
-                    print(f"  ✓ Marked execution {execution_id} as failed")
-                else:
-                    print(f"  ✗ WARNING: Could not mark execution {execution_id} as failed!")
+                """, {"execution_id": execution_id, "error_message": error_message})
+                logger.debug("Marked execution %s as failed", execution_id)
             except Exception as update_error:
-                print(f"  ✗ ERROR updating execution status: {update_error}")
+                logger.error("Could not mark execution %s as failed: %s", execution_id, update_error)
         else:
-            print(f"  ✗ No execution_id available to mark as failed")
+            logger.error("No execution_id available to mark as failed")
 
     finally:
         try:
-            print(f"  → [FINALLY] Closing database connection...")
+            logger.debug("[FINALLY] Closing database connection...")
             db.close()
-            print(f"  → [FINALLY] Database connection closed")
+            logger.debug("[FINALLY] Database connection closed")
         except Exception as close_error:
-            print(f"  ✗ [FINALLY] ERROR closing database: {close_error}")
+            logger.error("[FINALLY] Error closing database: %s", close_error)
+
+@instrumented_task
+def run_report_batch_task(task_id, task_name, date_range_type, email_list_json, bypass_opt_in, attach_csv=False):
+    """
+    Generate every report for the period and email one digest.
 
+    Produces the tip report, the consolidated daily balance report and an
+    employee tip report for each staff member (see app/services/report_batch.py).
+
+    Args:
+        task_id: Scheduled task ID
+        task_name: Name of the task
+        date_range_type: Type of date range (e.g., 'previous_month')
+        email_list_json: JSON string of email addresses
+        bypass_opt_in: Whether to bypass email opt-in preference (0 or 1)
+        attach_csv: Whether to attach the summary CSV files to the digest (default: False)
+    """
+    def generate(db, execution_id):
+        start_date, end_date = calculate_date_range(date_range_type)
+        logger.debug("Date range: %s to %s", start_date, end_date)
+
+        batch = generate_report_batch(db, start_date, end_date, source="scheduled_task")
+        logger.debug("Wrote %s report(s) in %ss using %s worker(s)", len(batch['employee_reports']) + 2, batch['total_seconds'], batch['workers'])
+
+        for path in [batch["tip_report"], batch["daily_balance_report"]] + batch["employee_reports"]:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Report file not found: {path}")
+
+        email_list = json.loads(email_list_json) if email_list_json else []
+
+        if not bypass_opt_in:
+            opt_in_users = db.query(User).filter(
+                (User.opt_in_tip_reports == True) | (User.opt_in_daily_reports == True),
+                User.email.isnot(None),
+                User.email != ""
+            ).all()
+            for user in opt_in_users:
+                if user.email not in email_list:
+                    email_list.append(user.email)
+
+        if email_list:
+            date_range = f"{start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}"
+            subject = f"[Scheduled] Report Digest - {date_range}"
+
+            result = send_digest_email(
+                to_emails=email_list,
+                subject=subject,
+                date_range=date_range,
+                summary_filepaths=[batch["tip_report"], batch["daily_balance_report"]],
+                employee_filepaths=batch["employee_reports"],
+                attach_csv=attach_csv
+            )
+
+            if not result["success"]:
+                raise Exception(f"Email sending failed: {result.get('message', 'Unknown error')}")
+
+        return {
+            "tip_report": os.path.basename(batch["tip_report"]),
+            "daily_balance_report": os.path.basename(batch["daily_balance_report"]),
+            "employee_reports": len(batch["employee_reports"]),
+            "workers": batch["workers"],
+            "duration_seconds": batch["total_seconds"],
+            "date_range": f"{start_date} to {end_date}",
+            "emails_sent": len(email_list)
+        }
+
+    return run_task_execution(task_id, task_name, "Report batch", generate)
+
+@instrumented_task
 def run_backup_task(task_id, task_name):
     """
     Create a database backup.
@@ -874,7 +1042,7 @@ def run_backup_task(task_id, task_name):
     execution_id = None
 
     try:
-        print(f"▶️  Starting backup task '{task_name}' (ID: {task_id})")
+        logger.info("Starting backup task '%s' (ID: %s)", task_name, task_id)
 
         # Verify the task exists before creating execution
         task_exists = db.execute(text("""
@@ -885,34 +1053,30 @@ def run_backup_task(task_id, task_name):
             raise Exception(f"Task ID {task_id} does not exist in scheduled_tasks table")
 
         # Cleanup any stale "running" executions (older than 5 minutes) before creating new one
-        stale_count = db.execute(text("""
-            UPDATE task_executions
-            SET status = 'failed',
-                completed_at = CURRENT_TIMESTAMP,
-                error_message = 'Task execution marked as stale (exceeded timeout)'
-            WHERE task_id = :task_id
-              AND status = 'running'
-              AND started_at < datetime('now', '-5 minutes')
-        """), {"task_id": task_id}).rowcount
-
-        if stale_count > 0:
-            if not commit_with_retry(db):
-                print(f"  ⚠ Warning: Failed to commit stale execution cleanup")
-            else:
-                print(f"  → Cleaned up {stale_count} stale execution(s)")
+        try:
+            stale_count = db_writer.execute("""
+                UPDATE task_executions
+                SET status = 'failed',
+                    completed_at = CURRENT_TIMESTAMP,
+                    error_message = 'Task execution marked as stale (exceeded timeout)'
+                WHERE task_id = :task_id
+                  AND status = 'running'
+                  AND started_at < datetime('now', '-5 minutes')
+            """, {"task_id": task_id}).rowcount
+            if stale_count > 0:
+                logger.debug("Cleaned up %s stale execution(s)", stale_count)
+        except Exception as e:
+            logger.warning("Failed to commit stale execution cleanup: %s", e)
 
         # Insert the execution record and get its ID in one query
-        result = db.execute(text("""
+        result = db_writer.execute("""
             INSERT INTO task_executions (task_id, started_at, status)
             VALUES (:task_id, datetime('now'), 'running')
             RETURNING id
-        """), {"task_id": task_id})
+        """, {"task_id": task_id})
 
         execution_id = result.scalar()
 
-        if not commit_with_retry(db):
-            raise Exception("Failed to create task execution record")
-
         if not execution_id or execution_id == 0:
             raise Exception(f"Failed to get valid execution_id (got: {execution_id}). This may indicate a foreign key constraint issue or missing task_id: {task_id}")
 
@@ -926,37 +1090,28 @@ def run_backup_task(task_id, task_name):
             total_records = db.execute(text("SELECT COUNT(*) FROM task_executions")).scalar()
             raise Exception(f"Execution record {execution_id} was not persisted to database. Total records: {total_records}. This may indicate a database write issue.")
 
-        print(f"  → Created execution record (ID: {execution_id})")
+        bind_log_context(execution_id=execution_id)
+        logger.debug("Created execution record (ID: %s)", execution_id)
 
-        filename = create_backup()
+        filename = create_backup(mode="auto")
 
         result_data = json.dumps({
             "filename": filename,
+            "backup_type": "incremental" if ".delta-" in filename else "full",
             "backup_created": True
         })
 
-        time.sleep(0.05)
-
-        db.execute(text("""
+        db_writer.execute("""
             UPDATE task_executions
             SET completed_at = CURRENT_TIMESTAMP,
                 status = 'success',
                 result_data = :result_data
             WHERE id = :execution_id
-        """), {"execution_id": execution_id, "result_data": result_data})
-
-        if not commit_with_retry(db):
-            raise Exception("Failed to update task execution status to success")
-
-        # Force SQLite to complete any pending writes
-        db.execute(text("SELECT 1")).fetchone()
-        time.sleep(0.1)
+        """, {"execution_id": execution_id, "result_data": result_data})
 
         if not verify_execution_status(db, execution_id, 'success'):
             raise Exception("Task execution status verification failed")
 
-        time.sleep(0.05)
-
         task_info = db.execute(text("""
             SELECT schedule_type, cron_expression, interval_value, interval_unit, starts_at
             FROM scheduled_tasks
@@ -977,51 +1132,60 @@ def run_backup_task(task_id, task_name):
         else:
             next_run_at = None
 
-        db.execute(text("""
-            UPDATE scheduled_tasks
-            SET last_run_at = CURRENT_TIMESTAMP,
-                next_run_at = :next_run_at
-            WHERE id = :task_id
-        """), {"task_id": task_id, "next_run_at": next_run_at})
-
-        if not commit_with_retry(db):
-            print(f"⚠ Warning: Failed to update scheduled task metadata for '{task_name}'")
+        try:
+            db_writer.execute("""
+                UPDATE scheduled_tasks
+                SET last_run_at = CURRENT_TIMESTAMP,
+                    next_run_at = :next_run_at
+                WHERE id = :task_id
+            """, {"task_id": task_id, "next_run_at": next_run_at})
+        except Exception as e:
+            logger.warning("Failed to update scheduled task metadata for '%s': %s", task_name, e)
 
         cleanup_old_executions(task_id)
 
-        print(f"✓ Backup task '{task_name}' completed successfully")
+        logger.info("Backup task '%s' completed successfully", task_name)
+        return True
 
     except Exception as e:
         error_message = str(e)
-        print(f"✗ Backup task '{task_name}' failed: {error_message}")
+        logger.exception("Backup task '%s' failed: %s", task_name, error_message)
 
-        import traceback
-        traceback.print_exc()
 
         if execution_id:
             try:
-                time.sleep(0.05)
-                db.execute(text("""
+                db_writer.execute("""
                     UPDATE task_executions
                     SET completed_at = CURRENT_TIMESTAMP,
                         status = 'failed',
                         error_message = :error_message
                     WHERE id = :execution_id
-                """), {"execution_id": execution_id, "error_message": error_message})
-
-                if commit_with_retry(db):
-                    print(f"  ✓ Marked execution {execution_id} as failed")
-                else:
-                    print(f"  ✗ WARNING: Could not mark execution {execution_id} as failed!")
+                """, {"execution_id": execution_id, "error_message": error_message})
+                logger.debug("Marked execution %s as failed", execution_id)
             except Exception as update_error:
-                print(f"  ✗ ERROR updating execution status: {update_error}")
+                logger.error("Could not mark execution %s as failed: %s", execution_id, update_error)
         else:
-            print(f"  ✗ No execution_id available to mark as failed")
+            logger.error("No execution_id available to mark as failed")
 
     finally:
         try:
-            print(f"  → [FINALLY] Closing database connection...")
+            logger.debug("[FINALLY] Closing database connection...")
             db.close()
-            print(f"  → [FINALLY] Database connection closed")
+            logger.debug("[FINALLY] Database connection closed")
         except Exception as close_error:
-            print(f"  ✗ [FINALLY] ERROR closing database: {close_error}")
+            logger.error("[FINALLY] Error closing database: %s", close_error)
+
+@instrumented_task
+def run_maintenance_task(task_id, task_name):
+    """
+    Run SQLite maintenance (integrity check, ANALYZE/optimize, incremental
+    vacuum, WAL checkpoint) and record sizes and step durations.
+
+    Args:
+        task_id: Scheduled task ID
+        task_name: Name of the task
+    """
+    def maintain(db, execution_id):
+        return run_database_maintenance()
+
+    return run_task_execution(task_id, task_name, "Maintenance", maintain)
@@ -0,0 +1,54 @@
+import logging
+import os
+import time
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = "app/templates"
+# Compiled templates survive restarts in the data volume. Each entry records
+# the checksum of the source it was compiled from, so a deploy that changes a
+# template recompiles just that template
+TEMPLATE_CACHE_DIR = "data/cache/templates"
+# Checking every template's mtime on each render only helps while editing
+# them; run.py turns it on for local development
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "0") == "1"
+
+os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+
+# One template environment for the app and every router, so each template is
+# loaded and compiled once per process
+templates = Jinja2Templates(
+    directory=TEMPLATE_DIR,
+    auto_reload=TEMPLATE_AUTO_RELOAD,
+    bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+)
+
+def format_decimal(value, decimals=2):
+    """Format a number to a fixed number of decimal places."""
+    try:
+        return f"{float(value):.{decimals}f}"
+    except (ValueError, TypeError):
+        return value
+
+templates.env.filters["format_decimal"] = format_decimal
+
+def precompile_templates():
+    """
+    Load every template into the environment at startup.
+
+    Templates come from the bytecode cache when it has them and are compiled
+    (and cached) otherwise, so no request pays to compile a template. A
+    template that fails to compile is logged and left to fail when rendered.
+    """
+    started = time.perf_counter()
+    loaded = 0
+    for name in templates.env.list_templates(extensions=["html"]):
+        try:
+            templates.env.get_template(name)
+            loaded += 1
+        except TemplateError as e:
+            logger.warning("Template %s failed to compile: %s", name, e)
+    logger.info("Precompiled %s templates in %.0f ms", loaded, (time.perf_counter() - started) * 1000)
+    return loaded
@@ -1,9 +1,40 @@
 import os
+import re
+import gzip
+import json
+import logging
+import time
 import shutil
+import struct
+import tempfile
 from datetime import datetime
 from typing import List, Dict, Optional
 import sqlite3
 from app.database import DATABASE_PATH
+from app.utils.metrics import BACKUP_DURATION, BACKUP_FAILURES
+
+logger = logging.getLogger(__name__)
+
+BACKUPS_DIR = "data/backups"
+
+# Pages copied per sqlite3 backup step, and the pause between steps so other
+# connections get the disk between batches
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP = 0.005
+
+# "auto" mode takes a new full backup after this many incrementals, or when an
+# incremental would contain more than this fraction of the database's pages
+MAX_INCREMENTALS_PER_FULL = 6
+MAX_INCREMENTAL_PAGE_RATIO = 0.5
+
+COMPRESSION_LEVEL = 6
+
+DELTA_FORMAT = "dailydough-delta/1"
+
+# backup_YYYYmmdd_HHMMSS.db            legacy uncompressed full backup
+# backup_YYYYmmdd_HHMMSS.db.gz         compressed full backup
+# backup_YYYYmmdd_HHMMSS.delta-BASE.gz pages changed since full backup BASE
+BACKUP_FILENAME_RE = re.compile(r"^backup_(\d{8}_\d{6})(\.db|\.db\.gz|\.delta-(\d{8}_\d{6})\.gz)$")
 
 
 def get_backup_retention_count() -> int:
@@ -22,140 +53,321 @@ def get_backup_retention_count() -> int:
         return 7
 
 
+def parse_backup_filename(filename: str) -> Optional[Dict[str, any]]:
+    """
+    Parse a backup filename into its kind and timestamps.
+    Returns None for names that aren't backups (or that try to escape the directory).
+    """
+    match = BACKUP_FILENAME_RE.match(filename)
+    if not match:
+        return None
+
+    timestamp, suffix, base_timestamp = match.groups()
+    if suffix == ".db":
+        kind = "legacy"
+    elif suffix == ".db.gz":
+        kind = "full"
+    else:
+        kind = "incremental"
+
+    return {
+        "filename": filename,
+        "kind": kind,
+        "timestamp": timestamp,
+        "created_at": datetime.strptime(timestamp, "%Y%m%d_%H%M%S"),
+        "base": f"backup_{base_timestamp}.db.gz" if base_timestamp else None,
+    }
+
+
+def _validate_filename(filename: str) -> Dict[str, any]:
+    info = parse_backup_filename(filename)
+    if info is None:
+        raise ValueError("Invalid filename")
+    return info
+
+
+def _scan_backups() -> List[Dict[str, any]]:
+    """Backups in the directory, newest first, ordered by the timestamp in the name."""
+    if not os.path.exists(BACKUPS_DIR):
+        return []
+
+    backups = [info for info in map(parse_backup_filename, os.listdir(BACKUPS_DIR)) if info]
+    backups.sort(key=lambda x: x["timestamp"], reverse=True)
+    return backups
+
+
 def cleanup_old_backups(retention_count: Optional[int] = None) -> int:
     """
     Remove old backups beyond the retention count.
-    Returns the number of backups deleted.
+
+    The count applies to full backups; incrementals are kept or removed along
+    with the full backup they were taken against.
+    Returns the number of backup files deleted.
     """
     if retention_count is None:
         retention_count = get_backup_retention_count()
 
-    backups_dir = "data/backups"
-    if not os.path.exists(backups_dir):
-        return 0
-
-    backups = []
-    for filename in os.listdir(backups_dir):
-        if filename.endswith('.db'):
-            filepath = os.path.join(backups_dir, filename)
-            stat = os.stat(filepath)
-            backups.append({
-                'filename': filename,
-                'filepath': filepath,
-                'created_at': datetime.fromtimestamp(stat.st_mtime)
-            })
-
-    backups.sort(key=lambda x: x['created_at'], reverse=True)
+    backups = _scan_backups()
+    fulls = [b for b in backups if b["kind"] != "incremental"]
+    keep = {b["filename"] for b in fulls[:retention_count]}
 
     deleted_count = 0
-    if len(backups) > retention_count:
-        for backup in backups[retention_count:]:
-            try:
-                os.remove(backup['filepath'])
-                deleted_count += 1
-            except Exception:
-                pass
+    for backup in backups:
+        owner = backup["base"] if backup["kind"] == "incremental" else backup["filename"]
+        if owner in keep:
+            continue
+        try:
+            os.remove(os.path.join(BACKUPS_DIR, backup["filename"]))
+            deleted_count += 1
+        except Exception:
+            pass
 
     return deleted_count
 
 
-def create_backup() -> str:
-    backups_dir = "data/backups"
-    if not os.path.exists(backups_dir):
-        os.makedirs(backups_dir)
+def _remove_database_files(path: str):
+    for candidate in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(candidate):
+            os.remove(candidate)
+
+
+def _snapshot_database(dest_path: str) -> Dict[str, int]:
+    """
+    Copy the live database to dest_path with the online backup API in page batches.
+
+    The source connection holds a read transaction for the whole copy, so every
+    step reads the same WAL snapshot: writers keep committing meanwhile and the
+    backup never has to restart because of them.
+    """
+    src_conn = sqlite3.connect(DATABASE_PATH, timeout=30, isolation_level=None)
+    dst_conn = sqlite3.connect(dest_path)
+    try:
+        src_conn.execute("BEGIN")
+        page_size = src_conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = src_conn.execute("PRAGMA page_count").fetchone()[0]
+
+        def pause_between_steps(status, remaining, total):
+            if remaining:
+                time.sleep(BACKUP_STEP_SLEEP)
+
+        src_conn.backup(dst_conn, pages=BACKUP_PAGES_PER_STEP, progress=pause_between_steps)
+        src_conn.execute("COMMIT")
+    finally:
+        dst_conn.close()
+        src_conn.close()
+
+    return {"page_size": page_size, "page_count": page_count}
+
+
+def _compress_file(src_path: str, dest_path: str):
+    with open(src_path, "rb") as src, gzip.open(dest_path, "wb", compresslevel=COMPRESSION_LEVEL) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _decompress_file(src_path: str, dest_path: str):
+    with gzip.open(src_path, "rb") as src, open(dest_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _read_delta_header(delta_file) -> Dict[str, any]:
+    header = json.loads(delta_file.readline().decode("utf-8"))
+    if header.get("format") != DELTA_FORMAT:
+        raise ValueError("Unrecognized incremental backup format")
+    return header
+
+
+def _write_delta(snapshot_path: str, base_filename: str, delta_path: str, page_size: int) -> Dict[str, int]:
+    """
+    Write the pages of snapshot_path that differ from the full backup base_filename.
+
+    Both files are read sequentially page by page; the base is decompressed on
+    the fly. Record format after the JSON header line: 4-byte big-endian page
+    number followed by the page bytes.
+    """
+    base_path = os.path.join(BACKUPS_DIR, base_filename)
+    page_count = os.path.getsize(snapshot_path) // page_size
+    changed = 0
+
+    with open(snapshot_path, "rb") as snapshot, gzip.open(base_path, "rb") as base, \
+            gzip.open(delta_path, "wb", compresslevel=COMPRESSION_LEVEL) as delta:
+        header = {
+            "format": DELTA_FORMAT,
+            "base": base_filename,
+            "page_size": page_size,
+            "page_count": page_count,
+        }
+        delta.write((json.dumps(header) + "\n").encode("utf-8"))
+
+        for page_number in range(1, page_count + 1):
+            page = snapshot.read(page_size)
+            if base.read(page_size) != page:
+                delta.write(struct.pack(">I", page_number))
+                delta.write(page)
+                changed += 1
+
+    return {"page_count": page_count, "changed_pages": changed}
+
+
+def _latest_full_backup() -> Optional[Dict[str, any]]:
+    """Most recent compressed full backup and how many incrementals were taken against it."""
+    backups = _scan_backups()
+    for backup in backups:
+        if backup["kind"] == "full":
+            backup["incrementals"] = sum(1 for b in backups if b["base"] == backup["filename"])
+            return backup
+    return None
+
+
+def create_backup(mode: str = "full") -> str:
+    """
+    Create a compressed backup of the live database and return its filename.
+
+    mode:
+        "full"        compressed copy of the whole database
+        "incremental" only the pages changed since the latest full backup
+                      (falls back to a full backup when there is none)
+        "auto"        incremental, unless the chain is long or the delta would
+                      be large, in which case a new full backup is taken
+    """
+    if mode not in ("full", "incremental", "auto"):
+        raise ValueError(f"Unknown backup mode: {mode}")
+
+    if not os.path.exists(BACKUPS_DIR):
+        os.makedirs(BACKUPS_DIR)
 
     if not os.path.exists(DATABASE_PATH):
         raise FileNotFoundError("Database file not found")
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"backup_{timestamp}.db"
-    filepath = os.path.join(backups_dir, filename)
+    base = _latest_full_backup() if mode != "full" else None
+    if mode == "auto" and base and base["incrementals"] >= MAX_INCREMENTALS_PER_FULL:
+        base = None
 
-    src_conn = None
-    dst_conn = None
+    fd, snapshot_path = tempfile.mkstemp(prefix="snapshot_", suffix=".db", dir=BACKUPS_DIR)
+    os.close(fd)
+    filepath = None
+    started = time.perf_counter()
 
     try:
-        src_conn = sqlite3.connect(DATABASE_PATH)
-        dst_conn = sqlite3.connect(filepath)
+        snapshot = _snapshot_database(snapshot_path)
 
-        with src_conn:
-            src_conn.backup(dst_conn)
+        if os.path.getsize(snapshot_path) == 0:
+            raise Exception("Backup snapshot is empty")
 
-        dst_conn.close()
-        src_conn.close()
+        if base:
+            filename = f"backup_{timestamp}.delta-{base['timestamp']}.gz"
+            filepath = os.path.join(BACKUPS_DIR, filename)
+            delta = _write_delta(snapshot_path, base["filename"], filepath, snapshot["page_size"])
+
+            if mode == "auto" and delta["changed_pages"] > delta["page_count"] * MAX_INCREMENTAL_PAGE_RATIO:
+                os.remove(filepath)
+                base = None
+
+        if not base:
+            filename = f"backup_{timestamp}.db.gz"
+            filepath = os.path.join(BACKUPS_DIR, filename)
+            _compress_file(snapshot_path, filepath)
 
         if not os.path.exists(filepath):
             raise Exception("Backup file was not created")
 
-        if os.path.getsize(filepath) == 0:
-            os.remove(filepath)
-            raise Exception("Backup file is empty")
-
         cleanup_old_backups()
 
         return filename
 
     except Exception as e:
-        if dst_conn:
-            dst_conn.close()
-        if src_conn:
-            src_conn.close()
-
-        if os.path.exists(filepath):
+        BACKUP_FAILURES.inc(mode=mode)
+        if filepath and os.path.exists(filepath):
             os.remove(filepath)
 
         raise Exception(f"Backup failed: {str(e)}")
 
+    finally:
+        _remove_database_files(snapshot_path)
+        BACKUP_DURATION.observe(time.perf_counter() - started, mode=mode)
 
-def list_backups() -> List[Dict[str, any]]:
-    backups_dir = "data/backups"
 
-    if not os.path.exists(backups_dir):
-        return []
+def materialize_backup(filename: str, dest_path: str) -> str:
+    """
+    Rebuild a plain SQLite database file from any kind of backup.
+
+    Incrementals are applied on top of a decompressed copy of their full
+    backup and the file is truncated to the recorded page count.
+    """
+    info = _validate_filename(filename)
+    filepath = os.path.join(BACKUPS_DIR, filename)
+
+    if not os.path.exists(filepath):
+        raise FileNotFoundError("Backup file not found")
+
+    if info["kind"] == "legacy":
+        shutil.copyfile(filepath, dest_path)
+    elif info["kind"] == "full":
+        _decompress_file(filepath, dest_path)
+    else:
+        with gzip.open(filepath, "rb") as delta:
+            header = _read_delta_header(delta)
+            base_path = os.path.join(BACKUPS_DIR, header["base"])
+            if not os.path.exists(base_path):
+                raise FileNotFoundError(f"Full backup {header['base']} needed by this incremental is missing")
+
+            _decompress_file(base_path, dest_path)
+
+            page_size = header["page_size"]
+            with open(dest_path, "r+b") as db_file:
+                while True:
+                    record = delta.read(4)
+                    if not record:
+                        break
+                    (page_number,) = struct.unpack(">I", record)
+                    page = delta.read(page_size)
+                    if len(page) != page_size:
+                        raise ValueError("Incremental backup is truncated")
+                    db_file.seek((page_number - 1) * page_size)
+                    db_file.write(page)
+                db_file.truncate(header["page_count"] * page_size)
+
+    return dest_path
 
+
+def list_backups() -> List[Dict[str, any]]:
     backups = []
-    for filename in os.listdir(backups_dir):
-        if filename.endswith('.db'):
-            filepath = os.path.join(backups_dir, filename)
-            stat = os.stat(filepath)
-            backups.append({
-                'filename': filename,
-                'size': stat.st_size,
-                'created_at': datetime.fromtimestamp(stat.st_mtime)
-            })
-
-    backups.sort(key=lambda x: x['created_at'], reverse=True)
+    for info in _scan_backups():
+        filepath = os.path.join(BACKUPS_DIR, info["filename"])
+        backups.append({
+            'filename': info["filename"],
+            'kind': info["kind"],
+            'base': info["base"],
+            'size': os.path.getsize(filepath),
+            'created_at': info["created_at"]
+        })
 
     return backups
 
 
 def delete_backup(filename: str) -> bool:
-    backups_dir = "data/backups"
-    filepath = os.path.join(backups_dir, filename)
-
-    if not filename.endswith('.db'):
+    """Delete a backup; deleting a full backup also deletes its incrementals."""
+    info = parse_backup_filename(filename)
+    if info is None:
         return False
 
-    if '..' in filename or '/' in filename:
+    filepath = os.path.join(BACKUPS_DIR, filename)
+    if not os.path.exists(filepath):
         return False
 
-    if os.path.exists(filepath):
-        os.remove(filepath)
-        return True
+    os.remove(filepath)
+    if info["kind"] == "full":
+        for backup in _scan_backups():
+            if backup["base"] == filename:
+                os.remove(os.path.join(BACKUPS_DIR, backup["filename"]))
 
-    return False
+    return True
 
 
 def get_backup_path(filename: str) -> str:
-    backups_dir = "data/backups"
-
-    if not filename.endswith('.db'):
-        raise ValueError("Invalid filename")
+    _validate_filename(filename)
 
-    if '..' in filename or '/' in filename:
-        raise ValueError("Invalid filename")
-
-    filepath = os.path.join(backups_dir, filename)
+    filepath = os.path.join(BACKUPS_DIR, filename)
 
     if not os.path.exists(filepath):
         raise FileNotFoundError("Backup file not found")
@@ -163,32 +375,23 @@ def get_backup_path(filename: str) -> str:
     return filepath
 
 
-def restore_backup(filename: str) -> bool:
-    """
-    Restore database from a backup file.
-    This function will:
-    1. Validate the backup file exists
-    2. Copy the backup file to the database location
-
-    Important: All database connections must be closed before calling this function.
-    """
-    backups_dir = "data/backups"
-    backup_filepath = os.path.join(backups_dir, filename)
-
-    if not filename.endswith('.db'):
-        raise ValueError("Invalid filename")
-
-    if '..' in filename or '/' in filename:
-        raise ValueError("Invalid filename")
+def _prepare_restore_source(filename: str) -> str:
+    """Validate a backup and rebuild it into a temporary plain database file."""
+    _validate_filename(filename)
 
-    if not os.path.exists(backup_filepath):
+    if not os.path.exists(os.path.join(BACKUPS_DIR, filename)):
         raise FileNotFoundError("Backup file not found")
 
     if not os.path.exists(DATABASE_PATH):
         raise FileNotFoundError("Current database file not found")
 
+    fd, restored_path = tempfile.mkstemp(prefix="restore_", suffix=".db", dir=BACKUPS_DIR)
+    os.close(fd)
+
     try:
-        conn = sqlite3.connect(backup_filepath)
+        materialize_backup(filename, restored_path)
+
+        conn = sqlite3.connect(restored_path)
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
         tables = cursor.fetchall()
@@ -197,11 +400,128 @@ def restore_backup(filename: str) -> bool:
         if not tables:
             raise ValueError("Backup file appears to be empty or corrupted")
 
-        shutil.copy2(backup_filepath, DATABASE_PATH)
-
-        return True
+        return restored_path
 
     except sqlite3.Error as e:
+        _remove_database_files(restored_path)
         raise ValueError(f"Backup file is not a valid SQLite database: {str(e)}")
+    except Exception:
+        _remove_database_files(restored_path)
+        raise
+
+
+def restore_backup(filename: str) -> bool:
+    """
+    Restore database from a backup file by copying it over the database file.
+
+    Important: All database connections must be closed before calling this
+    function. Use hot_restore_backup() while the app is running.
+    """
+    restored_path = _prepare_restore_source(filename)
+
+    try:
+        shutil.copy2(restored_path, DATABASE_PATH)
+        return True
+
+    except Exception as e:
+        raise Exception(f"Restore failed: {str(e)}")
+    finally:
+        _remove_database_files(restored_path)
+
+
+def hot_restore_backup(filename: str, drain_timeout: int = 10) -> Dict[str, any]:
+    """
+    Restore a backup into the live database without restarting the app.
+
+    The backup is rebuilt and validated first. Then, for the short downtime
+    window: the scheduler stops starting jobs and waits for running ones, the
+    database writer holds queued writes, the connection pool is drained and
+    disposed, and the backup is copied into the live file with the sqlite3
+    backup API (which goes through the WAL and locking like any other
+    writer). Database-derived caches are invalidated and scheduler jobs are
+    reloaded from the restored scheduled_tasks table before everything resumes.
+    If jobs, queued writes or pooled connections do not drain in time, the
+    restore is abandoned and everything resumes untouched.
+
+    Single worker only: other gunicorn workers would keep using the file and
+    their caches during the restore, so while any run this raises ValueError
+    and the restore has to be done offline. Workers starting up wait for the
+    restore to finish.
+
+    Returns timing information, including the downtime in milliseconds.
+    """
+    from app.scheduler_lease import worker_registry
+
+    with worker_registry.sole_worker() as alone:
+        if not alone:
+            raise ValueError(
+                "Restoring while the app runs needs a single worker, and other workers are running. "
+                "Restart with one worker and restore again, or stop the app and restore offline."
+            )
+        return _hot_restore_backup(filename, drain_timeout)
+
+
+def _hot_restore_backup(filename: str, drain_timeout: int) -> Dict[str, any]:
+    from app.database import engine, invalidate_caches
+    from app.db_writer import db_writer
+    from app.scheduler import pause_scheduler, resume_scheduler
+
+    prepare_started = time.perf_counter()
+    restored_path = _prepare_restore_source(filename)
+    prepare_ms = round((time.perf_counter() - prepare_started) * 1000, 2)
+
+    downtime_started = time.perf_counter()
+    try:
+        if not pause_scheduler(timeout=60):
+            raise Exception("Scheduled jobs did not finish in time")
+
+        if not db_writer.pause(timeout=60):
+            raise Exception("Database writer did not pause in time")
+
+        deadline = time.monotonic() + drain_timeout
+        while engine.pool.checkedout() > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if engine.pool.checkedout() > 0:
+            raise Exception("Database connections are still in use")
+        engine.dispose()
+
+        src_conn = sqlite3.connect(restored_path)
+        dst_conn = sqlite3.connect(DATABASE_PATH, timeout=30)
+        try:
+            src_page_size = src_conn.execute("PRAGMA page_size").fetchone()[0]
+            dst_page_size = dst_conn.execute("PRAGMA page_size").fetchone()[0]
+            if src_page_size != dst_page_size:
+                raise ValueError(
+                    f"Backup page size ({src_page_size}) differs from the live database ({dst_page_size}); "
+                    "stop the app and restore offline"
+                )
+            src_conn.backup(dst_conn, pages=BACKUP_PAGES_PER_STEP)
+            dst_conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            dst_conn.close()
+            src_conn.close()
+
+        engine.dispose()
+        invalidate_caches()
+
+        # Reloading jobs cleans up stale executions through the writer
+        db_writer.resume()
+        from app.routes.scheduled_tasks import load_scheduled_tasks
+        load_scheduled_tasks()
+
+    except (ValueError, FileNotFoundError):
+        raise
     except Exception as e:
         raise Exception(f"Restore failed: {str(e)}")
+    finally:
+        db_writer.resume()
+        resume_scheduler()
+        downtime_ms = round((time.perf_counter() - downtime_started) * 1000, 2)
+        _remove_database_files(restored_path)
+
+    logger.info("Restored %s with %sms downtime", filename, downtime_ms)
+    return {
+        "filename": filename,
+        "prepare_ms": prepare_ms,
+        "downtime_ms": downtime_ms,
+    }
@@ -2,9 +2,14 @@ import csv
 import os
 from datetime import date, datetime
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.models import DailyBalance, DailyEmployeeEntry, Employee, User
-
+from sqlalchemy.orm import Session, selectinload
+from app.models import DailyBalance, DailyEmployeeEntry, Employee, Position, User
+from app.utils.tip_report_writer import write_employee_tip_report
+from app.utils.metrics import REPORT_DURATION
+from app.utils.profiling import profiled
+
+@REPORT_DURATION.timed(report_type="daily_balance")
+@profiled
 def generate_daily_balance_csv(daily_balance: DailyBalance, employee_entries: List[DailyEmployeeEntry], current_user: Optional[User] = None, source: str = "user") -> str:
     # Sort employees by display name
     employee_entries = sorted(employee_entries, key=lambda e: e.employee_display_name)
@@ -150,6 +155,8 @@ def generate_daily_balance_csv(daily_balance: DailyBalance, employee_entries: Li
 
     return filepath
 
+@REPORT_DURATION.timed(report_type="tip_report")
+@profiled
 def generate_tip_report_csv(db: Session, start_date: date, end_date: date, current_user: Optional[User] = None, source: str = "user") -> str:
     # Use the first month of the date range for directory structure
     year = str(start_date.year)
@@ -378,6 +385,8 @@ def generate_tip_report_csv(db: Session, start_date: date, end_date: date, curre
 
     return filename
 
+@REPORT_DURATION.timed(report_type="consolidated_daily_balance")
+@profiled
 def generate_consolidated_daily_balance_csv(db: Session, start_date: date, end_date: date, current_user: Optional[User] = None, source: str = "user") -> str:
     year = str(start_date.year)
     month = f"{start_date.month:02d}"
@@ -596,7 +605,8 @@ def generate_consolidated_daily_balance_csv(db: Session, start_date: date, end_d
 
     return filename
 
-def generate_employee_tip_report_csv(db: Session, employee: Employee, start_date: date, end_date: date, current_user: Optional[User] = None, source: str = "user") -> str:
+def employee_tip_report_path(employee_slug: str, start_date: date, end_date: date):
+    """Return (reports_dir, filename) for an employee tip report, creating the directory."""
     # Use the first month of the date range for directory structure
     year = str(start_date.year)
     month = f"{start_date.month:02d}"
@@ -606,170 +616,75 @@ def generate_employee_tip_report_csv(db: Session, employee: Employee, start_date
     if not os.path.exists(reports_dir):
         os.makedirs(reports_dir)
 
-    employee_slug = employee.slug
-    filename = f"tip-report-{employee_slug}-{start_date}-to-{end_date}.csv"
-    filepath = os.path.join(reports_dir, filename)
-
-    entries = db.query(DailyEmployeeEntry).filter(
-        DailyEmployeeEntry.employee_id == employee.id
+    return reports_dir, f"tip-report-{employee_slug}-{start_date}-to-{end_date}.csv"
+
+def report_generated_by(current_user: Optional[User] = None, source: str = "user") -> Optional[str]:
+    if source == "scheduled_task":
+        return "Automated Scheduled Task"
+    elif current_user:
+        return current_user.username
+    return None
+
+def employee_report_info(employee: Employee) -> dict:
+    positions_list = ", ".join([schedule.position.name for schedule in employee.position_schedules]) if employee.position_schedules else "No position assigned"
+    return {"display_name": employee.display_name, "positions_list": positions_list}
+
+def snapshot_employee_tip_entries(db: Session, start_date: date, end_date: date, employee_ids: Optional[List[int]] = None):
+    """
+    Read finalized employee entries in the range as plain data, in one query.
+
+    Returns (entries_by_employee, positions): {employee_id: [(date, position_id,
+    tip_values), ...]} ordered by date, and the position/tip requirement data
+    the reports need, keyed by position id.
+    """
+    query = db.query(
+        DailyBalance.date,
+        DailyEmployeeEntry.employee_id,
+        DailyEmployeeEntry.position_id,
+        DailyEmployeeEntry.tip_values
     ).join(DailyBalance).filter(
         DailyBalance.finalized == True,
         DailyBalance.date >= start_date,
-        DailyBalance.date <= end_date
-    ).order_by(DailyBalance.date).all()
-
-    with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile, quoting=csv.QUOTE_NONNUMERIC)
-
-        positions_list = ", ".join([schedule.position.name for schedule in employee.position_schedules]) if employee.position_schedules else "No position assigned"
-
-        writer.writerow(["Employee Tip Report"])
-        writer.writerow(["Employee", employee.display_name])
-        writer.writerow(["Positions", positions_list])
-        writer.writerow(["Date Range", f"{start_date} to {end_date}"])
-
-        if source == "scheduled_task":
-            writer.writerow(["Generated By", "Automated Scheduled Task"])
-        elif current_user:
-            writer.writerow(["Generated By", current_user.username])
-
-        writer.writerow(["Generated At", datetime.now().strftime("%Y-%m-%d %I:%M:%S %p")])
-        writer.writerow([])
-
-        if not entries:
-            writer.writerow(["No entries found for this employee in the selected date range"])
-            return filename
-
-        entries_by_position = {}
-        all_tip_requirements = {}
-
-        for entry in entries:
-            if entry.position:
-                pos_name = entry.position.name
-                if pos_name not in entries_by_position:
-                    entries_by_position[pos_name] = {
-                        "position": entry.position,
-                        "entries": []
-                    }
-                entries_by_position[pos_name]["entries"].append(entry)
-
-                if entry.position.tip_requirements:
-                    for req in entry.position.tip_requirements:
-                        if req.field_name not in all_tip_requirements:
-                            all_tip_requirements[req.field_name] = req
-
-        # Payroll Summary Section - Aggregate across all positions
-        writer.writerow(["PAYROLL SUMMARY"])
-        writer.writerow([])
-
-        has_payroll_data = False
-        for pos_name, pos_data in entries_by_position.items():
-            position = pos_data["position"]
-            pos_entries = pos_data["entries"]
-
-            if position.tip_requirements:
-                payroll_reqs = [req for req in position.tip_requirements if req.include_in_payroll_summary]
-
-                if payroll_reqs:
-                    has_payroll_data = True
-                    writer.writerow([f"{pos_name}"])
-                    for req in payroll_reqs:
-                        total = 0
-                        for entry in pos_entries:
-                            if entry.tip_values:
-                                total += entry.tip_values.get(req.field_name, 0)
-                        writer.writerow([req.name, f"${total:.2f}"])
-                    writer.writerow([])
-
-        if not has_payroll_data:
-            writer.writerow(["No payroll summary data available"])
-            writer.writerow([])
-
-        writer.writerow([])
-
-        # Employee Summary Section - Show each position separately
-        writer.writerow(["EMPLOYEE SUMMARY"])
-        writer.writerow([])
-
-        # Build summary data for each position
-        summary_data = []
-        all_reqs_map = {}
-
-        for pos_name, pos_data in entries_by_position.items():
-            position = pos_data["position"]
-            pos_entries = pos_data["entries"]
-
-            if position.tip_requirements:
-                emp_summary = {
-                    "employee": employee.display_name,
-                    "position": pos_name
-                }
-
-                for req in position.tip_requirements:
-                    if req.field_name not in all_reqs_map:
-                        all_reqs_map[req.field_name] = req.name
-
-                    total = sum(entry.get_tip_value(req.field_name, 0) for entry in pos_entries)
-                    emp_summary[req.field_name] = total
-
-                emp_summary["num_shifts"] = len(pos_entries)
-                summary_data.append(emp_summary)
-
-        if summary_data:
-            header_row = ["Employee Name", "Position"]
-            for field_name in all_reqs_map.keys():
-                header_row.append(all_reqs_map[field_name])
-            header_row.append("Number of Shifts")
-            writer.writerow(header_row)
-
-            for emp_summary in summary_data:
-                row = [emp_summary["employee"], emp_summary["position"]]
-                for field_name in all_reqs_map.keys():
-                    value = emp_summary.get(field_name, 0)
-                    row.append(f"${value:.2f}")
-                row.append(str(emp_summary["num_shifts"]))
-                writer.writerow(row)
-        else:
-            writer.writerow(["No summary data available"])
-
-        writer.writerow([])
-
-        # Detailed Daily Breakdown - Separate table for each position
-        writer.writerow(["Detailed Daily Breakdown by Employee"])
-        writer.writerow([])
-
-        for pos_name, pos_data in entries_by_position.items():
-            position = pos_data["position"]
-            pos_entries = pos_data["entries"]
-
-            if position.tip_requirements:
-                writer.writerow([f"Employee: {employee.display_name} - {pos_name}"])
-
-                header_row = ["Date", "Day"]
-                for req in position.tip_requirements:
-                    header_row.append(req.name)
-                writer.writerow(header_row)
-
-                total_row = ["TOTAL", ""]
-                tip_totals = {req.field_name: 0 for req in position.tip_requirements}
-
-                for entry in pos_entries:
-                    row = [
-                        entry.daily_balance.date.strftime("%Y-%m-%d"),
-                        entry.daily_balance.date.strftime("%A")
-                    ]
-
-                    for req in position.tip_requirements:
-                        value = entry.get_tip_value(req.field_name, 0)
-                        row.append(f"${value:.2f}")
-                        tip_totals[req.field_name] += value
-
-                    writer.writerow(row)
-
-                for req in position.tip_requirements:
-                    total_row.append(f"${tip_totals[req.field_name]:.2f}")
-
-                writer.writerow(total_row)
-                writer.writerow([])
+        DailyBalance.date <= end_date,
+        DailyEmployeeEntry.employee_id.isnot(None)
+    )
+    if employee_ids is not None:
+        query = query.filter(DailyEmployeeEntry.employee_id.in_(employee_ids))
+
+    entries_by_employee = {}
+    position_ids = set()
+    for entry_date, employee_id, position_id, tip_values in query.order_by(DailyBalance.date, DailyEmployeeEntry.id):
+        entries_by_employee.setdefault(employee_id, []).append((entry_date, position_id, tip_values))
+        position_ids.add(position_id)
+
+    positions = {}
+    if position_ids:
+        for position in db.query(Position).options(selectinload(Position.tip_requirements)).filter(Position.id.in_(position_ids)):
+            positions[position.id] = {
+                "name": position.name,
+                "tip_requirements": [
+                    {"field_name": req.field_name, "name": req.name, "include_in_payroll_summary": req.include_in_payroll_summary}
+                    for req in position.tip_requirements
+                ]
+            }
+
+    return entries_by_employee, positions
+
+@REPORT_DURATION.timed(report_type="employee_tip_report")
+@profiled
+def generate_employee_tip_report_csv(db: Session, employee: Employee, start_date: date, end_date: date, current_user: Optional[User] = None, source: str = "user") -> str:
+    reports_dir, filename = employee_tip_report_path(employee.slug, start_date, end_date)
+
+    entries_by_employee, positions = snapshot_employee_tip_entries(db, start_date, end_date, [employee.id])
+
+    write_employee_tip_report(
+        os.path.join(reports_dir, filename),
+        employee_report_info(employee),
+        positions,
+        entries_by_employee.get(employee.id, []),
+        start_date,
+        end_date,
+        report_generated_by(current_user, source)
+    )
 
     return filename
@@ -2,6 +2,7 @@ import csv
 import os
 from datetime import datetime
 from typing import List, Dict, Any
+from app.utils.profiling import profiled
 
 def _is_automated_report(filepath: str) -> bool:
     """Check if a report was generated by an automated scheduled task."""
@@ -128,6 +129,7 @@ def get_saved_tip_reports(limit: int = None) -> List[Dict[str, Any]]:
 
     return reports
 
+@profiled
 def parse_tip_report_csv(filepath: str) -> Dict[str, Any]:
     if not os.path.exists(filepath):
         return None
@@ -478,6 +480,7 @@ def parse_tip_report_csv(filepath: str) -> Dict[str, Any]:
 
     return report_data
 
+@profiled
 def parse_daily_balance_csv(filepath: str) -> Dict[str, Any]:
     if not os.path.exists(filepath):
         return None
@@ -2,13 +2,19 @@ import os
 import time
 from typing import List, Dict, Any
 from dotenv import load_dotenv
-import resend
 from app.utils.csv_reader import parse_tip_report_csv, parse_daily_balance_csv
+from app.utils.metrics import EMAIL_SEND_DURATION, EMAIL_FAILURES
+from app.utils.profiling import profiled
 
 load_dotenv()
 
-resend.api_key = os.getenv("RESEND_API_KEY")
+def _resend():
+    """Import the Resend client on first send; it pulls in requests, which slows startup."""
+    import resend
+    resend.api_key = os.getenv("RESEND_API_KEY")
+    return resend
 
+@profiled
 def generate_tip_report_html(report_data: Dict[str, Any]) -> str:
     html = """
     <html>
@@ -220,6 +226,7 @@ def generate_tip_report_html(report_data: Dict[str, Any]) -> str:
 
     return html
 
+@profiled
 def generate_daily_balance_html(report_data: Dict[str, Any]) -> str:
     html = """
     <html>
@@ -515,7 +522,7 @@ def send_report_emails(
     date_range: str = None,
     attach_csv: bool = False
 ) -> dict:
-    if not resend.api_key:
+    if not os.getenv("RESEND_API_KEY"):
         return {
             "success": False,
             "message": "RESEND_API_KEY is not configured in environment variables"
@@ -593,9 +600,11 @@ def send_report_emails(
                 # Email will still send without attachment
 
         try:
-            response = resend.Emails.send(params)
+            with EMAIL_SEND_DURATION.time(report_type=report_type):
+                response = _resend().Emails.send(params)
             successful_sends.append(email)
         except Exception as e:
+            EMAIL_FAILURES.inc(report_type=report_type)
             failed_sends.append({"email": email, "error": str(e)})
 
         if index < len(to_emails) - 1:
@@ -620,3 +629,107 @@ def send_report_emails(
             "message": f"Failed to send emails to all recipients",
             "failed": failed_sends
         }
+
+def send_digest_email(
+    to_emails: List[str],
+    subject: str,
+    date_range: str,
+    summary_filepaths: List[str],
+    employee_filepaths: List[str],
+    attach_csv: bool = False,
+    archive_filepath: str = None
+) -> dict:
+    """
+    Send one email listing every report a batch produced.
+
+    The summary reports and archive_filepath (a ZIP of the employee reports)
+    are attached when attach_csv is set; employee reports are otherwise
+    listed by name only to keep the message small.
+    """
+    if not os.getenv("RESEND_API_KEY"):
+        return {
+            "success": False,
+            "message": "RESEND_API_KEY is not configured in environment variables"
+        }
+
+    if not to_emails:
+        return {
+            "success": False,
+            "message": "No email addresses provided"
+        }
+
+    from_email = os.getenv("RESEND_FROM_EMAIL_TIPS") or os.getenv("RESEND_FROM_EMAIL_DAILY")
+    if not from_email:
+        return {
+            "success": False,
+            "message": "RESEND_FROM_EMAIL_TIPS is not configured in environment variables"
+        }
+
+    summary_section = ""
+    if summary_filepaths:
+        summary_section = f"""<h2 style="color: #2c3e50;">Summary Reports</h2>
+            <ul>{"".join(f"<li>{os.path.basename(path)}</li>" for path in summary_filepaths)}</ul>"""
+
+    html_body = f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; padding: 20px;">
+            <h1 style="color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px;">Report Digest</h1>
+            <div style="background: #e3f2fd; padding: 10px 15px; border-radius: 5px; margin: 15px 0;">
+                <strong>Report Period:</strong> {date_range}
+            </div>
+            {summary_section}
+            <h2 style="color: #2c3e50;">Employee Tip Reports ({len(employee_filepaths)})</h2>
+            <ul>{"".join(f"<li>{os.path.basename(path)}</li>" for path in employee_filepaths)}</ul>
+            <p style="font-size: 14px; color: #666;">All reports are available from the Reports page.</p>
+        </body>
+    </html>
+    """
+
+    attachments = []
+    if attach_csv:
+        import base64
+        for path in summary_filepaths + ([archive_filepath] if archive_filepath else []):
+            try:
+                with open(path, 'rb') as f:
+                    attachments.append({
+                        'content': base64.b64encode(f.read()).decode('utf-8'),
+                        'filename': os.path.basename(path)
+                    })
+            except Exception as e:
+                print(f"  ⚠ Warning: Failed to attach {path} to digest email: {e}")
+
+    successful_sends = []
+    failed_sends = []
+
+    for index, email in enumerate(to_emails):
+        params = {
+            "from": from_email,
+            "to": [email],
+            "subject": subject,
+            "html": html_body
+        }
+        if attachments:
+            params['attachments'] = attachments
+
+        try:
+            with EMAIL_SEND_DURATION.time(report_type="digest"):
+                _resend().Emails.send(params)
+            successful_sends.append(email)
+        except Exception as e:
+            EMAIL_FAILURES.inc(report_type="digest")
+            failed_sends.append({"email": email, "error": str(e)})
+
+        if index < len(to_emails) - 1:
+            time.sleep(0.6)
+
+    if successful_sends:
+        message = f"Digest sent to {len(successful_sends)} recipient(s)"
+        if failed_sends:
+            message += f", {len(failed_sends)} failed"
+        return {"success": True, "message": message, "successful": successful_sends, "failed": failed_sends}
+
+    return {
+        "success": False,
+        "message": "Failed to send emails to all recipients",
+        "failed": failed_sends
+    }
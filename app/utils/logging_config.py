@@ -1,12 +1,112 @@
+import contextvars
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import re
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, assume a single worker
+    fcntl = None
+
 LOG_DIR = Path("data/logs")
 LOG_FILE = LOG_DIR / "error_log.txt"
 
+# The log viewer reads files backwards in blocks of this size, so memory use
+# stays flat however large the logs grow.
+TAIL_CHUNK_SIZE = 64 * 1024
+
+LOG_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+LOG_RECORD_RE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (.+?) - (DEBUG|INFO|WARNING|ERROR|CRITICAL) - '
+)
+
+# "json" writes one JSON object per line (what the log viewer expects);
+# "text" keeps the classic "time - logger - level - message" lines.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Ids attached to every record emitted while they are bound
+LOG_CONTEXT_FIELDS = ("request_id", "task_id", "execution_id")
+
 _file_handler = None
+_queue_handler = None
+_queue_listener = None
+_log_context = contextvars.ContextVar("log_context", default={})
+
+
+@contextmanager
+def log_context(**values):
+    """Bind ids (request_id, task_id, ...) to log records for the duration of the block."""
+    token = _log_context.set({**_log_context.get(), **values})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def get_log_context():
+    """The ids currently bound to log records."""
+    return _log_context.get()
+
+
+def bind_log_context(**values):
+    """Add ids to the current context; they are dropped when the enclosing log_context exits."""
+    _log_context.set({**_log_context.get(), **values})
+
+
+class ContextFilter(logging.Filter):
+    """Copy the bound context ids onto each record, on the thread that logged it."""
+
+    def filter(self, record):
+        for key, value in _log_context.get().items():
+            setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context ids and exc."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, LOG_TIMESTAMP_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in LOG_CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogQueueHandler(QueueHandler):
+    """
+    Queue handler that keeps records structured.
+
+    The stock QueueHandler.prepare() formats the whole record (traceback
+    included) into msg. Here only the message is merged with its args and the
+    traceback is rendered to exc_text, so the listener's formatter still sees
+    the exception separately.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
 
 
 class NoiseFilter(logging.Filter):
@@ -37,80 +137,326 @@ class SuppressRootRedirectFilter(logging.Filter):
         # Suppress only "GET / HTTP/1.1" with 302 response
         return not ('"GET / HTTP/1.1" 302' in message)
 
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler for a log file that every worker process appends to.
+
+    Rollover happens under an fcntl lock on a sibling .lock file, and only if
+    the file on disk is still the one this handler has open, so one worker
+    rotates and the rest reopen the new file once they notice its inode
+    changed (as WatchedFileHandler does).
+    """
+
+    def __init__(self, filename, *args, **kwargs):
+        super().__init__(filename, *args, **kwargs)
+        self.lock_path = self.baseFilename + ".lock"
+        self._stream_id = self._current_file_id()
+
+    def _current_file_id(self):
+        try:
+            stat = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _reopen_if_rotated(self):
+        if self.stream is not None and self._current_file_id() == self._stream_id:
+            return
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self._open()
+        self._stream_id = self._current_file_id()
+
+    def shouldRollover(self, record):
+        self._reopen_if_rotated()
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        if fcntl is None:
+            super().doRollover()
+            self._stream_id = self._current_file_id()
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another worker may have rotated while we waited for the lock
+                if self._current_file_id() == self._stream_id:
+                    super().doRollover()
+                    self._stream_id = self._current_file_id()
+                else:
+                    self._reopen_if_rotated()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 def setup_error_logging(max_bytes=10485760, backup_count=5, log_level=logging.ERROR):
     """
-    Configure rotating file handler and console handler for error logging.
+    Configure rotating file and console logging behind a queue.
+
+    Loggers only enqueue records; a QueueListener thread formats them and
+    does the file and console IO, so logging never blocks a request or a
+    scheduler thread on disk writes. Records below log_level are dropped by
+    the logger level check before any formatting happens.
 
     Args:
         max_bytes: Maximum size of log file before rotation (default 10MB)
         backup_count: Number of backup files to keep (default 5)
         log_level: Minimum log level to capture (default ERROR)
     """
-    global _file_handler
+    global _file_handler, _queue_handler, _queue_listener
 
     LOG_DIR.mkdir(parents=True, exist_ok=True)
-
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-
-    # File handler for web UI
-    file_handler = RotatingFileHandler(
+    shutdown_logging()
+
+    if LOG_FORMAT == "text":
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt=LOG_TIMESTAMP_FORMAT
+        )
+    else:
+        formatter = JsonFormatter()
+
+    # File handler for web UI, shared by all worker processes
+    file_handler = SharedRotatingFileHandler(
         LOG_FILE,
         maxBytes=max_bytes,
         backupCount=backup_count,
         encoding='utf-8'
     )
-    file_handler.setLevel(log_level)
     file_handler.addFilter(NoiseFilter())
     file_handler.setFormatter(formatter)
 
     # Console handler for Docker logs
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
     console_handler.addFilter(NoiseFilter())
     console_handler.setFormatter(formatter)
 
-    root_logger = logging.getLogger()
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    queue_handler = LogQueueHandler(queue.SimpleQueue())
+    queue_handler.setLevel(log_level)
+    queue_handler.addFilter(ContextFilter())
+    queue_listener = QueueListener(queue_handler.queue, file_handler, console_handler)
+    queue_listener.start()
 
-    if root_logger.level > log_level:
-        root_logger.setLevel(log_level)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(log_level)
 
     uvicorn_access = logging.getLogger("uvicorn.access")
-    uvicorn_access.addHandler(file_handler)
-    uvicorn_access.addHandler(console_handler)
+    uvicorn_access.addHandler(queue_handler)
     uvicorn_access.addFilter(SuppressRootRedirectFilter())
     uvicorn_access.setLevel(log_level)
 
     _file_handler = file_handler
+    _queue_handler = queue_handler
+    _queue_listener = queue_listener
     return file_handler
 
 
+def shutdown_logging():
+    """Flush queued records and stop the listener thread (safe to call repeatedly)."""
+    global _queue_handler, _queue_listener
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        logging.getLogger("uvicorn.access").removeHandler(_queue_handler)
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+    _queue_handler = None
+    _queue_listener = None
+
+
 def get_log_files():
-    """Get all log files (main and rotated)."""
+    """Get all log files (main and rotated), newest first."""
     if not LOG_DIR.exists():
         return []
 
-    log_files = []
-    if LOG_FILE.exists():
-        log_files.append(LOG_FILE)
-
-    for i in range(1, 100):
-        rotated_file = Path(f"{LOG_FILE}.{i}")
-        if rotated_file.exists():
-            log_files.append(rotated_file)
-        else:
-            break
+    rotated = []
+    prefix = LOG_FILE.name + "."
+    with os.scandir(LOG_DIR) as entries:
+        for entry in entries:
+            suffix = entry.name[len(prefix):] if entry.name.startswith(prefix) else ""
+            if suffix.isdigit() and entry.is_file():
+                rotated.append((int(suffix), Path(entry.path)))
 
+    log_files = [LOG_FILE] if LOG_FILE.exists() else []
+    log_files.extend(path for _, path in sorted(rotated))
     return log_files
 
 
+def iter_lines_reverse(file_path, end_offset=None, chunk_size=TAIL_CHUNK_SIZE):
+    """
+    Yield (offset, line) pairs from the end of a file towards its start.
+
+    offset is the byte position where the line starts, so reading can resume
+    just before it later. end_offset limits reading to the bytes before it.
+    Only one chunk plus the current partial line is held in memory.
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell() if end_offset is None else min(end_offset, f.tell())
+        partial = b''
+        while position > 0:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + partial
+            lines = block.split(b'\n')
+            # The first piece may continue in the previous chunk
+            partial = lines.pop(0)
+            line_end = position + len(block)
+            for line in reversed(lines):
+                line_end -= len(line) + 1
+                if line.strip():
+                    yield line_end + 1, line.decode('utf-8', errors='replace')
+        if partial.strip():
+            yield 0, partial.decode('utf-8', errors='replace')
+
+
+def _parse_json_record(line):
+    """Turn a JsonFormatter line into a viewer record; None if it is not one."""
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or "level" not in entry:
+        return None
+    text = f"{entry.get('time', '')} - {entry.get('logger', '')} - {entry['level']} - {entry.get('message', '')}"
+    ids = [f"{field}={entry[field]}" for field in LOG_CONTEXT_FIELDS if field in entry]
+    if ids:
+        text += f" [{' '.join(ids)}]"
+    if entry.get("exc"):
+        text += "\n" + entry["exc"]
+    return {
+        "timestamp": entry.get("time"),
+        "logger": entry.get("logger", ""),
+        "level": entry["level"],
+        "text": text,
+    }
+
+
+def iter_log_records(file_path, end_offset=None):
+    """
+    Yield log records from newest to oldest.
+
+    Lines written by JsonFormatter are parsed as JSON; for classic text
+    lines, continuation lines (tracebacks) are folded into the record they
+    belong to. Each record is a dict with offset, timestamp (the 'YYYY-MM-DD
+    HH:MM:SS' string, which sorts chronologically), logger, level and text.
+    """
+    continuation = []
+    for offset, line in iter_lines_reverse(file_path, end_offset):
+        if line.startswith("{"):
+            record = _parse_json_record(line)
+            if record is not None:
+                record["offset"] = offset
+                yield record
+                continue
+        match = LOG_RECORD_RE.match(line)
+        if not match:
+            continuation.append(line)
+            continue
+        text = "\n".join([line] + continuation[::-1]) if continuation else line
+        continuation = []
+        yield {
+            "offset": offset,
+            "timestamp": match.group(1),
+            "logger": match.group(2),
+            "level": match.group(3),
+            "text": text,
+        }
+    if continuation:
+        # Lines before the first header (e.g. the head of a rotated file)
+        yield {"offset": 0, "timestamp": None, "logger": "", "level": "INFO", "text": "\n".join(continuation[::-1])}
+
+
+def _log_cursor(file_path, offset):
+    """Cursor for the records in file_path before offset: "{inode}:{offset}"."""
+    try:
+        return f"{os.stat(file_path).st_ino}:{offset}"
+    except OSError:
+        return None
+
+
+def _resolve_log_cursor(log_files, cursor):
+    """(file index, end offset) for a search_logs cursor, or (0, None) if it no longer matches."""
+    try:
+        inode, offset = (int(part) for part in cursor.split(":", 1))
+    except ValueError:
+        return 0, None
+    for index, file_path in enumerate(log_files):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        if stat.st_ino == inode and offset <= stat.st_size:
+            return index, offset
+    return 0, None
+
+
+def search_logs(max_records=500, level=None, logger_name=None, since=None, until=None, contains=None, cursor=None):
+    """
+    Return the newest log records matching the filters, across rotated files.
+
+    Args:
+        max_records: Maximum number of records to return
+        level: Minimum level name (e.g. 'WARNING' also returns ERROR records)
+        logger_name: Logger name or dotted prefix ('uvicorn' matches 'uvicorn.access')
+        since / until: datetime bounds, inclusive
+        contains: Case-insensitive text the record must contain
+        cursor: next_cursor from a previous call, to page further back
+
+    Returns:
+        {"records": [...newest first], "next_cursor": str or None}
+
+    The cursor names the file by inode rather than position, so it keeps
+    pointing at the same records after error_log.txt is rotated to
+    error_log.txt.1. A cursor whose file is gone (or no longer that long)
+    starts over at the newest record.
+    """
+    min_level = logging.getLevelName(level.upper()) if level else None
+    if not isinstance(min_level, int):
+        min_level = None
+    needle = contains.lower() if contains else None
+    # Compare timestamps as strings in the log's own format
+    since = since.strftime(LOG_TIMESTAMP_FORMAT) if since else None
+    until = until.strftime(LOG_TIMESTAMP_FORMAT) if until else None
+
+    log_files = get_log_files()
+    file_index, end_offset = 0, None
+    if cursor:
+        file_index, end_offset = _resolve_log_cursor(log_files, cursor)
+
+    records = []
+    for index in range(file_index, len(log_files)):
+        try:
+            file_records = iter_log_records(log_files[index], end_offset if index == file_index else None)
+            for record in file_records:
+                timestamp = record["timestamp"]
+                if since and timestamp and timestamp < since:
+                    # Files are chronological, so everything further back is older too
+                    return {"records": records, "next_cursor": None}
+                if until and timestamp and timestamp > until:
+                    continue
+                if min_level and logging.getLevelName(record["level"]) < min_level:
+                    continue
+                if logger_name and not (record["logger"] == logger_name or record["logger"].startswith(logger_name + ".")):
+                    continue
+                if needle and needle not in record["text"].lower():
+                    continue
+                records.append(record)
+                if len(records) >= max_records:
+                    return {"records": records, "next_cursor": _log_cursor(log_files[index], record["offset"])}
+        except OSError as e:
+            logging.error(f"Error reading log file {log_files[index]}: {e}")
+
+    return {"records": records, "next_cursor": None}
+
+
 def read_log_file(file_path, max_lines=1000):
     """
-    Read log file and return lines in reverse order (newest first).
+    Read the last lines of a log file, newest first.
 
     Args:
         file_path: Path to log file
@@ -119,13 +465,15 @@ def read_log_file(file_path, max_lines=1000):
     Returns:
         List of log lines (newest first)
     """
+    lines = []
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            return lines[-max_lines:][::-1]
+        for _offset, line in iter_lines_reverse(file_path):
+            lines.append(line + "\n")
+            if len(lines) >= max_lines:
+                break
     except Exception as e:
         logging.error(f"Error reading log file {file_path}: {e}")
-        return []
+    return lines
 
 
 def get_log_stats():
@@ -201,8 +549,8 @@ def reconfigure_logging():
             for handler in root_logger.handlers:
                 handler.setLevel(new_level)
 
-            if root_logger.level > new_level:
-                root_logger.setLevel(new_level)
+            # Set exactly, so disabled levels are rejected before formatting
+            root_logger.setLevel(new_level)
 
             # Update uvicorn access logger
             uvicorn_access = logging.getLogger("uvicorn.access")
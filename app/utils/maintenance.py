@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import time
+from typing import Dict
+from app.database import DATABASE_PATH, set_sqlite_pragma
+
+# Rows sampled per index by ANALYZE; keeps the run short on large tables
+ANALYSIS_LIMIT = 1000
+
+# Number of integrity_check problems to keep in the result
+MAX_INTEGRITY_ERRORS = 10
+
+
+def get_database_file_sizes() -> Dict[str, int]:
+    """Return the size in bytes of the database file and its -wal/-shm companions."""
+    sizes = {}
+    for suffix, key in (("", "database_bytes"), ("-wal", "wal_bytes"), ("-shm", "shm_bytes")):
+        path = DATABASE_PATH + suffix
+        sizes[key] = os.path.getsize(path) if os.path.exists(path) else 0
+    return sizes
+
+
+def _timed(steps, name, func):
+    started = time.perf_counter()
+    result = func()
+    steps[name] = {"result": result, "duration_ms": round((time.perf_counter() - started) * 1000, 2)}
+    return result
+
+
+def run_database_maintenance() -> Dict:
+    """
+    Run routine SQLite maintenance on the application database.
+
+    Steps: integrity check, ANALYZE + PRAGMA optimize, incremental vacuum
+    (only when auto_vacuum=INCREMENTAL) and a truncating WAL checkpoint.
+    Returns a dict with per-step results and durations plus file sizes before
+    and after, suitable for TaskExecution.result_data.
+
+    Raises an exception if the integrity check reports problems; the other
+    steps are skipped in that case so a damaged file isn't rewritten.
+    """
+    if not os.path.exists(DATABASE_PATH):
+        raise FileNotFoundError("Database file not found")
+
+    started = time.perf_counter()
+    size_before = get_database_file_sizes()
+    steps = {}
+
+    conn = sqlite3.connect(DATABASE_PATH, timeout=30, isolation_level=None)
+    try:
+        set_sqlite_pragma(conn, None)
+        freelist_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        def integrity_check():
+            rows = conn.execute("PRAGMA integrity_check").fetchall()
+            messages = [row[0] for row in rows]
+            return "ok" if messages == ["ok"] else messages[:MAX_INTEGRITY_ERRORS]
+
+        integrity = _timed(steps, "integrity_check", integrity_check)
+        if integrity != "ok":
+            raise Exception(f"Integrity check failed: {'; '.join(integrity)}")
+
+        def analyze():
+            conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+            return "ok"
+
+        _timed(steps, "analyze", analyze)
+
+        def incremental_vacuum():
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if auto_vacuum != 2:
+                # Existing databases were created with auto_vacuum=NONE; switching
+                # requires a full VACUUM, which we don't do on a schedule.
+                return {"skipped": True, "reason": "auto_vacuum is not INCREMENTAL"}
+            conn.execute("PRAGMA incremental_vacuum").fetchall()
+            return {"skipped": False}
+
+        _timed(steps, "incremental_vacuum", incremental_vacuum)
+
+        def wal_checkpoint():
+            busy, log_pages, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            return {"busy": busy, "log_pages": log_pages, "checkpointed_pages": checkpointed}
+
+        _timed(steps, "wal_checkpoint", wal_checkpoint)
+
+        freelist_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    finally:
+        conn.close()
+
+    return {
+        "steps": steps,
+        "size_before": size_before,
+        "size_after": get_database_file_sizes(),
+        "freelist_pages_before": freelist_before,
+        "freelist_pages_after": freelist_after,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,236 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A deliberately small registry (counters, histograms and gauges read at
+scrape time) so /metrics needs no client library. Each worker process keeps
+its own values; scheduled task metrics only move on the worker holding the
+scheduler lease.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Seconds; covers a quick email call up to a long report batch or backup
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple((name, labels.get(name, "")) for name in self.label_names)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        super().__init__(name, help_text, label_names)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block takes (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of time()."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = key + (("le", _format_value(float(bound))),)
+                lines.append(f"{self.name}_bucket{_format_labels(labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose samples are read when /metrics is scraped."""
+
+    def __init__(self, name, help_text, callback, kind="gauge"):
+        super().__init__(name, help_text)
+        self.kind = kind
+        self.callback = callback
+
+    def render(self):
+        try:
+            samples = self.callback()
+        except Exception:
+            return []
+        if not isinstance(samples, list):
+            samples = [((), samples)]
+        lines = self.header()
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+def render_metrics():
+    """The whole registry in text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def _database_file_sizes():
+    from app.database import DATABASE_PATH
+    return [
+        ((("file", "db"),), _file_size(DATABASE_PATH)),
+        ((("file", "wal"),), _file_size(DATABASE_PATH + "-wal")),
+        ((("file", "shm"),), _file_size(DATABASE_PATH + "-shm")),
+    ]
+
+
+def _scheduler_leader():
+    from app.scheduler_lease import scheduler_lease
+    return 1 if scheduler_lease.held else 0
+
+
+def _scheduler_running_jobs():
+    from app import scheduler
+    return scheduler._running_jobs
+
+
+def _db_writer_value(attribute):
+    def read():
+        from app.db_writer import db_writer
+        return getattr(db_writer, attribute)
+    return read
+
+
+def _db_writer_queue_depth():
+    from app.db_writer import db_writer
+    return db_writer._queue.qsize()
+
+
+TASK_RUNS = Counter(
+    "dailydough_task_runs_total", "Scheduled task runs by task type and outcome.", ("task_type", "status")
+)
+TASK_DURATION = Histogram(
+    "dailydough_task_duration_seconds", "Scheduled task run time by task type.", ("task_type",)
+)
+EMAIL_SEND_DURATION = Histogram(
+    "dailydough_email_send_seconds", "Time per email API call by report type.", ("report_type",)
+)
+EMAIL_FAILURES = Counter(
+    "dailydough_email_failures_total", "Emails the API rejected or failed to send, by report type.", ("report_type",)
+)
+REPORT_DURATION = Histogram(
+    "dailydough_report_generation_seconds", "Report generation time by report type.", ("report_type",)
+)
+BACKUP_DURATION = Histogram(
+    "dailydough_backup_duration_seconds", "Backup creation time by mode.", ("mode",)
+)
+BACKUP_FAILURES = Counter(
+    "dailydough_backup_failures_total", "Backups that raised an error, by mode.", ("mode",)
+)
+
+CallbackMetric("dailydough_database_file_bytes", "Size of the SQLite database, WAL and shared-memory files.",
+               _database_file_sizes)
+CallbackMetric("dailydough_scheduler_leader", "1 if this worker holds the scheduler lease and runs tasks.",
+               _scheduler_leader)
+CallbackMetric("dailydough_scheduler_running_jobs", "Scheduled jobs currently executing on this worker.",
+               _scheduler_running_jobs)
+CallbackMetric("dailydough_db_writer_groups_committed_total", "Write groups committed by the database writer.",
+               _db_writer_value("groups_committed"), kind="counter")
+CallbackMetric("dailydough_db_writer_batches_committed_total", "Write batches committed by the database writer.",
+               _db_writer_value("batches_committed"), kind="counter")
+CallbackMetric("dailydough_db_writer_lock_retries_total", "Group commits retried because SQLite was locked.",
+               _db_writer_value("lock_retries"), kind="counter")
+CallbackMetric("dailydough_db_writer_lock_wait_seconds_total", "Time the writer spent on locked attempts and backoff.",
+               _db_writer_value("lock_wait_seconds"), kind="counter")
+CallbackMetric("dailydough_db_writer_failed_groups_total", "Write groups that failed after all retries.",
+               _db_writer_value("failed_groups"), kind="counter")
+CallbackMetric("dailydough_db_writer_queue_depth", "Write batches waiting for the database writer.",
+               _db_writer_queue_depth)
@@ -0,0 +1,186 @@
+"""
+Per-request timing and SQL statistics.
+
+RequestTimingMiddleware (app/middleware.py) opens a RequestStats for each
+request in a contextvar. SQLAlchemy cursor events on the application engine
+add every statement's count and time to it, so any session the request uses
+(including sync routes and dependencies run in the threadpool) is
+attributed to the request. Writes applied by the db_writer thread are not
+counted; the time the request spends waiting for them is still part of its
+wall time.
+
+Finished requests go into a rolling window of samples per route, which the
+admin performance page turns into latency histograms. Requests that run more
+than PERF_QUERY_THRESHOLD statements (usually an N+1 loop) or take longer
+than PERF_SLOW_REQUEST_MS are flagged and logged.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+PERF_SAMPLES_PER_ROUTE = int(os.getenv("PERF_SAMPLES_PER_ROUTE", "500"))
+PERF_QUERY_THRESHOLD = int(os.getenv("PERF_QUERY_THRESHOLD", "50"))
+PERF_SLOW_REQUEST_MS = float(os.getenv("PERF_SLOW_REQUEST_MS", "1000"))
+PERF_SLOW_QUERY_MS = float(os.getenv("PERF_SLOW_QUERY_MS", "200"))
+PERF_FLAGGED_KEPT = 50
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class RequestStats:
+    """Counters for one request, mutated by the cursor event hooks."""
+
+    __slots__ = ("queries", "sql_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+_current_stats = contextvars.ContextVar("request_stats", default=None)
+_lock = threading.Lock()
+_samples = {}
+_flagged = deque(maxlen=PERF_FLAGGED_KEPT)
+_started_at = time.time()
+
+
+def begin_request():
+    """Start collecting SQL stats for the current request; returns (stats, token)."""
+    stats = RequestStats()
+    return stats, _current_stats.set(stats)
+
+
+def end_request(token):
+    _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    elapsed = time.perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.sql_seconds += elapsed
+    if elapsed * 1000 >= PERF_SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:500])
+
+
+def instrument_engine(engine):
+    """Attach the statement counters to an engine (idempotent)."""
+    from sqlalchemy import event
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def record_request(route, method, path, status, duration_seconds, stats, request_id=None):
+    """Add a finished request to its route's window and flag it if it crossed a threshold."""
+    duration_ms = duration_seconds * 1000
+    sql_ms = stats.sql_seconds * 1000
+    key = f"{method} {route}"
+    with _lock:
+        window = _samples.get(key)
+        if window is None:
+            window = _samples[key] = deque(maxlen=PERF_SAMPLES_PER_ROUTE)
+        window.append((duration_ms, stats.queries, sql_ms, status))
+
+    reasons = []
+    if stats.queries > PERF_QUERY_THRESHOLD:
+        reasons.append(f"{stats.queries} queries")
+    if duration_ms > PERF_SLOW_REQUEST_MS:
+        reasons.append(f"{duration_ms:.0f} ms")
+    if reasons:
+        _flagged.append({
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration_ms, 1),
+            "queries": stats.queries,
+            "sql_ms": round(sql_ms, 1),
+            "reasons": ", ".join(reasons),
+            "request_id": request_id,
+        })
+        logger.warning("Flagged request %s %s (%s): %d queries, %.1f ms SQL, %.1f ms total",
+                       method, path, ", ".join(reasons), stats.queries, sql_ms, duration_ms)
+
+
+def server_timing_header(duration_seconds, stats):
+    """Server-Timing value: total time and SQL time with the statement count."""
+    return (f'app;dur={duration_seconds * 1000:.1f}, '
+            f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries"')
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def get_route_stats():
+    """Summaries of every route's window, slowest p95 first."""
+    with _lock:
+        windows = {key: list(window) for key, window in _samples.items()}
+
+    routes = []
+    for key, samples in windows.items():
+        durations = sorted(sample[0] for sample in samples)
+        queries = [sample[1] for sample in samples]
+        buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for duration in durations:
+            for index, bound in enumerate(LATENCY_BUCKETS_MS):
+                if duration <= bound:
+                    buckets[index] += 1
+                    break
+            else:
+                buckets[-1] += 1
+        routes.append({
+            "route": key,
+            "count": len(samples),
+            "p50_ms": round(_percentile(durations, 0.5), 1),
+            "p95_ms": round(_percentile(durations, 0.95), 1),
+            "max_ms": round(durations[-1], 1),
+            "avg_queries": round(sum(queries) / len(samples), 1),
+            "max_queries": max(queries),
+            "avg_sql_ms": round(sum(sample[2] for sample in samples) / len(samples), 1),
+            "errors": sum(1 for sample in samples if sample[3] >= 500),
+            "buckets": buckets,
+        })
+    routes.sort(key=lambda route: route["p95_ms"], reverse=True)
+    return routes
+
+
+def get_flagged_requests():
+    """Most recent flagged requests, newest first."""
+    return list(reversed(_flagged))
+
+
+def bucket_labels():
+    labels = [f"≤{bound} ms" for bound in LATENCY_BUCKETS_MS]
+    labels.append(f">{LATENCY_BUCKETS_MS[-1]} ms")
+    return labels
+
+
+def reset_stats():
+    global _started_at
+    with _lock:
+        _samples.clear()
+        _flagged.clear()
+        _started_at = time.time()
+
+
+def stats_started_at():
+    return _started_at
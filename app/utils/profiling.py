@@ -0,0 +1,228 @@
+"""
+Opt-in profiling of report generation.
+
+Functions decorated with @profiled (the CSV generators and parsers and the
+email HTML renderers) do nothing extra unless a profile_session is active in
+the current context. An admin opens one for a single request with
+?profile=1 (ProfilingMiddleware), and a scheduled task with its "Profile"
+flag. While a session is active each profiled call runs under cProfile and
+is timed; when the session ends a report is written to data/logs/profiles
+with per-function timings, the top PROFILE_TOP_N functions by cumulative
+time, and own time grouped into database, JSON, CSV, HTML and other work.
+"""
+import contextvars
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from app.utils.logging_config import LOG_DIR, get_log_context
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = LOG_DIR / "profiles"
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "40"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+PROFILE_NAME_RE = re.compile(r"^[\w.-]+\.json$")
+
+# Own time is attributed to the first category whose pattern matches the
+# function's file or (for C functions) its description
+CATEGORIES = (
+    ("database", ("sqlalchemy", "sqlite3")),
+    ("json", ("json",)),
+    ("csv", ("csv",)),
+    ("html", ("jinja2", "markupsafe", os.path.join("app", "utils", "email.py"))),
+)
+
+
+class ProfileSession:
+    """Profiler and section timings for one request or task run."""
+
+    def __init__(self, label):
+        self.label = label
+        self.started_at = datetime.now()
+        self.name = f"{self.started_at:%Y%m%d_%H%M%S_%f}-{re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_')[:60]}.json"
+        self.profiler = cProfile.Profile()
+        self.sections = {}
+        self._lock = threading.Lock()
+        self._owner = None
+        self._depth = 0
+
+    def _start(self):
+        """Enable the profiler for this thread unless another thread or call already has it."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            if self._owner == thread_id:
+                self._depth += 1
+                return True
+            if self._owner is not None:
+                return False
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Another profiler (e.g. a debugger) is active on this thread
+                return False
+            self._owner = thread_id
+            self._depth = 1
+            return True
+
+    def _stop(self):
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self.profiler.disable()
+                self._owner = None
+
+    def record(self, section, seconds):
+        with self._lock:
+            entry = self.sections.setdefault(section, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def report(self, total_seconds, context):
+        """Build the stored report from the collected stats."""
+        rows = []
+        categories = {name: 0.0 for name, _ in CATEGORIES}
+        categories["other"] = 0.0
+        try:
+            stats = pstats.Stats(self.profiler)
+        except TypeError:
+            # Nothing was profiled
+            stats = None
+
+        if stats is not None:
+            for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+                where = f"{filename} {function}"
+                for name, patterns in CATEGORIES:
+                    if any(pattern in where for pattern in patterns):
+                        categories[name] += own
+                        break
+                else:
+                    categories["other"] += own
+            stats.sort_stats("cumulative")
+            for key in stats.fcn_list[:PROFILE_TOP_N]:
+                filename, line, function = key
+                _, calls, own, cumulative, _ = stats.stats[key]
+                rows.append({
+                    "function": function,
+                    "location": f"{filename}:{line}" if line else filename,
+                    "calls": calls,
+                    "own_ms": round(own * 1000, 2),
+                    "cumulative_ms": round(cumulative * 1000, 2),
+                })
+
+        profiled_seconds = sum(categories.values())
+        return {
+            "label": self.label,
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "total_ms": round(total_seconds * 1000, 1),
+            "context": context,
+            "sections": [
+                {"section": section, "calls": calls, "ms": round(seconds * 1000, 2)}
+                for section, (calls, seconds) in sorted(self.sections.items(), key=lambda item: -item[1][1])
+            ],
+            "categories": [
+                {
+                    "category": name,
+                    "ms": round(seconds * 1000, 2),
+                    "percent": round(seconds * 100 / profiled_seconds, 1) if profiled_seconds else 0.0,
+                }
+                for name, seconds in sorted(categories.items(), key=lambda item: -item[1])
+            ],
+            "top": rows,
+        }
+
+
+_active_session = contextvars.ContextVar("profile_session", default=None)
+
+
+def profiled(func):
+    """Profile and time func when a profile_session is active."""
+    section = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _active_session.get()
+        if session is None:
+            return func(*args, **kwargs)
+        profiling = session._start()
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            if profiling:
+                session._stop()
+            session.record(section, elapsed)
+    return wrapper
+
+
+@contextmanager
+def profile_session(label):
+    """Profile the @profiled calls made inside the block and save a report."""
+    session = ProfileSession(label)
+    token = _active_session.set(session)
+    started = time.perf_counter()
+    try:
+        yield session
+    finally:
+        _active_session.reset(token)
+        try:
+            save_profile(session, session.report(time.perf_counter() - started, get_log_context()))
+        except Exception as e:
+            logger.warning("Could not save profile %s: %s", session.name, e)
+
+
+def save_profile(session, report):
+    """Write a report under PROFILE_DIR and prune old ones."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(PROFILE_DIR / session.name, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    _cleanup_profiles()
+
+
+def _cleanup_profiles():
+    """Keep only the newest PROFILE_KEEP reports."""
+    names = sorted(entry.name for entry in os.scandir(PROFILE_DIR) if PROFILE_NAME_RE.match(entry.name))
+    for name in names[:-max(PROFILE_KEEP, 1)]:
+        try:
+            os.remove(PROFILE_DIR / name)
+        except OSError:
+            pass
+
+
+def list_profiles():
+    """Saved reports, newest first, without their function tables."""
+    if not PROFILE_DIR.exists():
+        return []
+    profiles = []
+    for name in sorted((entry.name for entry in os.scandir(PROFILE_DIR) if PROFILE_NAME_RE.match(entry.name)), reverse=True):
+        report = read_profile(name)
+        if report:
+            profiles.append({
+                "name": name,
+                "label": report["label"],
+                "started_at": report["started_at"],
+                "total_ms": report["total_ms"],
+                "context": report.get("context", {}),
+                "sections": len(report["sections"]),
+            })
+    return profiles
+
+
+def read_profile(name):
+    """Load a saved report by file name, or None if it is missing or invalid."""
+    if not PROFILE_NAME_RE.match(name):
+        return None
+    try:
+        with open(PROFILE_DIR / name, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
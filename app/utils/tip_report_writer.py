@@ -0,0 +1,168 @@
+"""
+Employee tip report CSV writer working on plain data.
+
+Kept free of SQLAlchemy and app.database imports so report batches can hand
+the work to worker processes cheaply: the parent reads the data once, and
+workers only format and write files.
+
+Data shapes:
+- employee: {"display_name": str, "positions_list": str}
+- positions: {position_id: {"name": str, "tip_requirements": [
+      {"field_name": str, "name": str, "include_in_payroll_summary": bool}, ...]}}
+- entries: [(date, position_id, tip_values dict), ...] ordered by date
+"""
+import csv
+from datetime import datetime
+
+
+def _tip_value(tip_values, field_name, default=0.0):
+    if tip_values and isinstance(tip_values, dict):
+        return tip_values.get(field_name, default)
+    return default
+
+
+def write_employee_tip_report(filepath, employee, positions, entries, start_date, end_date, generated_by=None):
+    """Write one employee tip report; generated_by is the 'Generated By' value or None to omit it."""
+    with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, quoting=csv.QUOTE_NONNUMERIC)
+
+        writer.writerow(["Employee Tip Report"])
+        writer.writerow(["Employee", employee["display_name"]])
+        writer.writerow(["Positions", employee["positions_list"]])
+        writer.writerow(["Date Range", f"{start_date} to {end_date}"])
+
+        if generated_by:
+            writer.writerow(["Generated By", generated_by])
+
+        writer.writerow(["Generated At", datetime.now().strftime("%Y-%m-%d %I:%M:%S %p")])
+        writer.writerow([])
+
+        if not entries:
+            writer.writerow(["No entries found for this employee in the selected date range"])
+            return
+
+        entries_by_position = {}
+        for entry_date, position_id, tip_values in entries:
+            position = positions.get(position_id)
+            if position is None:
+                continue
+            pos_name = position["name"]
+            if pos_name not in entries_by_position:
+                entries_by_position[pos_name] = {"position": position, "entries": []}
+            entries_by_position[pos_name]["entries"].append((entry_date, tip_values))
+
+        # Payroll Summary Section - Aggregate across all positions
+        writer.writerow(["PAYROLL SUMMARY"])
+        writer.writerow([])
+
+        has_payroll_data = False
+        for pos_name, pos_data in entries_by_position.items():
+            payroll_reqs = [req for req in pos_data["position"]["tip_requirements"] if req["include_in_payroll_summary"]]
+
+            if payroll_reqs:
+                has_payroll_data = True
+                writer.writerow([f"{pos_name}"])
+                for req in payroll_reqs:
+                    total = 0
+                    for _entry_date, tip_values in pos_data["entries"]:
+                        if tip_values:
+                            total += tip_values.get(req["field_name"], 0)
+                    writer.writerow([req["name"], f"${total:.2f}"])
+                writer.writerow([])
+
+        if not has_payroll_data:
+            writer.writerow(["No payroll summary data available"])
+            writer.writerow([])
+
+        writer.writerow([])
+
+        # Employee Summary Section - Show each position separately
+        writer.writerow(["EMPLOYEE SUMMARY"])
+        writer.writerow([])
+
+        summary_data = []
+        all_reqs_map = {}
+
+        for pos_name, pos_data in entries_by_position.items():
+            requirements = pos_data["position"]["tip_requirements"]
+            pos_entries = pos_data["entries"]
+
+            if requirements:
+                emp_summary = {"employee": employee["display_name"], "position": pos_name}
+
+                for req in requirements:
+                    if req["field_name"] not in all_reqs_map:
+                        all_reqs_map[req["field_name"]] = req["name"]
+                    emp_summary[req["field_name"]] = sum(
+                        _tip_value(tip_values, req["field_name"], 0) for _entry_date, tip_values in pos_entries
+                    )
+
+                emp_summary["num_shifts"] = len(pos_entries)
+                summary_data.append(emp_summary)
+
+        if summary_data:
+            header_row = ["Employee Name", "Position"]
+            for field_name in all_reqs_map.keys():
+                header_row.append(all_reqs_map[field_name])
+            header_row.append("Number of Shifts")
+            writer.writerow(header_row)
+
+            for emp_summary in summary_data:
+                row = [emp_summary["employee"], emp_summary["position"]]
+                for field_name in all_reqs_map.keys():
+                    value = emp_summary.get(field_name, 0)
+                    row.append(f"${value:.2f}")
+                row.append(str(emp_summary["num_shifts"]))
+                writer.writerow(row)
+        else:
+            writer.writerow(["No summary data available"])
+
+        writer.writerow([])
+
+        # Detailed Daily Breakdown - Separate table for each position
+        writer.writerow(["Detailed Daily Breakdown by Employee"])
+        writer.writerow([])
+
+        for pos_name, pos_data in entries_by_position.items():
+            requirements = pos_data["position"]["tip_requirements"]
+
+            if requirements:
+                writer.writerow([f"Employee: {employee['display_name']} - {pos_name}"])
+
+                header_row = ["Date", "Day"]
+                for req in requirements:
+                    header_row.append(req["name"])
+                writer.writerow(header_row)
+
+                total_row = ["TOTAL", ""]
+                tip_totals = {req["field_name"]: 0 for req in requirements}
+
+                for entry_date, tip_values in pos_data["entries"]:
+                    row = [entry_date.strftime("%Y-%m-%d"), entry_date.strftime("%A")]
+
+                    for req in requirements:
+                        value = _tip_value(tip_values, req["field_name"], 0)
+                        row.append(f"${value:.2f}")
+                        tip_totals[req["field_name"]] += value
+
+                    writer.writerow(row)
+
+                for req in requirements:
+                    total_row.append(f"${tip_totals[req['field_name']]:.2f}")
+
+                writer.writerow(total_row)
+                writer.writerow([])
+
+
+def write_employee_tip_reports(jobs):
+    """
+    Write several reports; the unit of work handed to a batch worker process.
+
+    jobs is a list of (filepath, employee, positions, entries, start_date,
+    end_date, generated_by) tuples. Returns the filepaths written.
+    """
+    written = []
+    for filepath, employee, positions, entries, start_date, end_date, generated_by in jobs:
+        write_employee_tip_report(filepath, employee, positions, entries, start_date, end_date, generated_by)
+        written.append(filepath)
+    return written
@@ -1,10 +1,27 @@
 import os
-import httpx
+import time
+import threading
 from typing import Optional, Tuple
 
 GITHUB_VERSION_URL = "https://raw.githubusercontent.com/Xaque8787/dailydough/refs/heads/main/.dockerversion"
+VERSION_CHECK_URL = os.getenv("VERSION_CHECK_URL", GITHUB_VERSION_URL)
 VERSION_FILE_PATH = ".dockerversion"
 
+# How long a fetched remote version is served before a background refresh,
+# and how soon to retry after a failed fetch (e.g. no network)
+VERSION_CHECK_TTL_SECONDS = int(os.getenv("VERSION_CHECK_TTL_SECONDS", "21600"))
+VERSION_CHECK_RETRY_SECONDS = 300
+VERSION_CHECK_TIMEOUT = 5.0
+
+_state = {
+    "remote_version": None,
+    "checked_at": None,
+    "last_success": False,
+}
+_state_lock = threading.Lock()
+_refresh_thread = None
+
+
 def get_local_version() -> str:
     try:
         if os.path.exists(VERSION_FILE_PATH):
@@ -15,17 +32,59 @@ def get_local_version() -> str:
     return "unknown"
 
 def get_remote_version() -> Optional[str]:
+    # Imported here: httpx is only needed by the background refresh and
+    # takes a noticeable share of startup to import
+    import httpx
     try:
-        response = httpx.get(GITHUB_VERSION_URL, timeout=5.0)
+        response = httpx.get(VERSION_CHECK_URL, timeout=VERSION_CHECK_TIMEOUT)
         if response.status_code == 200:
             return response.text.strip()
     except Exception:
         pass
     return None
 
+def refresh_remote_version() -> Optional[str]:
+    """Fetch the remote version now and store it in the in-memory cache."""
+    remote_version = get_remote_version()
+    with _state_lock:
+        if remote_version:
+            _state["remote_version"] = remote_version
+        _state["checked_at"] = time.monotonic()
+        _state["last_success"] = remote_version is not None
+    return remote_version
+
+def _is_stale() -> bool:
+    checked_at = _state["checked_at"]
+    if checked_at is None:
+        return True
+    ttl = VERSION_CHECK_TTL_SECONDS if _state["last_success"] else VERSION_CHECK_RETRY_SECONDS
+    return time.monotonic() - checked_at >= ttl
+
+def start_version_refresh() -> bool:
+    """Refresh the remote version in a background thread unless one is already running."""
+    global _refresh_thread
+    with _state_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return False
+        _refresh_thread = threading.Thread(target=refresh_remote_version, name="version-check", daemon=True)
+        _refresh_thread.start()
+    return True
+
 def check_version() -> Tuple[str, bool]:
+    """
+    Return (local_version, update_available) from memory without waiting on the network.
+
+    When the cached remote version is older than the TTL a background refresh
+    is started; until it completes the last known result is returned.
+    """
     local_version = get_local_version()
-    remote_version = get_remote_version()
+
+    with _state_lock:
+        stale = _is_stale()
+        remote_version = _state["remote_version"]
+
+    if stale:
+        start_version_refresh()
 
     update_available = False
     if remote_version and remote_version != local_version:
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Core workload benchmark: the paths staff and scheduled tasks hit every day.
+
+Builds a throwaway database with bench/synthetic.py (--employees, --positions,
+--requirements, --days; deterministic for a given --seed), then times:
+
+- daily_balance_page: GET /daily-balance for the draft day
+- save_daily_balance: save_daily_balance_data() re-saving the draft day
+- daily_balance_csv, tip_report_csv, consolidated_daily_balance_csv,
+  employee_tip_report_csv: the CSV generators for the last finalized day /
+  its month
+- parse_tip_report_csv, parse_daily_balance_csv: the CSV parsers
+- tip_report_html, daily_balance_html: the email HTML renderers
+- saved_tip_reports, saved_daily_balance_reports: the saved report listings
+  (with a CSV for every finalized day and month on disk)
+- scheduled_tasks_page: GET /scheduled-tasks
+
+Each case runs once to warm up and then --repeat times; results are in
+milliseconds. Pass --baseline with an earlier run's JSON (e.g. from another
+commit) to add the change in median time per case.
+
+Usage:
+    python bench/core_workloads.py [--employees 40] [--positions 5] [--requirements 6]
+                                   [--days 90] [--repeat 10] [--seed 42]
+                                   [--baseline previous.json] [--output results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "-C", REPO_ROOT, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, repeat):
+    """Run func once to warm up, then repeat times; returns timings in ms."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def compare(results, baseline_path):
+    """Add the median change against a previous run of this benchmark."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    for case, result in results.items():
+        previous = baseline.get("results", {}).get(case)
+        if previous and previous.get("median_ms"):
+            result["baseline_median_ms"] = previous["median_ms"]
+            result["change_pct"] = round((result["median_ms"] / previous["median_ms"] - 1) * 100, 1)
+    return baseline.get("commit")
+
+
+def run_cases(args, dataset_start):
+    from fastapi.testclient import TestClient
+    from app.database import init_db, SessionLocal
+    from app.main import app as application
+    from app.models import DailyBalance, Employee
+    from app.routes.daily_balance import save_daily_balance_data, DAYS_OF_WEEK
+    from app.utils.csv_generator import (
+        generate_daily_balance_csv, generate_tip_report_csv, generate_consolidated_daily_balance_csv,
+        generate_employee_tip_report_csv,
+    )
+    from app.utils.csv_reader import (
+        parse_tip_report_csv, parse_daily_balance_csv, get_saved_tip_reports, get_saved_daily_balance_reports,
+    )
+    from app.utils.email import generate_tip_report_html, generate_daily_balance_html
+    from synthetic import generate_dataset, daily_balance_form_data
+
+    init_db()
+    db = SessionLocal()
+    dataset = generate_dataset(db, employees=args.employees, positions=args.positions,
+                               requirements=args.requirements, days=args.days, start=dataset_start, seed=args.seed)
+    db.close()
+
+    draft_day = date.fromisoformat(dataset["end"])
+    report_day = draft_day - timedelta(days=1)
+    # Summary reports cover the month of the last finalized day, up to that day
+    month_start = max(dataset_start, report_day.replace(day=1))
+    month_end = report_day
+
+    results = {}
+    db = SessionLocal()
+
+    with TestClient(application) as client:
+        client.post("/login", data={"username": "admin", "password": "admin"}, follow_redirects=False)
+
+        results["daily_balance_page"] = measure(
+            lambda: client.get(f"/daily-balance?date={draft_day}").raise_for_status(), args.repeat)
+
+        def save():
+            session = SessionLocal()
+            try:
+                balance = session.query(DailyBalance).filter(DailyBalance.date == draft_day).one()
+                form = daily_balance_form_data(session, balance)
+                save_daily_balance_data(session, draft_day, DAYS_OF_WEEK[draft_day.weekday()], form)
+            finally:
+                session.close()
+
+        results["save_daily_balance"] = measure(save, args.repeat)
+
+        balance = db.query(DailyBalance).filter(DailyBalance.date == report_day).one()
+        daily_csv = {}
+
+        def daily_balance_csv():
+            daily_csv["path"] = generate_daily_balance_csv(balance, balance.employee_entries)
+
+        results["daily_balance_csv"] = measure(daily_balance_csv, args.repeat)
+
+        tip_csv = {}
+
+        def tip_report_csv():
+            filename = generate_tip_report_csv(db, month_start, month_end)
+            tip_csv["path"] = os.path.join("data", "reports", "tip_report", str(month_start.year),
+                                           f"{month_start.month:02d}", filename)
+
+        results["tip_report_csv"] = measure(tip_report_csv, args.repeat)
+        results["consolidated_daily_balance_csv"] = measure(
+            lambda: generate_consolidated_daily_balance_csv(db, month_start, month_end), args.repeat)
+        employee = db.query(Employee).order_by(Employee.id).first()
+        results["employee_tip_report_csv"] = measure(
+            lambda: generate_employee_tip_report_csv(db, employee, month_start, month_end), args.repeat)
+
+        parsed = {}
+
+        def parse_tip():
+            parsed["tip"] = parse_tip_report_csv(tip_csv["path"])
+
+        def parse_daily():
+            parsed["daily"] = parse_daily_balance_csv(daily_csv["path"])
+
+        results["parse_tip_report_csv"] = measure(parse_tip, args.repeat)
+        results["parse_daily_balance_csv"] = measure(parse_daily, args.repeat)
+        results["tip_report_html"] = measure(lambda: generate_tip_report_html(parsed["tip"]), args.repeat)
+        results["daily_balance_html"] = measure(lambda: generate_daily_balance_html(parsed["daily"]), args.repeat)
+
+        # A saved report for every finalized day and one tip report per month
+        for balance in db.query(DailyBalance).filter(DailyBalance.finalized == True).all():  # noqa: E712
+            generate_daily_balance_csv(balance, balance.employee_entries)
+        first = dataset_start.replace(day=1)
+        while first <= report_day:
+            last = min((first + timedelta(days=32)).replace(day=1) - timedelta(days=1), report_day)
+            generate_tip_report_csv(db, first, last)
+            first = last + timedelta(days=1)
+
+        results["saved_tip_reports"] = measure(get_saved_tip_reports, args.repeat)
+        results["saved_daily_balance_reports"] = measure(get_saved_daily_balance_reports, args.repeat)
+
+        results["scheduled_tasks_page"] = measure(
+            lambda: client.get("/scheduled-tasks").raise_for_status(), args.repeat)
+
+    db.close()
+    return dataset, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employees", type=int, default=40)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--requirements", type=int, default=6)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", help="JSON output of an earlier run to compare against")
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    workdir = prepare_workdir()
+    try:
+        # The app and the parsers print progress; keep stdout for the JSON report
+        with contextlib.redirect_stdout(io.StringIO()):
+            dataset, results = run_cases(args, date(2026, 1, 1))
+
+        report = {
+            "benchmark": "core_workloads",
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "params": vars(args),
+            "dataset": dataset,
+            "results": results,
+        }
+        if baseline_path:
+            report["baseline_commit"] = compare(results, baseline_path)
+        report = json.dumps(report, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Engine profile benchmark: report generation under the old and tuned SQLite settings.
+
+Seeds a throwaway database with a year of finalized daily balances, then runs
+the three report generators used by scheduled tasks (tip report, consolidated
+daily balance report, per-employee tip report) against two engines:
+
+- baseline: the previous settings (foreign_keys, WAL, busy_timeout,
+  synchronous=NORMAL only; SQLite default cache, no mmap, file temp store)
+- tuned: app.database.ENGINE_PROFILE (honours the DB_* environment variables)
+
+Each workload runs sequentially and then from several threads at once so the
+connection pool is exercised as well.
+
+Usage:
+    python bench/engine_profile.py [--days 365] [--employees 25] [--repeats 3]
+                                   [--threads 4] [--output results.json]
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE_PROFILE = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_pre_ping": False,
+    "page_size": 4096,
+    "cache_size_kb": 2000,
+    "mmap_size_mb": 0,
+    "temp_store": "DEFAULT",
+    "journal_size_limit_mb": -1,
+    "wal_checkpoint_minutes": 0,
+}
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 2),
+        "median_ms": round(statistics.median(ordered) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def seed_database(path, days, employee_count):
+    """Bulk-load synthetic positions, employees and finalized daily balances."""
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    cur = conn.cursor()
+
+    requirements = [
+        ("Cash Tips", "cash_tips", 1, 0, 1, 1),
+        ("Card Tips", "card_tips", 2, 0, 1, 0),
+        ("Tip Out", "tip_out", 3, 1, 0, 1),
+        ("Total Tips", "total_tips", 4, 0, 0, 1),
+    ]
+    for name, field, order, is_deduction, apply_to_revenue, payroll in requirements:
+        cur.execute("""
+            INSERT INTO tip_entry_requirements
+                (name, slug, field_name, display_order, is_deduction, apply_to_revenue,
+                 include_in_payroll_summary, is_total)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (name, field, field, order, is_deduction, apply_to_revenue, payroll, field == "total_tips"))
+
+    for position_id, name in enumerate(["Server", "Bartender", "Host"], start=1):
+        cur.execute("INSERT INTO positions (id, name, slug) VALUES (?, ?, ?)", (position_id, name, name.lower()))
+        for requirement_id in range(1, len(requirements) + 1):
+            cur.execute("INSERT INTO position_tip_requirements VALUES (?, ?)", (position_id, requirement_id))
+
+    for order, (name, category) in enumerate([
+        ("Cash Sales", "revenue"), ("Card Sales", "revenue"), ("Gift Cards", "revenue"),
+        ("Deposit", "expense"), ("Payouts", "expense"), ("Ending Till", "expense"),
+    ]):
+        cur.execute("""
+            INSERT INTO financial_line_item_templates (id, name, category, display_order)
+            VALUES (?, ?, ?, ?)
+        """, (order + 1, name, category, order))
+
+    for employee_id in range(1, employee_count + 1):
+        cur.execute("""
+            INSERT INTO employees (id, name, first_name, last_name, slug, is_active, position_id, scheduled_days)
+            VALUES (?, ?, ?, ?, ?, 1, ?, '[]')
+        """, (employee_id, f"Emp {employee_id}", "Emp", f"Number{employee_id:03d}",
+              f"emp-{employee_id}", (employee_id % 3) + 1))
+
+    start = date.today() - timedelta(days=days)
+    entry_id = 0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        balance_id = offset + 1
+        cur.execute("""
+            INSERT INTO daily_balance (id, date, day_of_week, finalized, created_by_source)
+            VALUES (?, ?, ?, 1, 'user')
+        """, (balance_id, day.isoformat(), day.strftime("%A")))
+        cur.executemany("""
+            INSERT INTO daily_financial_line_items (daily_balance_id, template_id, name, category, value, display_order)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(balance_id, t, f"Item {t}", "revenue" if t <= 3 else "expense", round(rng.uniform(50, 2000), 2), t)
+              for t in range(1, 7)])
+        working = rng.sample(range(1, employee_count + 1), k=max(1, employee_count // 2))
+        for employee_id in working:
+            entry_id += 1
+            tips = {
+                "cash_tips": round(rng.uniform(0, 150), 2),
+                "card_tips": round(rng.uniform(0, 300), 2),
+                "tip_out": round(rng.uniform(0, 40), 2),
+            }
+            tips["total_tips"] = round(tips["cash_tips"] + tips["card_tips"] - tips["tip_out"], 2)
+            cur.execute("""
+                INSERT INTO daily_employee_entries (id, daily_balance_id, employee_id, position_id, tip_values)
+                VALUES (?, ?, ?, ?, ?)
+            """, (entry_id, balance_id, employee_id, (employee_id % 3) + 1, json.dumps(tips)))
+
+    conn.commit()
+    conn.close()
+    return start, start + timedelta(days=days - 1)
+
+
+def run_profile(label, profile, args, start_date, end_date):
+    from sqlalchemy.orm import sessionmaker
+    from app.database import create_app_engine
+    from app.models import Employee
+    from app.utils.csv_generator import (
+        generate_tip_report_csv, generate_consolidated_daily_balance_csv, generate_employee_tip_report_csv
+    )
+
+    bench_engine = create_app_engine(profile)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=bench_engine)
+    month_start = end_date - timedelta(days=30)
+
+    def tip_report(db):
+        generate_tip_report_csv(db, month_start, end_date, source="scheduled_task")
+
+    def daily_balance_report(db):
+        generate_consolidated_daily_balance_csv(db, month_start, end_date, source="scheduled_task")
+
+    def employee_tip_report(db):
+        employee = db.query(Employee).filter(Employee.id == 1).first()
+        generate_employee_tip_report_csv(db, employee, start_date, end_date, source="scheduled_task")
+
+    workloads = {
+        "tip_report_30d": tip_report,
+        "daily_balance_report_30d": daily_balance_report,
+        "employee_tip_report_full_range": employee_tip_report,
+    }
+
+    def timed(workload):
+        db = Session()
+        try:
+            started = time.perf_counter()
+            workload(db)
+            return time.perf_counter() - started
+        finally:
+            db.close()
+
+    results = {"profile": label, "settings": profile, "sequential": {}, "concurrent": {}}
+    for name, workload in workloads.items():
+        timed(workload)  # warm up the page cache and connection pool
+        results["sequential"][name] = summarize([timed(workload) for _ in range(args.repeats)])
+
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(args.repeats):
+                elapsed = timed(workload)
+                with lock:
+                    latencies.append(elapsed)
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        wall_start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - wall_start
+        results["concurrent"][name] = {**summarize(latencies), "wall_seconds": round(wall, 3)}
+
+    bench_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--employees", type=int, default=25)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    workdir = prepare_workdir()
+    try:
+        from app.database import DATABASE_PATH, ENGINE_PROFILE, init_db, engine
+        importlib.import_module("app.models")  # register tables before create_all
+
+        init_db()
+        engine.dispose()
+        start_date, end_date = seed_database(DATABASE_PATH, args.days, args.employees)
+
+        results = [
+            run_profile("baseline", BASELINE_PROFILE, args, start_date, end_date),
+            run_profile("tuned", ENGINE_PROFILE, args, start_date, end_date),
+        ]
+
+        report = json.dumps({
+            "benchmark": "engine_profile",
+            "params": vars(args),
+            "database_bytes": os.path.getsize(DATABASE_PATH),
+            "results": results,
+        }, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
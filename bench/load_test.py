@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Load test: concurrent staff and scheduler traffic against the whole app.
+
+Builds a throwaway database with bench/synthetic.py ending yesterday, starts
+the app in-process (startup/shutdown handlers included, so the db writer and
+scheduler run as in production) and drives it through httpx's ASGI transport
+with --users virtual staff for --duration seconds. The transport runs the app
+on the benchmark's event loop, like a single uvicorn worker would.
+
+Each virtual user logs in and then repeatedly picks an operation by the
+--mix weights:
+
+- load: GET /daily-balance for one of the last --open-days days
+- save: POST /daily-balance/save with that day's form
+- finalize: POST /daily-balance/finalize with that day's form
+- export: GET the tip report or consolidated daily balance CSV export for
+  the week up to the last finalized day
+- browse: GET a report listing or the scheduled tasks page
+- task: run a tip report, daily balance report, report batch or backup task
+  on a thread pool the size of the scheduler's, as a scheduler trigger would
+
+Latency is reported per operation (p50/p95/p99 in milliseconds), along with
+throughput and lock errors: "database is locked" errors raised through the
+SQLAlchemy engine (request handlers and task sessions) and the db writer's
+lock retries, lock wait and failed groups. Triggered tasks generate their
+reports but email nobody.
+
+Usage:
+    python bench/load_test.py [--users 8] [--duration 30] [--think-ms 0]
+                              [--mix load=30,save=20,finalize=5,export=10,browse=25,task=10]
+                              [--open-days 7] [--employees 40] [--positions 5]
+                              [--requirements 6] [--days 90] [--seed 42]
+                              [--output results.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ["load", "save", "finalize", "export", "browse", "task"]
+DEFAULT_MIX = "load=30,save=20,finalize=5,export=10,browse=25,task=10"
+TRIGGERED_TASK_TYPES = ["tip_report", "daily_balance_report", "report_batch", "backup"]
+# Matches the scheduler's ThreadPoolExecutor in app/scheduler.py
+SCHEDULER_THREADS = 20
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "-C", REPO_ROOT, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_mix(value):
+    """'load=30,save=20' -> {"load": 30.0, "save": 20.0}; unknown operations are an error."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight for '{name}' must be a number")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("at least one operation needs a positive weight")
+    return mix
+
+
+def is_lock_error(exc):
+    return "database is locked" in str(exc)
+
+
+class Recorder:
+    """Latencies and failures per operation, shared by the users and task threads."""
+
+    def __init__(self):
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.errors = {name: 0 for name in OPERATIONS}
+        self.lock_errors = {name: 0 for name in OPERATIONS}
+        self.task_outcomes = {}
+        self.error_samples = []
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, error=None):
+        with self._lock:
+            self.latencies[operation].append(seconds)
+            if error is not None:
+                self.errors[operation] += 1
+                if is_lock_error(error):
+                    self.lock_errors[operation] += 1
+                if len(self.error_samples) < 10:
+                    self.error_samples.append(f"{operation}: {error}")
+
+    def record_task(self, task_type, succeeded):
+        key = f"{task_type}:{'success' if succeeded else 'failed'}"
+        with self._lock:
+            self.task_outcomes[key] = self.task_outcomes.get(key, 0) + 1
+
+    def summary(self, wall):
+        operations = {}
+        for name in OPERATIONS:
+            latencies = self.latencies[name]
+            if not latencies:
+                continue
+            operations[name] = {
+                "count": len(latencies),
+                "errors": self.errors[name],
+                "lock_errors": self.lock_errors[name],
+                "throughput_per_second": round(len(latencies) / wall, 2),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+                "max_ms": round(max(latencies) * 1000, 2),
+            }
+        return operations
+
+
+def build_workload(db, dataset, open_days):
+    """Form bodies for the open days, export ranges and the scheduler jobs to trigger."""
+    from app.models import DailyBalance, ScheduledTask
+    from app.services.scheduler_tasks import (
+        run_tip_report_task, run_daily_balance_report_task, run_report_batch_task, run_backup_task,
+    )
+    from synthetic import daily_balance_form_data
+
+    end = date.fromisoformat(dataset["end"])
+    forms = {}
+    for balance in db.query(DailyBalance).filter(DailyBalance.date > end - timedelta(days=open_days)).all():
+        fields = {}
+        for key, value in daily_balance_form_data(db, balance).multi_items():
+            fields.setdefault(key, []).append(value)
+        fields["target_date"] = [balance.date.isoformat()]
+        forms[balance.date.isoformat()] = fields
+
+    # The last day is the draft; exports cover the week before it
+    report_end = end - timedelta(days=1)
+    report_start = max(date.fromisoformat(dataset["start"]), report_end - timedelta(days=6))
+    exports = [
+        f"/reports/tip-report/export?start_date={report_start}&end_date={report_end}",
+        f"/reports/daily-balance/export?start_date={report_start}&end_date={report_end}",
+    ]
+    browse = [
+        "/reports/tip-report",
+        f"/reports/daily-balance?month={report_end:%Y-%m}",
+        "/reports/tip-report/saved",
+        "/reports/daily-balance/saved",
+        "/scheduled-tasks",
+    ]
+
+    # Same arguments add_job_to_scheduler passes for these task types, with
+    # an empty recipient list and opt-in bypassed so nothing is emailed
+    functions = {
+        "tip_report": run_tip_report_task,
+        "daily_balance_report": run_daily_balance_report_task,
+        "report_batch": run_report_batch_task,
+        "backup": run_backup_task,
+    }
+    jobs = []
+    for task in db.query(ScheduledTask).filter(ScheduledTask.task_type.in_(TRIGGERED_TASK_TYPES)).all():
+        if task.task_type == "backup":
+            args = [task.id, task.name]
+        else:
+            args = [task.id, task.name, task.date_range_type, "[]", True, False]
+        jobs.append((task.task_type, functions[task.task_type], args))
+    return forms, exports, browse, jobs
+
+
+async def run_load(args, application, workload, recorder):
+    import httpx
+
+    forms, exports, browse, jobs = workload
+    days = sorted(forms)
+    operations = [name for name in OPERATIONS if args.mix.get(name, 0) > 0]
+    weights = [args.mix[name] for name in operations]
+    loop = asyncio.get_running_loop()
+    task_pool = ThreadPoolExecutor(SCHEDULER_THREADS, thread_name_prefix="load-task")
+    transport = httpx.ASGITransport(app=application)
+    deadline = time.perf_counter() + args.duration
+
+    def run_job(task_type, func, job_args):
+        succeeded = False
+        try:
+            succeeded = bool(func(*job_args))
+        finally:
+            recorder.record_task(task_type, succeeded)
+
+    async def request(client, method, url, **kwargs):
+        response = await client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url.split('?')[0]} returned {response.status_code}")
+
+    async def user(index):
+        rng = random.Random(args.seed + index)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            await client.post("/login", data={"username": "admin", "password": "admin"})
+            while time.perf_counter() < deadline:
+                operation = rng.choices(operations, weights)[0]
+                day = rng.choice(days)
+                started = time.perf_counter()
+                error = None
+                try:
+                    if operation == "load":
+                        await request(client, "GET", f"/daily-balance?date={day}")
+                    elif operation == "save":
+                        await request(client, "POST", "/daily-balance/save", data=forms[day])
+                    elif operation == "finalize":
+                        await request(client, "POST", "/daily-balance/finalize", data=forms[day])
+                    elif operation == "export":
+                        await request(client, "GET", rng.choice(exports))
+                    elif operation == "browse":
+                        await request(client, "GET", rng.choice(browse))
+                    else:
+                        task_type, func, job_args = rng.choice(jobs)
+                        await loop.run_in_executor(task_pool, run_job, task_type, func, job_args)
+                except Exception as e:
+                    error = e
+                recorder.record(operation, time.perf_counter() - started, error)
+                if args.think_ms:
+                    await asyncio.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(user(index) for index in range(args.users)))
+    finally:
+        task_pool.shutdown(wait=True)
+    return time.perf_counter() - started
+
+
+async def run_benchmark(args, recorder):
+    from sqlalchemy import event
+    from app.database import init_db, SessionLocal, engine
+    from app.db_writer import db_writer
+    from app.main import app as application
+    from synthetic import generate_dataset
+
+    init_db()
+    db = SessionLocal()
+    dataset = generate_dataset(db, employees=args.employees, positions=args.positions,
+                               requirements=args.requirements, days=args.days,
+                               start=date.today() - timedelta(days=args.days), seed=args.seed)
+    workload = build_workload(db, dataset, args.open_days)
+    db.close()
+
+    engine_lock_errors = {"count": 0}
+
+    @event.listens_for(engine, "handle_error")
+    def count_lock_errors(context):
+        if is_lock_error(context.original_exception):
+            engine_lock_errors["count"] += 1
+
+    async with application.router.lifespan_context(application):
+        writer_before = (db_writer.lock_retries, db_writer.lock_wait_seconds, db_writer.failed_groups)
+        wall = await run_load(args, application, workload, recorder)
+        writer_after = (db_writer.lock_retries, db_writer.lock_wait_seconds, db_writer.failed_groups)
+
+    event.remove(engine, "handle_error", count_lock_errors)
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    lock_errors = {
+        "engine_lock_errors": engine_lock_errors["count"],
+        "engine_lock_errors_per_1000_operations": round(engine_lock_errors["count"] * 1000 / total, 2) if total else 0.0,
+        "writer_lock_retries": writer_after[0] - writer_before[0],
+        "writer_lock_wait_seconds": round(writer_after[1] - writer_before[1], 3),
+        "writer_failed_groups": writer_after[2] - writer_before[2],
+    }
+    return dataset, wall, total, lock_errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual staff")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to generate load for")
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="Mean pause between a user's operations (uniform 0..2x)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--open-days", type=int, default=7, help="Recent days staff load, save and finalize")
+    parser.add_argument("--employees", type=int, default=40)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--requirements", type=int, default=6)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    # Scheduled report tasks must not send real email
+    os.environ["RESEND_API_KEY"] = ""
+
+    workdir = prepare_workdir()
+    try:
+        recorder = Recorder()
+        # The app and the parsers print progress; keep stdout for the JSON report
+        with contextlib.redirect_stdout(io.StringIO()):
+            dataset, wall, total, lock_errors = asyncio.run(run_benchmark(args, recorder))
+
+        report = json.dumps({
+            "benchmark": "load_test",
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "params": vars(args),
+            "dataset": dataset,
+            "wall_seconds": round(wall, 3),
+            "operations_total": total,
+            "throughput_per_second": round(total / wall, 2) if wall else 0.0,
+            "operations": recorder.summary(wall),
+            "task_outcomes": recorder.task_outcomes,
+            "lock_errors": lock_errors,
+            "error_samples": recorder.error_samples,
+        }, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
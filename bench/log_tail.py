@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Log viewer benchmark: first page of /admin/error-logs on a full-size log.
+
+Writes a log file of --size-mb (the default rotation size) plus --backups
+rotated files in a throwaway data/logs directory, then compares:
+
+- readlines: the old read_log_file(), which read and split the whole file
+  to keep the last max_lines
+- tail: search_logs() reading backwards from the end of the file
+- tail_filtered: search_logs() for ERROR records from one logger, which has
+  to scan further back to fill a page
+
+Each variant reports wall time, then peak Python memory from a second run
+under tracemalloc.
+
+Usage:
+    python bench/log_tail.py [--size-mb 10] [--backups 2] [--max-lines 500]
+                             [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGGERS = ["uvicorn.access", "app.main", "app.scheduler", "sqlalchemy.engine"]
+LEVELS = ["INFO"] * 12 + ["WARNING"] * 3 + ["ERROR"]
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/logs is throwaway."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def write_log(path, size_bytes, started, rng):
+    """Write formatted records (with the odd traceback) until the file reaches size_bytes."""
+    timestamp = started
+    with open(path, "w", encoding="utf-8") as f:
+        while f.tell() < size_bytes:
+            timestamp += timedelta(milliseconds=rng.randint(5, 400))
+            level = rng.choice(LEVELS)
+            f.write(f"{timestamp:%Y-%m-%d %H:%M:%S} - {rng.choice(LOGGERS)} - {level} - "
+                    f"request {rng.randint(1, 10**6)} handled in {rng.random() * 50:.2f}ms\n")
+            if level == "ERROR" and rng.random() < 0.3:
+                f.write("Traceback (most recent call last):\n"
+                        '  File "app/routes/daily_balance.py", line 120, in save\n'
+                        "ValueError: invalid literal for float()\n")
+    return timestamp
+
+
+def measure(func):
+    """Time func, then run it again under tracemalloc for its peak memory."""
+    started = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"seconds": round(seconds, 4), "peak_kb": round(peak / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=float, default=10)
+    parser.add_argument("--backups", type=int, default=2)
+    parser.add_argument("--max-lines", type=int, default=500)
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    workdir = prepare_workdir()
+    try:
+        from app.utils.logging_config import LOG_DIR, LOG_FILE, search_logs
+
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        rng = random.Random(42)
+        size_bytes = int(args.size_mb * 1024 * 1024)
+        timestamp = datetime(2026, 9, 1)
+        for index in range(args.backups, 0, -1):
+            timestamp = write_log(f"{LOG_FILE}.{index}", size_bytes, timestamp, rng)
+        write_log(LOG_FILE, size_bytes, timestamp, rng)
+
+        def readlines():
+            with open(LOG_FILE, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            return lines[-args.max_lines:][::-1]
+
+        old_lines, results_readlines = measure(readlines)
+        page, results_tail = measure(lambda: search_logs(max_records=args.max_lines))
+        filtered, results_filtered = measure(
+            lambda: search_logs(max_records=args.max_lines, level="ERROR", logger_name="app.scheduler")
+        )
+
+        results = {
+            "readlines": {**results_readlines, "lines": len(old_lines)},
+            "tail": {**results_tail, "records": len(page["records"])},
+            "tail_filtered": {**results_filtered, "records": len(filtered["records"])},
+            "speedup": round(results_readlines["seconds"] / results_tail["seconds"], 1) if results_tail["seconds"] else None,
+        }
+        report = json.dumps({"benchmark": "log_tail", "params": vars(args), "results": results}, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Prefill benchmark: creating draft daily balances for a date range.
+
+Seeds a throwaway database with positions, tip requirements, financial
+templates (including starting/ending till), employees on recurring and
+calendar schedules, and scheduled checks/EFTs. Then it compares:
+
+- day_by_day: save_daily_balance_data() once per date with the form data the
+  daily balance page would submit, which is what catching up used to take
+- prefill: prefill_daily_balances() for a range of the same length
+
+and checks that the prefilled range carries the ending till forward.
+
+Usage:
+    python bench/prefill.py [--days 90] [--employees 25] [--output results.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def seed(db, employee_count, calendar_start, calendar_days):
+    from app.models import (Position, TipEntryRequirement, FinancialLineItemTemplate, Employee,
+                            EmployeePositionSchedule, ScheduledCheck, ScheduledEFT)
+    from app.services.schedule_index import index_employee_schedules
+
+    requirements = [
+        TipEntryRequirement(name="Cash Tips", slug="cash-tips", field_name="cash_tips", display_order=1, apply_to_revenue=True),
+        TipEntryRequirement(name="Card Tips", slug="card-tips", field_name="card_tips", display_order=2),
+        TipEntryRequirement(name="Tip Out", slug="tip-out", field_name="tip_out", display_order=3, is_deduction=True),
+        TipEntryRequirement(name="Total Tips", slug="total-tips", field_name="total_tips", display_order=4, is_total=True),
+    ]
+    positions = [Position(name=name, slug=name.lower(), tip_requirements=requirements)
+                 for name in ("Server", "Bartender", "Host")]
+    db.add_all(requirements + positions)
+
+    for order, (name, category, starting, ending) in enumerate([
+        ("Starting Till", "revenue", True, False), ("Cash Sales", "revenue", False, False),
+        ("Card Sales", "revenue", False, False), ("Deposit", "expense", False, False),
+        ("Payouts", "expense", False, False), ("Ending Till", "expense", False, True),
+    ]):
+        db.add(FinancialLineItemTemplate(name=name, category=category, display_order=order,
+                                         is_starting_till=starting, is_ending_till=ending))
+    db.flush()
+
+    for number in range(employee_count):
+        employee = Employee(name=f"Number{number:03d}, Emp", first_name="Emp", last_name=f"Number{number:03d}",
+                            slug=f"emp-{number}", is_active=True)
+        db.add(employee)
+        db.flush()
+        position = positions[number % len(positions)]
+        if number % 5 == 4:
+            dates = [(calendar_start + timedelta(days=offset)).isoformat()
+                     for offset in range(number % 3, calendar_days, 3)]
+            schedule = EmployeePositionSchedule(employee_id=employee.id, position_id=position.id,
+                                                schedule_type="calendar", specific_dates=dates)
+        else:
+            days = [DAYS[(number + shift) % 7] for shift in range(4)]
+            schedule = EmployeePositionSchedule(employee_id=employee.id, position_id=position.id,
+                                                schedule_type="recurring", days_of_week=days)
+        db.add(schedule)
+        index_employee_schedules(db, employee.id, [schedule])
+
+    db.add(ScheduledCheck(payable_to="Landlord", check_number="100", default_total=1500.0, days_of_week=["Monday"]))
+    db.add(ScheduledCheck(payable_to="Linen Service", default_total=85.0, days_of_week=["Tuesday", "Friday"]))
+    db.add(ScheduledEFT(payable_to="Produce Co", card_number="4242", default_total=220.0, days_of_week=["Wednesday"]))
+    db.commit()
+
+
+def day_by_day(db, start, days):
+    """Save each date through the form handler, as a user catching up would."""
+    from starlette.datastructures import FormData
+    from app.models import FinancialLineItemTemplate
+    from app.routes.daily_balance import save_daily_balance_data, DAYS_OF_WEEK
+    from app.services.schedule_index import get_scheduled_combo_keys, scheduled_entries_for_date
+
+    financial_templates = db.query(FinancialLineItemTemplate).all()
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        fields = [("notes", "")]
+        fields += [(f"financial_item_{t.id}", "0") for t in financial_templates]
+        for employee_id, position_id in sorted(get_scheduled_combo_keys(db, day)):
+            combo = f"{employee_id}-{position_id}"
+            fields.append(("employee_ids", combo))
+            fields += [(f"tip_{field}_{combo}", "0") for field in ("cash_tips", "card_tips", "tip_out")]
+        checks, efts = scheduled_entries_for_date(db, day)
+        for index, check in enumerate(checks):
+            fields += [(f"check_number_{index}", check.check_number or ""), (f"check_date_{index}", day.isoformat()),
+                       (f"check_payable_to_{index}", check.payable_to), (f"check_total_{index}", str(check.total)),
+                       (f"check_memo_{index}", check.memo or "")]
+        for index, eft in enumerate(efts):
+            fields += [(f"eft_date_{index}", day.isoformat()), (f"eft_card_number_{index}", eft.card_number or ""),
+                       (f"eft_payable_to_{index}", eft.payable_to), (f"eft_total_{index}", str(eft.total)),
+                       (f"eft_memo_{index}", eft.memo or "")]
+        save_daily_balance_data(db, day, DAYS_OF_WEEK[day.weekday()], FormData(fields))
+
+
+def count_rows(db, start, end):
+    from sqlalchemy import text
+    params = {"start": start.isoformat(), "end": end.isoformat()}
+    counts = {}
+    for table in ("daily_financial_line_items", "daily_employee_entries", "daily_balance_checks", "daily_balance_efts"):
+        counts[table] = db.execute(text(f"""
+            SELECT COUNT(*) FROM {table} t JOIN daily_balance b ON b.id = t.daily_balance_id
+            WHERE b.date BETWEEN :start AND :end
+        """), params).scalar()
+    counts["daily_balance"] = db.execute(
+        text("SELECT COUNT(*) FROM daily_balance WHERE date BETWEEN :start AND :end"), params
+    ).scalar()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--employees", type=int, default=25)
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    workdir = prepare_workdir()
+    try:
+        from sqlalchemy import text
+        from app.database import init_db, SessionLocal
+        from app.db_writer import start_db_writer, shutdown_db_writer
+        from app.services.daily_balance_prefill import prefill_daily_balances
+
+        init_db()
+        start_db_writer()
+
+        legacy_start = date(2026, 1, 5)
+        prefill_start = legacy_start + timedelta(days=args.days)
+        db = SessionLocal()
+        seed(db, args.employees, legacy_start, args.days * 2)
+
+        started = time.perf_counter()
+        day_by_day(db, legacy_start, args.days)
+        legacy_seconds = time.perf_counter() - started
+        legacy_end = prefill_start - timedelta(days=1)
+
+        # Give the last day-by-day balance a real ending till to chain from
+        db.execute(text("""
+            UPDATE daily_financial_line_items SET value = 321.5
+            WHERE name = 'Ending Till'
+              AND daily_balance_id = (SELECT id FROM daily_balance WHERE date = :day)
+        """), {"day": legacy_end.isoformat()})
+        db.commit()
+
+        progress_calls = []
+        prefill_end = prefill_start + timedelta(days=args.days - 1)
+        started = time.perf_counter()
+        summary = prefill_daily_balances(db, prefill_start, prefill_end,
+                                         progress=lambda done, total: progress_calls.append(done))
+        prefill_seconds = time.perf_counter() - started
+        db.close()
+
+        db = SessionLocal()
+        tills = {row[0] for row in db.execute(text("""
+            SELECT DISTINCT li.value FROM daily_financial_line_items li
+            JOIN daily_balance b ON b.id = li.daily_balance_id
+            WHERE b.date BETWEEN :start AND :end AND li.name IN ('Starting Till', 'Ending Till')
+        """), {"start": prefill_start.isoformat(), "end": prefill_end.isoformat()})}
+        results = {
+            "day_by_day": {
+                "seconds": round(legacy_seconds, 3),
+                "ms_per_day": round(legacy_seconds * 1000 / args.days, 2),
+                "rows": count_rows(db, legacy_start, legacy_end),
+            },
+            "prefill": {
+                "seconds": round(prefill_seconds, 3),
+                "ms_per_day": round(prefill_seconds * 1000 / args.days, 2),
+                "rows": count_rows(db, prefill_start, prefill_end),
+                "statements": summary["rows_written"],
+                "progress_updates": len(progress_calls),
+                "carried_till_values": sorted(tills),
+            },
+            "speedup": round(legacy_seconds / prefill_seconds, 1) if prefill_seconds else None,
+        }
+        db.close()
+        shutdown_db_writer()
+
+        report = json.dumps({"benchmark": "prefill", "params": vars(args), "results": results}, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
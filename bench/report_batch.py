@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Report batch benchmark: per-employee tip reports, serially vs in one batch.
+
+Seeds a throwaway database with a month of finalized daily balances for
+--employees staff, then times:
+
+- serial: generate_employee_tip_report_csv() once per employee, which is
+  what one scheduled employee tip report task per staff member amounts to
+- batch_inline: generate_report_batch() with a single worker (one snapshot
+  read, files written in-process)
+- batch_pool: generate_report_batch() with --workers processes
+- full_batch: batch_pool plus the tip and consolidated daily balance reports,
+  i.e. a complete scheduled report batch run
+
+Every employee file from the batch is compared with the serial output
+(ignoring the Generated At line) to confirm the reports are identical.
+
+Usage:
+    python bench/report_batch.py [--employees 100] [--days 31] [--workers 4]
+                                 [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def seed_database(path, start, days, employee_count):
+    """Bulk-load positions, employees with schedules and finalized daily balances."""
+    rng = random.Random(42)
+    conn = sqlite3.connect(path)
+    cur = conn.cursor()
+
+    requirements = [
+        ("Cash Tips", "cash_tips", 1, 0, 1, 0),
+        ("Card Tips", "card_tips", 2, 0, 1, 0),
+        ("Tip Out", "tip_out", 3, 1, 0, 0),
+        ("Total Tips", "total_tips", 4, 0, 1, 1),
+    ]
+    for name, field, order, is_deduction, payroll, is_total in requirements:
+        cur.execute("""
+            INSERT INTO tip_entry_requirements
+                (name, slug, field_name, display_order, is_deduction, include_in_payroll_summary, is_total)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (name, field, field, order, is_deduction, payroll, is_total))
+
+    for position_id, name in enumerate(["Server", "Bartender", "Host"], start=1):
+        cur.execute("INSERT INTO positions (id, name, slug) VALUES (?, ?, ?)", (position_id, name, name.lower()))
+        for requirement_id in range(1, len(requirements) + 1):
+            cur.execute("INSERT INTO position_tip_requirements VALUES (?, ?)", (position_id, requirement_id))
+
+    for employee_id in range(1, employee_count + 1):
+        cur.execute("""
+            INSERT INTO employees (id, name, first_name, last_name, slug, is_active, scheduled_days)
+            VALUES (?, ?, ?, ?, ?, 1, '[]')
+        """, (employee_id, f"Number{employee_id:03d}, Emp", "Emp", f"Number{employee_id:03d}", f"emp-{employee_id}"))
+        cur.execute("""
+            INSERT INTO employee_position_schedule (employee_id, position_id, days_of_week, schedule_type, specific_dates)
+            VALUES (?, ?, '["Monday", "Friday"]', 'recurring', '[]')
+        """, (employee_id, (employee_id % 3) + 1))
+
+    entry_id = 0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        balance_id = offset + 1
+        cur.execute("""
+            INSERT INTO daily_balance (id, date, day_of_week, finalized, created_by_source)
+            VALUES (?, ?, ?, 1, 'user')
+        """, (balance_id, day.isoformat(), day.strftime("%A")))
+        for employee_id in rng.sample(range(1, employee_count + 1), k=max(1, employee_count * 2 // 3)):
+            entry_id += 1
+            tips = {
+                "cash_tips": round(rng.uniform(0, 150), 2),
+                "card_tips": round(rng.uniform(0, 300), 2),
+                "tip_out": round(rng.uniform(0, 40), 2),
+            }
+            tips["total_tips"] = round(tips["cash_tips"] + tips["card_tips"] - tips["tip_out"], 2)
+            cur.execute("""
+                INSERT INTO daily_employee_entries (id, daily_balance_id, employee_id, position_id, tip_values)
+                VALUES (?, ?, ?, ?, ?)
+            """, (entry_id, balance_id, employee_id, (employee_id % 3) + 1, json.dumps(tips)))
+
+    conn.commit()
+    conn.close()
+    return entry_id
+
+
+def read_report(path):
+    with open(path, encoding="utf-8") as f:
+        return [line for line in f if not line.startswith('"Generated At"')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--employees", type=int, default=100)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    workdir = prepare_workdir()
+    try:
+        from app.database import init_db, SessionLocal, DATABASE_PATH
+        from app.models import Employee
+        from app.services.report_batch import generate_report_batch
+        from app.utils.csv_generator import generate_employee_tip_report_csv, employee_tip_report_path
+
+        init_db()
+        start = date(2026, 9, 1)
+        end = start + timedelta(days=args.days - 1)
+        entry_count = seed_database(DATABASE_PATH, start, args.days, args.employees)
+
+        db = SessionLocal()
+        employees = db.query(Employee).order_by(Employee.id).all()
+        started = time.perf_counter()
+        for employee in employees:
+            generate_employee_tip_report_csv(db, employee, start, end, source="scheduled_task")
+        serial_seconds = time.perf_counter() - started
+        db.close()
+
+        serial_reports = {}
+        for employee in employees:
+            reports_dir, filename = employee_tip_report_path(employee.slug, start, end)
+            serial_reports[filename] = read_report(os.path.join(reports_dir, filename))
+
+        results = {"serial": {"seconds": round(serial_seconds, 3)}}
+        runs = (("batch_inline", 1, False), ("batch_pool", args.workers, False), ("full_batch", args.workers, True))
+        for label, workers, include_summary_reports in runs:
+            db = SessionLocal()
+            started = time.perf_counter()
+            batch = generate_report_batch(db, start, end, workers=workers, include_summary_reports=include_summary_reports)
+            seconds = time.perf_counter() - started
+            db.close()
+
+            mismatched = [
+                path for path in batch["employee_reports"]
+                if read_report(path) != serial_reports[os.path.basename(path)]
+            ]
+            results[label] = {
+                "seconds": round(seconds, 3),
+                "workers": batch["workers"],
+                "prepare_seconds": batch["prepare_seconds"],
+                "employee_reports": len(batch["employee_reports"]),
+                "mismatched_reports": len(mismatched),
+                "includes_summary_reports": include_summary_reports,
+            }
+
+        report = json.dumps({
+            "benchmark": "report_batch",
+            "params": vars(args),
+            "cpu_count": os.cpu_count(),
+            "entries": entry_count,
+            "results": results,
+        }, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
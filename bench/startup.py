@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of app.main and time to first response.
+
+Both are measured in fresh interpreters in a throwaway working directory:
+
+- import: python -X importtime -c "import app.main", --runs times. Reports
+  the total import time, the slowest top-level packages by their own import
+  time and the app modules by cumulative import time, from the median run.
+- first_response: uvicorn app.main:app started --runs times on a free port,
+  timed from process start until GET / answers (what the container
+  healthcheck waits for). One unmeasured start first creates the database
+  and applies migrations, so the runs match a restart with existing data.
+
+Timings are in milliseconds. Pass --baseline with an earlier run's JSON (e.g.
+from another commit) to add the change in the medians.
+
+Usage:
+    python bench/startup.py [--runs 5] [--top 15] [--baseline previous.json]
+                            [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "-C", REPO_ROOT, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(samples):
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples), 1),
+        "median_ms": round(statistics.median(samples), 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+def parse_importtime(stderr):
+    """-X importtime lines -> [(module, self_us, cumulative_us)] in import order."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def import_profile(runs, top):
+    runs_modules = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                                capture_output=True, text=True, check=True)
+        modules = parse_importtime(result.stderr)
+        total = next(cumulative for name, _, cumulative in modules if name == "app.main")
+        runs_modules.append((total / 1000, modules))
+
+    runs_modules.sort(key=lambda run: run[0])
+    _, median_modules = runs_modules[len(runs_modules) // 2]
+
+    packages = {}
+    for name, self_us, _ in median_modules:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    app_modules = [(name, cumulative) for name, _, cumulative in median_modules
+                   if name == "app" or name.startswith("app.")]
+
+    return {
+        **summarize([total for total, _ in runs_modules]),
+        "modules_imported": len(median_modules),
+        "slowest_packages": [
+            {"package": package, "self_ms": round(self_us / 1000, 1)}
+            for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "app_modules": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1)}
+            for name, cumulative in sorted(app_modules, key=lambda item: -item[1])[:top]
+        ],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def time_to_first_response(timeout=60):
+    """Start uvicorn and return the ms until GET / answers with anything but a server error."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/"
+    opener = urllib.request.build_opener(NoRedirect)
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                # Redirects (to /login or /setup) count as answered, as with curl -f
+                with opener.open(url, timeout=5):
+                    pass
+                return (time.perf_counter() - started) * 1000
+            except urllib.error.HTTPError as e:
+                if e.code < 500:
+                    return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"no response from {url} within {timeout}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def compare(report, baseline_path):
+    """Add the median change against a previous run of this benchmark."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    for key in ("import", "first_response"):
+        previous = baseline.get(key, {}).get("median_ms")
+        if previous:
+            report[key]["baseline_median_ms"] = previous
+            report[key]["change_pct"] = round((report[key]["median_ms"] / previous - 1) * 100, 1)
+    report["baseline_commit"] = baseline.get("commit")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Rows in the package and app module lists")
+    parser.add_argument("--baseline", help="JSON output of an earlier run to compare against")
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    workdir = prepare_workdir()
+    try:
+        imports = import_profile(args.runs, args.top)
+        time_to_first_response()
+        first_response = summarize([time_to_first_response() for _ in range(args.runs)])
+
+        report = {
+            "benchmark": "startup",
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "params": vars(args),
+            "import": imports,
+            "first_response": first_response,
+        }
+        if baseline_path:
+            compare(report, baseline_path)
+        report = json.dumps(report, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Deterministic synthetic data for the benchmarks.
+
+generate_dataset() fills an initialized database with a restaurant's worth of
+data through the ORM: tip requirements, positions, financial line item
+templates, employees on recurring and calendar schedules (with the schedule
+index), finalized daily balances with employee tip entries, line items,
+checks and EFTs, scheduled checks/EFTs, scheduled tasks with execution
+history, and an admin user. The same arguments always produce the same rows,
+so runs on different commits measure the same workload.
+
+Import it from a benchmark script in this directory:
+
+    from synthetic import generate_dataset, daily_balance_form_data
+"""
+import json
+import random
+from datetime import date, datetime, timedelta
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# (name, field_name, is_deduction, apply_to_revenue, include_in_payroll_summary)
+BASE_REQUIREMENTS = [
+    ("Cash Tips", "cash_tips", False, True, True),
+    ("Card Tips", "card_tips", False, False, True),
+    ("Tip Out", "tip_out", True, False, False),
+    ("Bar Share", "bar_share", False, False, True),
+    ("Host Share", "host_share", False, False, False),
+]
+
+# (name, category, is_starting_till, is_ending_till)
+FINANCIAL_TEMPLATES = [
+    ("Starting Till", "revenue", True, False),
+    ("Cash Sales", "revenue", False, False),
+    ("Card Sales", "revenue", False, False),
+    ("Gift Cards", "revenue", False, False),
+    ("Deposit", "expense", False, False),
+    ("Payouts", "expense", False, False),
+    ("Card Fees", "expense", False, False),
+    ("Ending Till", "expense", False, True),
+]
+
+PAYEES = ["Landlord", "Linen Service", "Produce Co", "Fish Market", "Dairy Farm", "Beverage Dist", "Plumber"]
+TASK_TYPES = ["tip_report", "daily_balance_report", "employee_tip_report", "report_batch", "backup", "maintenance"]
+
+
+def requirement_specs(count):
+    """count tip requirements: the base set (repeated with suffixes as needed) plus a total."""
+    specs = []
+    for index in range(max(count - 1, 1)):
+        name, field, is_deduction, apply_to_revenue, payroll = BASE_REQUIREMENTS[index % len(BASE_REQUIREMENTS)]
+        suffix = index // len(BASE_REQUIREMENTS)
+        if suffix:
+            name, field = f"{name} {suffix + 1}", f"{field}_{suffix + 1}"
+        specs.append((name, field, is_deduction, apply_to_revenue, payroll))
+    return specs
+
+
+def generate_dataset(db, employees=40, positions=5, requirements=6, days=90, start=date(2026, 1, 1), seed=42):
+    """
+    Fill the database and return a summary of what was created.
+
+    The last day of the range is left as an unfinalized draft, like the
+    current day of a live shop; every other day is finalized.
+    """
+    from app.auth.jwt_handler import get_password_hash
+    from app.models import (
+        User, Position, TipEntryRequirement, FinancialLineItemTemplate, Employee, EmployeePositionSchedule,
+        DailyBalance, DailyEmployeeEntry, DailyFinancialLineItem, DailyBalanceCheck, DailyBalanceEFT,
+        ScheduledCheck, ScheduledEFT, CheckPayee, EFTPayee, ScheduledTask, TaskExecution,
+    )
+    from app.services.schedule_index import index_employee_schedules
+
+    rng = random.Random(seed)
+    end = start + timedelta(days=days - 1)
+
+    admin = User(username="admin", password_hash=get_password_hash("admin"), slug="admin",
+                 email="admin@example.com", is_admin=True, opt_in_daily_reports=True, opt_in_tip_reports=True)
+    db.add(admin)
+
+    tip_requirements = []
+    for order, (name, field, is_deduction, apply_to_revenue, payroll) in enumerate(requirement_specs(requirements)):
+        tip_requirements.append(TipEntryRequirement(
+            name=name, slug=field.replace("_", "-"), field_name=field, display_order=order,
+            is_deduction=is_deduction, apply_to_revenue=apply_to_revenue, include_in_payroll_summary=payroll,
+        ))
+    total = TipEntryRequirement(name="Total Tips", slug="total-tips", field_name="total_tips",
+                                display_order=len(tip_requirements), is_total=True, include_in_payroll_summary=True)
+    db.add_all(tip_requirements + [total])
+
+    position_rows = []
+    for number in range(positions):
+        # Every position records cash tips and the total; the rest vary
+        chosen = [tip_requirements[0]] + [req for req in tip_requirements[1:] if rng.random() < 0.6] + [total]
+        position_rows.append(Position(name=f"Position {number + 1}", slug=f"position-{number + 1}",
+                                      tip_requirements=chosen))
+    db.add_all(position_rows)
+
+    templates = [
+        FinancialLineItemTemplate(name=name, category=category, display_order=order, is_default=True,
+                                  is_starting_till=starting, is_ending_till=ending)
+        for order, (name, category, starting, ending) in enumerate(FINANCIAL_TEMPLATES)
+    ]
+    db.add_all(templates)
+    db.flush()
+
+    employee_rows = []
+    weekly = {day: [] for day in range(7)}
+    dated = {}
+    for number in range(employees):
+        employee = Employee(name=f"Staff{number:03d}, Emp", first_name="Emp", last_name=f"Staff{number:03d}",
+                            slug=f"emp-{number:03d}", is_active=True)
+        db.add(employee)
+        db.flush()
+        employee_rows.append(employee)
+        position = position_rows[number % positions]
+        if number % 5 == 4:
+            dates = [start + timedelta(days=offset) for offset in range(number % 3, days, 3)]
+            schedule = EmployeePositionSchedule(employee_id=employee.id, position_id=position.id,
+                                                schedule_type="calendar",
+                                                specific_dates=[d.isoformat() for d in dates])
+            for day in dates:
+                dated.setdefault(day, []).append((employee, position))
+        else:
+            weekdays = sorted(rng.sample(range(7), k=rng.randint(3, 5)))
+            schedule = EmployeePositionSchedule(employee_id=employee.id, position_id=position.id,
+                                                schedule_type="recurring",
+                                                days_of_week=[DAYS[day] for day in weekdays])
+            for day in weekdays:
+                weekly[day].append((employee, position))
+        db.add(schedule)
+        index_employee_schedules(db, employee.id, [schedule])
+
+    for payee in PAYEES:
+        db.add(CheckPayee(name=payee))
+        db.add(EFTPayee(name=payee))
+    db.add(ScheduledCheck(payable_to="Landlord", check_number="1000", default_total=1500.0, days_of_week=["Monday"]))
+    db.add(ScheduledCheck(payable_to="Linen Service", default_total=85.0, days_of_week=["Tuesday", "Friday"]))
+    db.add(ScheduledEFT(payable_to="Produce Co", card_number="4242", default_total=220.0,
+                        days_of_week=["Wednesday", "Saturday"]))
+
+    counts = {"daily_balances": 0, "employee_entries": 0, "line_items": 0, "checks": 0, "efts": 0}
+    till = 300.0
+    check_number = 2000
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        finalized = day != end
+        balance = DailyBalance(date=day, day_of_week=DAYS[day.weekday()], notes=f"Synthetic day {offset + 1}",
+                               finalized=finalized, created_by_user_id=admin.id, created_by_source="user",
+                               generated_by_user_id=admin.id, generated_at=datetime.combine(day, datetime.min.time()),
+                               finalized_by_user_id=admin.id if finalized else None,
+                               finalized_at=datetime.combine(day, datetime.max.time()) if finalized else None)
+        db.add(balance)
+        db.flush()
+        counts["daily_balances"] += 1
+
+        line_items = []
+        tip_revenue = 0.0
+        for employee, position in weekly[day.weekday()] + dated.get(day, []):
+            tips = {}
+            for req in position.tip_requirements:
+                if not req.is_total:
+                    tips[req.field_name] = round(rng.uniform(0, 60 if req.is_deduction else 250), 2)
+            tips["total_tips"] = round(sum(-tips[req.field_name] if req.is_deduction else tips[req.field_name]
+                                           for req in position.tip_requirements if not req.is_total), 2)
+            db.add(DailyEmployeeEntry(daily_balance_id=balance.id, employee_id=employee.id, position_id=position.id,
+                                      tip_values=tips, employee_name_snapshot=employee.display_name,
+                                      position_name_snapshot=position.name))
+            counts["employee_entries"] += 1
+            for req in position.tip_requirements:
+                if req.apply_to_revenue:
+                    tip_revenue += tips[req.field_name]
+                    line_items.append(DailyFinancialLineItem(
+                        daily_balance_id=balance.id, name=f"{employee.display_name} ({position.name}) - {req.name}",
+                        category="revenue", value=tips[req.field_name], display_order=100,
+                        is_employee_tip=True, employee_id=employee.id, employee_name_snapshot=employee.display_name,
+                    ))
+
+        values = {
+            "Starting Till": till,
+            "Cash Sales": round(rng.uniform(800, 2500), 2),
+            "Card Sales": round(rng.uniform(2000, 6000), 2),
+            "Gift Cards": round(rng.uniform(0, 200), 2),
+            "Payouts": round(rng.uniform(0, 150), 2),
+            "Card Fees": round(rng.uniform(40, 180), 2),
+            "Ending Till": 300.0,
+        }
+        values["Deposit"] = round(values["Starting Till"] + values["Cash Sales"] + tip_revenue
+                                  - values["Payouts"] - values["Ending Till"], 2)
+        till = values["Ending Till"]
+        for template in templates:
+            line_items.append(DailyFinancialLineItem(
+                daily_balance_id=balance.id, template_id=template.id, name=template.name,
+                category=template.category, value=values[template.name], display_order=template.display_order,
+            ))
+        db.add_all(line_items)
+        counts["line_items"] += len(line_items)
+
+        for _ in range(rng.randint(0, 2)):
+            check_number += 1
+            db.add(DailyBalanceCheck(daily_balance_id=balance.id, check_number=str(check_number),
+                                     date=day.isoformat(), payable_to=rng.choice(PAYEES),
+                                     total=round(rng.uniform(20, 900), 2), memo="Synthetic"))
+            counts["checks"] += 1
+        for _ in range(rng.randint(0, 2)):
+            db.add(DailyBalanceEFT(daily_balance_id=balance.id, date=day.isoformat(), card_number="4242",
+                                   payable_to=rng.choice(PAYEES), total=round(rng.uniform(20, 600), 2),
+                                   memo="Synthetic"))
+            counts["efts"] += 1
+
+    # Inactive so the scheduler started by a benchmark never runs them
+    task_count = 0
+    executions = 0
+    for index, task_type in enumerate(TASK_TYPES * 2):
+        task = ScheduledTask(name=f"{task_type} {index + 1}", task_type=task_type, schedule_type="cron",
+                             cron_expression=f"0 {index % 24} * * *", is_active=False,
+                             date_range_type=None if task_type in ("backup", "maintenance") else "previous_week",
+                             email_list=json.dumps(["admin@example.com"]), bypass_opt_in=False,
+                             employee_id=employee_rows[0].id if task_type == "employee_tip_report" and index < 6 else None)
+        db.add(task)
+        db.flush()
+        task_count += 1
+        for run in range(20):
+            run_at = datetime.combine(end, datetime.min.time()) - timedelta(days=run, hours=index)
+            failed = rng.random() < 0.1
+            db.add(TaskExecution(task_id=task.id, started_at=run_at, completed_at=run_at + timedelta(seconds=2),
+                                 status="failed" if failed else "success",
+                                 error_message="Synthetic failure" if failed else None,
+                                 result_data=None if failed else json.dumps({"emails_sent": 1})))
+            executions += 1
+
+    db.commit()
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "employees": employees,
+        "positions": positions,
+        "tip_requirements": len(tip_requirements) + 1,
+        **counts,
+        "scheduled_tasks": task_count,
+        "task_executions": executions,
+    }
+
+
+def daily_balance_form_data(db, daily_balance):
+    """The form fields the daily balance page would submit for an existing day."""
+    from starlette.datastructures import FormData
+    from app.models import FinancialLineItemTemplate
+
+    values = {item.template_id: item.value for item in daily_balance.financial_line_items if item.template_id}
+    fields = [("notes", daily_balance.notes or "")]
+    for template in db.query(FinancialLineItemTemplate).all():
+        fields.append((f"financial_item_{template.id}", str(values.get(template.id, 0))))
+    for entry in daily_balance.employee_entries:
+        combo = f"{entry.employee_id}-{entry.position_id}"
+        fields.append(("employee_ids", combo))
+        for field, value in entry.tip_values.items():
+            if field != "total_tips":
+                fields.append((f"tip_{field}_{combo}", str(value)))
+    for index, check in enumerate(daily_balance.checks):
+        fields += [(f"check_number_{index}", check.check_number or ""), (f"check_date_{index}", check.date),
+                   (f"check_payable_to_{index}", check.payable_to), (f"check_total_{index}", str(check.total)),
+                   (f"check_memo_{index}", check.memo or "")]
+    for index, eft in enumerate(daily_balance.efts):
+        fields += [(f"eft_date_{index}", eft.date), (f"eft_card_number_{index}", eft.card_number or ""),
+                   (f"eft_payable_to_{index}", eft.payable_to), (f"eft_total_{index}", str(eft.total)),
+                   (f"eft_memo_{index}", eft.memo or "")]
+    return FormData(fields)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Version check benchmark: home page latency against a local stand-in for GitHub.
+
+Serves the .dockerversion file from a local HTTP server that can answer
+immediately ("fast"), hang for longer than the fetch timeout ("stalled"), or
+refuse connections ("down"). For each behaviour it reports:
+
+- legacy_fetch_ms: one blocking get_remote_version() call, which is what the
+  home page used to pay on every load
+- home page latency while the background refresh runs
+- whether the cached result picked up the stand-in's version once the
+  refresh finished
+
+Usage:
+    python bench/version_check.py [--requests 20] [--output results.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REMOTE_VERSION = "99.0.0"
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    shutil.copy(os.path.join(REPO_ROOT, ".dockerversion"), workdir)
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = REMOTE_VERSION.encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in(delay):
+    handler = type("Handler", (StandInHandler,), {"delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/.dockerversion"
+
+
+def unused_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/.dockerversion"
+
+
+def run_mode(client, mode, args):
+    from app.utils import version
+
+    server = None
+    if mode == "fast":
+        server, url = start_stand_in(0.0)
+    elif mode == "stalled":
+        server, url = start_stand_in(version.VERSION_CHECK_TIMEOUT + 2)
+    else:
+        url = unused_port_url()
+
+    version.VERSION_CHECK_URL = url
+
+    started = time.perf_counter()
+    version.get_remote_version()
+    legacy_fetch = time.perf_counter() - started
+
+    version._state.update(remote_version=None, checked_at=None, last_success=False)
+
+    latencies = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        response = client.get("/")
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+
+    if version._refresh_thread is not None:
+        version._refresh_thread.join(version.VERSION_CHECK_TIMEOUT + 5)
+
+    if server:
+        server.shutdown()
+
+    return {
+        "mode": mode,
+        "legacy_fetch_ms": round(legacy_fetch * 1000, 2),
+        "home_first_ms": round(latencies[0] * 1000, 2),
+        "home_median_ms": round(statistics.median(latencies) * 1000, 2),
+        "home_max_ms": round(max(latencies) * 1000, 2),
+        "cached_remote_version": version._state["remote_version"],
+        "update_available": version.check_version()[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    workdir = prepare_workdir()
+    try:
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.post("/setup", data={"username": "bench", "password": "bench"}, follow_redirects=False)
+            client.post("/login", data={"username": "bench", "password": "bench"}, follow_redirects=False)
+            results = [run_mode(client, mode, args) for mode in ("fast", "stalled", "down")]
+
+        report = json.dumps({"benchmark": "version_check", "params": vars(args), "results": results}, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Write-contention benchmark: form saves racing scheduled-task status updates.
+
+Runs the same mixed workload twice against a throwaway SQLite database:
+
+- legacy: scheduler threads write execution status through their own session
+  and retry "database is locked" with exponential backoff (the old
+  commit_with_retry behaviour).
+- writer: scheduler threads hand their writes to the single writer thread in
+  app/db_writer.py, which coalesces them into group commits.
+
+In both modes web-style form saves go through save_daily_balance_data on a
+regular session, exactly like the /daily-balance/save route.
+
+Usage:
+    python bench/write_contention.py [--scheduler-threads 20] [--form-threads 4]
+                                     [--task-runs 25] [--form-saves 25]
+                                     [--output results.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_workdir():
+    """Create a temp working directory so data/database.db is a throwaway file."""
+    workdir = tempfile.mkdtemp(prefix="dailydough_bench_")
+    os.symlink(os.path.join(REPO_ROOT, "app"), os.path.join(workdir, "app"))
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    return workdir
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else 0.0,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+def run_mode(mode, args, day_offset):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from starlette.datastructures import FormData
+    from app.database import SessionLocal
+    from app.db_writer import db_writer
+    from app.models import FinancialLineItemTemplate
+    from app.routes.daily_balance import save_daily_balance_data
+
+    db = SessionLocal()
+    template_ids = [t.id for t in db.query(FinancialLineItemTemplate).all()]
+    db.close()
+
+    task_latencies = []
+    form_latencies = []
+    errors = {"lock_errors": 0, "retries": 0, "form_errors": 0}
+    stats_lock = threading.Lock()
+
+    def legacy_write(sql, params):
+        session = SessionLocal()
+        try:
+            for attempt in range(5):
+                try:
+                    result = session.execute(text(sql), params)
+                    rows = result.fetchall() if result.returns_rows else []
+                    session.commit()
+                    return rows
+                except OperationalError:
+                    session.rollback()
+                    with stats_lock:
+                        errors["retries"] += 1
+                    if attempt == 4:
+                        raise
+                    time.sleep(0.1 * (2 ** attempt))
+        finally:
+            session.close()
+
+    def writer_write(sql, params):
+        return db_writer.execute(sql, params).rows
+
+    write = legacy_write if mode == "legacy" else writer_write
+
+    def scheduler_worker():
+        for _ in range(args.task_runs):
+            started = time.perf_counter()
+            try:
+                rows = write("""
+                    INSERT INTO task_executions (task_id, started_at, status)
+                    VALUES (1, datetime('now'), 'running')
+                    RETURNING id
+                """, {})
+                execution_id = rows[0][0]
+                write("""
+                    UPDATE task_executions
+                    SET completed_at = CURRENT_TIMESTAMP, status = 'success', result_data = :data
+                    WHERE id = :execution_id
+                """, {"execution_id": execution_id, "data": json.dumps({"bench": True})})
+                write("""
+                    UPDATE scheduled_tasks SET last_run_at = CURRENT_TIMESTAMP WHERE id = 1
+                """, {})
+            except OperationalError:
+                with stats_lock:
+                    errors["lock_errors"] += 1
+                continue
+            with stats_lock:
+                task_latencies.append(time.perf_counter() - started)
+
+    def form_worker(worker_index):
+        for i in range(args.form_saves):
+            target = date(2020, 1, 1) + timedelta(days=day_offset + worker_index * args.form_saves + i)
+            form = FormData([(f"financial_item_{tid}", "12.50") for tid in template_ids] + [("notes", "bench")])
+            session = SessionLocal()
+            started = time.perf_counter()
+            try:
+                save_daily_balance_data(session, target, target.strftime("%A"), form)
+                with stats_lock:
+                    form_latencies.append(time.perf_counter() - started)
+            except Exception:
+                session.rollback()
+                with stats_lock:
+                    errors["form_errors"] += 1
+            finally:
+                session.close()
+
+    threads = [threading.Thread(target=scheduler_worker) for _ in range(args.scheduler_threads)]
+    threads += [threading.Thread(target=form_worker, args=(n,)) for n in range(args.form_threads)]
+
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    total_ops = len(task_latencies) + len(form_latencies)
+    return {
+        "mode": mode,
+        "wall_seconds": round(wall, 3),
+        "ops_per_second": round(total_ops / wall, 1) if wall else 0.0,
+        "scheduled_task_runs": summarize(task_latencies),
+        "form_saves": summarize(form_latencies),
+        **errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scheduler-threads", type=int, default=20)
+    parser.add_argument("--form-threads", type=int, default=4)
+    parser.add_argument("--task-runs", type=int, default=25)
+    parser.add_argument("--form-saves", type=int, default=25)
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    workdir = prepare_workdir()
+    try:
+        from sqlalchemy import text
+        from app.database import SessionLocal, init_db
+        from app.db_writer import start_db_writer, shutdown_db_writer
+        from app.models import FinancialLineItemTemplate
+
+        init_db()
+        db = SessionLocal()
+        for order, (name, category) in enumerate([
+            ("Cash Sales", "revenue"), ("Card Sales", "revenue"), ("Gift Cards", "revenue"),
+            ("Deposit", "expense"), ("Payouts", "expense"), ("Ending Till", "expense"),
+        ]):
+            db.add(FinancialLineItemTemplate(name=name, category=category, display_order=order))
+        db.execute(text("""
+            INSERT INTO scheduled_tasks (id, name, task_type, schedule_type, is_active)
+            VALUES (1, 'bench', 'backup', 'interval', 1)
+        """))
+        db.commit()
+        db.close()
+
+        results = [run_mode("legacy", args, day_offset=0)]
+        start_db_writer()
+        results.append(run_mode("writer", args, day_offset=100000))
+        shutdown_db_writer()
+
+        report = json.dumps({"benchmark": "write_contention", "params": vars(args), "results": results}, indent=2)
+        print(report)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(report)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Migration: Add profile_enabled column to scheduled_tasks
+
+Lets a scheduled task save a profile of its report generation on each run
+(viewable under Admin → Profiles).
+
+Changes:
+- Adds profile_enabled BOOLEAN column to scheduled_tasks table (defaults to FALSE)
+- Backward compatible - existing tasks are not profiled
+"""
+
+MIGRATION_ID = "2026_10_19_add_profile_enabled_to_scheduled_tasks"
+
+def upgrade(conn, column_exists, table_exists):
+    """Add profile_enabled column to scheduled_tasks table"""
+    cursor = conn.cursor()
+
+    if not column_exists('scheduled_tasks', 'profile_enabled'):
+        cursor.execute("""
+            ALTER TABLE scheduled_tasks
+            ADD COLUMN profile_enabled BOOLEAN DEFAULT FALSE;
+        """)
+        print("  ✓ Added profile_enabled column to scheduled_tasks table")
+    else:
+        print("  ⚠ profile_enabled column already exists, skipping")
+
+def downgrade(conn, column_exists, table_exists):
+    """Remove profile_enabled column from scheduled_tasks table"""
+    # SQLite doesn't support DROP COLUMN directly, would need to recreate table
+    print("  ⚠ Downgrade not implemented (SQLite limitation)")
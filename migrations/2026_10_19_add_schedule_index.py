@@ -0,0 +1,117 @@
+"""
+Add the schedule index tables used to look up who is scheduled on a date.
+
+Changes:
+- Creates 'schedule_weekdays' (weekday, employee_id, position_id)
+  One row per weekday of each recurring schedule; weekday is 0=Monday..6=Sunday
+- Creates 'schedule_dates' (date, employee_id, position_id)
+  One row per date in each calendar schedule's specific_dates list
+- Backfills both tables from employee_position_schedule
+
+The daily balance page previously loaded every schedule and checked each one
+in Python (a list scan of specific_dates for calendar schedules). With the
+index, "who works on date X" is a primary-key lookup on each table. The
+application rewrites an employee's index rows whenever their schedules are
+saved.
+"""
+import json
+from datetime import date
+
+MIGRATION_ID = "2026_10_19_add_schedule_index"
+
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def upgrade(conn, column_exists, table_exists):
+    """
+    Apply the migration.
+
+    Args:
+        conn: SQLite database connection
+        column_exists: Helper - column_exists(table, column) -> bool
+        table_exists: Helper - table_exists(table) -> bool
+    """
+    cursor = conn.cursor()
+
+    if not table_exists('schedule_weekdays'):
+        cursor.execute("""
+            CREATE TABLE schedule_weekdays (
+                weekday INTEGER NOT NULL,
+                employee_id INTEGER NOT NULL,
+                position_id INTEGER NOT NULL,
+                PRIMARY KEY (weekday, employee_id, position_id),
+                FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE CASCADE,
+                FOREIGN KEY (position_id) REFERENCES positions(id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute("CREATE INDEX ix_schedule_weekdays_employee_id ON schedule_weekdays (employee_id)")
+        print("  ✓ Created schedule_weekdays table")
+    else:
+        print("  ℹ️  schedule_weekdays table already exists, skipping")
+
+    if not table_exists('schedule_dates'):
+        cursor.execute("""
+            CREATE TABLE schedule_dates (
+                date DATE NOT NULL,
+                employee_id INTEGER NOT NULL,
+                position_id INTEGER NOT NULL,
+                PRIMARY KEY (date, employee_id, position_id),
+                FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE CASCADE,
+                FOREIGN KEY (position_id) REFERENCES positions(id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute("CREATE INDEX ix_schedule_dates_employee_id ON schedule_dates (employee_id)")
+        print("  ✓ Created schedule_dates table")
+    else:
+        print("  ℹ️  schedule_dates table already exists, skipping")
+
+    if not table_exists('employee_position_schedule'):
+        conn.commit()
+        print("  ℹ️  No employee schedules to index")
+        return
+
+    # Rebuild the index from scratch so re-running this is harmless
+    cursor.execute("DELETE FROM schedule_weekdays")
+    cursor.execute("DELETE FROM schedule_dates")
+
+    has_calendar = column_exists('employee_position_schedule', 'schedule_type')
+    columns = "employee_id, position_id, days_of_week" + (", schedule_type, specific_dates" if has_calendar else "")
+    cursor.execute(f"SELECT {columns} FROM employee_position_schedule")
+
+    weekday_rows = set()
+    date_rows = set()
+    for row in cursor.fetchall():
+        employee_id, position_id, days_of_week = row[0], row[1], row[2]
+        schedule_type = (row[3] if has_calendar else None) or 'recurring'
+
+        if schedule_type == 'calendar':
+            try:
+                specific_dates = json.loads(row[4] or '[]')
+            except ValueError:
+                specific_dates = []
+            for value in specific_dates:
+                try:
+                    date_rows.add((date.fromisoformat(value).isoformat(), employee_id, position_id))
+                except (TypeError, ValueError):
+                    continue
+        elif schedule_type == 'recurring':
+            try:
+                day_names = json.loads(days_of_week or '[]')
+            except ValueError:
+                day_names = []
+            for day_name in day_names:
+                if day_name in DAYS_OF_WEEK:
+                    weekday_rows.add((DAYS_OF_WEEK.index(day_name), employee_id, position_id))
+
+    cursor.executemany(
+        "INSERT INTO schedule_weekdays (weekday, employee_id, position_id) VALUES (?, ?, ?)",
+        sorted(weekday_rows)
+    )
+    cursor.executemany(
+        "INSERT INTO schedule_dates (date, employee_id, position_id) VALUES (?, ?, ?)",
+        sorted(date_rows)
+    )
+    print(f"  ✓ Indexed {len(weekday_rows)} recurring and {len(date_rows)} calendar schedule entries")
+
+    conn.commit()
+    print("  ✅ Schedule index migration completed successfully")
@@ -0,0 +1,63 @@
+"""
+Add an indexed weekday bitmask to scheduled checks and EFTs.
+
+Changes:
+- Adds 'weekday_mask' INTEGER column to scheduled_checks and scheduled_efts
+  Bit 0 is Monday ... bit 6 is Sunday, mirroring the days_of_week JSON list
+- Backfills weekday_mask from days_of_week for existing rows
+- Creates (is_active, weekday_mask) indexes on both tables
+
+Lookups for a day now filter with weekday_mask IN (every mask containing that
+day's bit), which SQLite answers from the index, instead of loading every
+active row and checking days_of_week in Python. The application keeps the
+mask in sync whenever days_of_week is assigned.
+"""
+import json
+
+MIGRATION_ID = "2026_10_19_add_scheduled_payment_weekday_mask"
+
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def upgrade(conn, column_exists, table_exists):
+    """
+    Apply the migration.
+
+    Args:
+        conn: SQLite database connection
+        column_exists: Helper - column_exists(table, column) -> bool
+        table_exists: Helper - table_exists(table) -> bool
+    """
+    cursor = conn.cursor()
+
+    for table in ('scheduled_checks', 'scheduled_efts'):
+        if not table_exists(table):
+            print(f"  ℹ️  {table} table does not exist, skipping")
+            continue
+
+        if not column_exists(table, 'weekday_mask'):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN weekday_mask INTEGER NOT NULL DEFAULT 0")
+            print(f"  ✓ Added weekday_mask column to {table}")
+        else:
+            print(f"  ℹ️  {table}.weekday_mask already exists, recomputing values")
+
+        cursor.execute(f"SELECT id, days_of_week FROM {table}")
+        updates = []
+        for row_id, days_of_week in cursor.fetchall():
+            try:
+                day_names = json.loads(days_of_week or '[]')
+            except ValueError:
+                day_names = []
+            mask = 0
+            for day_name in day_names:
+                if day_name in DAYS_OF_WEEK:
+                    mask |= 1 << DAYS_OF_WEEK.index(day_name)
+            updates.append((mask, row_id))
+        cursor.executemany(f"UPDATE {table} SET weekday_mask = ? WHERE id = ?", updates)
+        print(f"  ✓ Backfilled weekday_mask for {len(updates)} {table} rows")
+
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_active_weekday_mask ON {table} (is_active, weekday_mask)")
+        print(f"  ✓ Created ix_{table}_active_weekday_mask index")
+
+    conn.commit()
+    print("  ✅ Scheduled payment weekday mask migration completed successfully")
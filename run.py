@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
+import os
 import uvicorn
 
 if __name__ == "__main__":
+    # Pick up template edits without a restart while developing
+    os.environ.setdefault("TEMPLATE_AUTO_RELOAD", "1")
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",